@@ -0,0 +1,55 @@
+from abc import ABC, abstractmethod
+
+
+def empty_result() -> dict:
+    """The normalized response of `BaseBackend.generate` with every field unset."""
+    return {
+        "text": None, "tokens_per_second": None, "error": None,
+        "prompt_tokens": None, "output_tokens": None,
+        "load_duration_s": None, "prompt_eval_duration_s": None, "eval_duration_s": None,
+        "total_duration_s": None, "ttft_s": None, "latency_s": None, "error_class": None, "attempts": 0,
+    }
+
+
+class BaseBackend(ABC):
+    """
+    Abstract base class for inference engines (Ollama, llama.cpp's llama-server, other
+    OpenAI-compatible servers).
+
+    Every backend returns the same normalized response as `ollama_client.generate`, so the
+    evaluator and the reports can put engines side by side for the same model and benchmark.
+    Models are always named as in the config's `models_to_evaluate`; `model_aliases` maps them
+    to the name the engine knows (e.g. "qwen3:8b" -> "Qwen3-8B-Q4_K_M.gguf").
+    """
+    default_name = "base"
+
+    def __init__(self, name: str | None = None, model_aliases: dict | None = None):
+        self.name = name or self.default_name
+        self.model_aliases = model_aliases or {}
+
+    def resolve_model(self, model_name: str) -> str:
+        """Returns the engine's name for a configured model."""
+        return self.model_aliases.get(model_name, model_name)
+
+    @abstractmethod
+    def generate(self, model_name: str, prompt: str, options: dict | None = None, **payload_overrides) -> dict:
+        """
+        Sends a prompt to the engine.
+
+        Args:
+            model_name (str): The configured model name (see `resolve_model`).
+            prompt (str): The prompt to send to the model.
+            options (dict, optional): Ollama-style model options (temperature, seed, num_predict,
+                                      stop, ...); each backend maps the ones its engine supports.
+            **payload_overrides: Ollama-style top-level fields such as `format` (a JSON schema) or `system`.
+
+        Returns:
+            dict: See `empty_result` and `ollama_client.generate`. ttft_s is the time to the
+                  first token and prompt_eval_duration_s the prompt-processing time, measured by
+                  the server where the engine reports them and by the client otherwise.
+        """
+        pass
+
+    def check_connection(self) -> bool:
+        """Returns whether the engine is reachable. The default assumes it is."""
+        return True
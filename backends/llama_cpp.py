@@ -0,0 +1,20 @@
+from backends.openai_compatible import OpenAICompatibleBackend
+
+
+class LlamaCppBackend(OpenAICompatibleBackend):
+    """
+    llama.cpp's `llama-server`, through its OpenAI-compatible chat endpoint (so the model's chat
+    template is applied as with Ollama). The server's own `timings` provide the prompt and
+    generation durations, so its numbers compare directly with Ollama's.
+    """
+    default_name = "llama.cpp"
+    OPTION_FIELDS = {**OpenAICompatibleBackend.OPTION_FIELDS, "top_k": "top_k", "min_p": "min_p",
+                     "repeat_penalty": "repeat_penalty"}
+
+    def __init__(self, base_url: str = "http://localhost:8080/v1", **kwargs):
+        super().__init__(base_url, **kwargs)
+
+    def build_payload(self, model_name: str, prompt: str, options: dict | None, payload_overrides: dict) -> dict:
+        payload = super().build_payload(model_name, prompt, options, payload_overrides)
+        payload["timings_per_token"] = True # Puts `timings` on the streamed chunks
+        return payload
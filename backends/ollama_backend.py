@@ -0,0 +1,13 @@
+from backends.base_backend import BaseBackend
+import ollama_client
+
+
+class OllamaBackend(BaseBackend):
+    """The Ollama /api/generate endpoint, via `ollama_client`."""
+    default_name = "ollama"
+
+    def generate(self, model_name: str, prompt: str, options: dict | None = None, **payload_overrides) -> dict:
+        return ollama_client.generate(self.resolve_model(model_name), prompt, options, **payload_overrides)
+
+    def check_connection(self) -> bool:
+        return ollama_client.check_ollama_connection()
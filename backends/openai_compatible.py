@@ -0,0 +1,149 @@
+import json
+import time
+import logging
+import requests
+
+from backends.base_backend import BaseBackend, empty_result
+from ollama_client import DEFAULT_SYSTEM_PROMPT
+from utils.tracing import span
+from utils.request_policy import get_policy, RequestError
+
+logger = logging.getLogger(__name__)
+
+
+class OpenAICompatibleBackend(BaseBackend):
+    """
+    Any server with an OpenAI-compatible /chat/completions endpoint (vLLM, LM Studio, TGI, ...).
+
+    Responses are streamed so that the time to first token can be measured. When the server
+    reports llama.cpp-style `timings`, the prompt and generation durations come from the server;
+    otherwise they are measured by the client (TTFT then includes network and queueing time, and
+    tokens/s is taken between the first and the last streamed token).
+    """
+    default_name = "openai"
+    # Ollama option -> request field. Options the engine does not know are left out.
+    OPTION_FIELDS = {"temperature": "temperature", "top_p": "top_p", "seed": "seed", "num_predict": "max_tokens",
+                     "stop": "stop", "presence_penalty": "presence_penalty", "frequency_penalty": "frequency_penalty"}
+
+    def __init__(self, base_url: str = "http://localhost:8000/v1", api_key: str | None = None,
+                 timeout_s: float | None = None, name: str | None = None, model_aliases: dict | None = None):
+        super().__init__(name, model_aliases)
+        self.base_url = base_url.rstrip("/")
+        self.timeout_s = timeout_s # Per attempt; None uses the request policy's attempt_timeout_s
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    def build_payload(self, model_name: str, prompt: str, options: dict | None, payload_overrides: dict) -> dict:
+        payload = {
+            "model": self.resolve_model(model_name),
+            "messages": [{"role": "system", "content": payload_overrides.get("system", DEFAULT_SYSTEM_PROMPT)},
+                         {"role": "user", "content": prompt}],
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        for option, value in (options or {}).items():
+            if option in self.OPTION_FIELDS:
+                payload[self.OPTION_FIELDS[option]] = value
+        response_format = payload_overrides.get("format")
+        if isinstance(response_format, dict):
+            payload["response_format"] = {"type": "json_schema",
+                                          "json_schema": {"name": "response", "schema": response_format}}
+        elif response_format == "json":
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    def generate(self, model_name: str, prompt: str, options: dict | None = None, **payload_overrides) -> dict:
+        result = empty_result()
+        payload = self.build_payload(model_name, prompt, options, payload_overrides)
+        url = f"{self.base_url}/chat/completions"
+        start_time = time.perf_counter()
+        try:
+            stream, result["attempts"] = get_policy().call(
+                url, lambda timeout: self._stream(url, payload, model_name, timeout), attempt_timeout_s=self.timeout_s)
+            result["latency_s"] = stream["latency_s"]
+            result["text"] = "".join(stream["text"]).strip()
+            usage, timings = stream["usage"], stream["timings"]
+            first_token_s, last_token_s = stream["first_token_s"], stream["last_token_s"]
+            if usage:
+                result["prompt_tokens"] = usage.get("prompt_tokens")
+                result["output_tokens"] = usage.get("completion_tokens")
+            if timings:
+                self._apply_server_timings(result, timings)
+            elif first_token_s is not None:
+                result["ttft_s"] = result["prompt_eval_duration_s"] = first_token_s
+                result["eval_duration_s"] = last_token_s - first_token_s
+                result["total_duration_s"] = result["latency_s"]
+                if result["output_tokens"] and result["output_tokens"] > 1 and result["eval_duration_s"] > 0:
+                    # The first token's time is part of the TTFT.
+                    result["tokens_per_second"] = (result["output_tokens"] - 1) / result["eval_duration_s"]
+        except RequestError as e:
+            result["error_class"], result["attempts"] = e.error_class, e.attempts
+            if e.error_class == "decode":
+                logger.error(f"Failed to decode {self.name} API response.")
+                result["error"] = "Failed to decode API response."
+            else:
+                logger.error(f"{self.name} API request failed after {e.attempts} attempt(s): {e}")
+                result["error"] = f"API request failed: {e}"
+        except Exception as e:
+            logger.error(f"An unexpected error occurred in {self.name} generate: {e}")
+            result["error"] = f"An unexpected error occurred: {e}"
+            result["error_class"] = "other"
+
+        if result["error"]:
+            result["text"] = None
+            result["tokens_per_second"] = None
+        if result["latency_s"] is None:
+            result["latency_s"] = time.perf_counter() - start_time
+        return result
+
+    def _stream(self, url: str, payload: dict, model_name: str, timeout) -> dict:
+        """
+        One attempt: reads the whole streamed response. Token times are relative to the start
+        of the attempt.
+        """
+        start_time = time.perf_counter()
+        first_token_s = last_token_s = None
+        text, usage, timings = [], None, None
+        with span(f"{self.name}.request", model=model_name):
+            with requests.post(url, json=payload, headers=self.headers, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    usage = chunk.get("usage") or usage
+                    timings = chunk.get("timings") or timings
+                    for choice in chunk.get("choices") or []:
+                        delta = choice.get("delta") or {}
+                        if delta.get("content") or delta.get("reasoning_content"):
+                            last_token_s = time.perf_counter() - start_time
+                            first_token_s = first_token_s if first_token_s is not None else last_token_s
+                            text.append(delta.get("content") or "")
+        return {"text": text, "usage": usage, "timings": timings, "first_token_s": first_token_s,
+                "last_token_s": last_token_s, "latency_s": time.perf_counter() - start_time}
+
+    @staticmethod
+    def _apply_server_timings(result: dict, timings: dict):
+        """Fills the durations from llama.cpp-style timings (prompt_n, prompt_ms, predicted_n, predicted_ms)."""
+        if timings.get("prompt_ms") is not None:
+            result["prompt_eval_duration_s"] = result["ttft_s"] = timings["prompt_ms"] / 1000
+        if timings.get("predicted_ms") is not None:
+            result["eval_duration_s"] = timings["predicted_ms"] / 1000
+        result["prompt_tokens"] = timings.get("prompt_n", result["prompt_tokens"])
+        result["output_tokens"] = timings.get("predicted_n", result["output_tokens"])
+        if result["eval_duration_s"] and result["output_tokens"]:
+            result["tokens_per_second"] = result["output_tokens"] / result["eval_duration_s"]
+        if result["prompt_eval_duration_s"] is not None and result["eval_duration_s"] is not None:
+            result["total_duration_s"] = result["prompt_eval_duration_s"] + result["eval_duration_s"]
+
+    def check_connection(self) -> bool:
+        try:
+            response = requests.get(f"{self.base_url}/models", headers=self.headers, timeout=5)
+            response.raise_for_status()
+            logger.info(f"{self.name} API connection successful.")
+            return True
+        except requests.exceptions.RequestException as e:
+            logger.error(f"{self.name} API is not reachable at {self.base_url}: {e}")
+            return False
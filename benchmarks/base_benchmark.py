@@ -3,7 +3,19 @@ from abc import ABC, abstractmethod
 class BaseBenchmark(ABC):
     """
     Abstract base class for LLM benchmarks.
+
+    Subclasses describe their scorer so the evaluator can schedule it:
+    scorer_cpu_heavy: scoring does real work (code execution, symbolic math) and runs in a
+                      process pool, off the generation path.
+    scorer_batchable: `evaluate_batch` is cheaper per response than repeated `evaluate` calls,
+                      so responses are handed over in batches.
     """
+    scorer_cpu_heavy = False
+    scorer_batchable = False
+    judge = None # A utils.judge.Judge, set for benchmarks configured with `use_judge: true`
+    models = None # Model names to run instead of the configured `models`, e.g. embedding models
+    question_fraction = None # Share of the questions to ask, set by the run planner to fit a --time-budget
+
     def __init__(self, name: str):
         self.name = name
 
@@ -35,6 +47,94 @@ class BaseBenchmark(ABC):
         """
         pass
 
+    def evaluate_with_details(self, model_response: str, question_data: dict) -> tuple[float | None, dict]:
+        """
+        Evaluates a response and also returns scorer details for the per-question record
+        (e.g. the extracted answer). Override this when the scorer has intermediate
+        results worth keeping; the default wraps `evaluate()` with no details.
+        Numbers under details['metrics'] (e.g. {'exec_time_s': 0.4}) are also added to the
+        per-question result, so `summarize()` and the results database can use them.
+
+        Returns:
+            tuple: (score, details) where score is as returned by `evaluate()` and
+                   details is a JSON-serializable dictionary.
+        """
+        return self.evaluate(model_response, question_data), {}
+
+    def extract_answer(self, model_response: str):
+        """
+        Returns the response's final answer in a canonical, hashable form (e.g. the choice letter),
+        or None if none can be found. Used for majority voting in self-consistency mode; benchmarks
+        that do not override it cannot be run in that mode.
+        """
+        return None
+
+    def evaluate_batch(self, model_responses: list[str], questions: list[dict]) -> list[tuple[float | None, dict]]:
+        """
+        Scores several responses at once. Override this for vectorized scoring (and set
+        `scorer_batchable`); the default calls `evaluate_with_details()` for each response.
+
+        Returns:
+            list: One (score, details) tuple per response, in order.
+        """
+        return [self.evaluate_with_details(response, question) for response, question in zip(model_responses, questions)]
+
+    def judge_responses(self, model_responses: list[str], questions: list[dict]) -> list[tuple[float | None, dict]]:
+        """
+        Scores responses with the LLM judge (call it from `evaluate_batch` and set `scorer_batchable`,
+        so the judge receives whole batches). The judge is shown question_data['judge_task'] (default:
+        the prompt) and, if present, question_data['reference'].
+
+        Returns:
+            list: One (score 0..1 | None, details) tuple per response; details carry the judge's
+                  reason and its token/time cost under 'metrics'.
+        """
+        from utils.judge import COST_METRICS
+        verdicts = self.judge.judge_batch([
+            {"task": q.get("judge_task", q.get("prompt")), "response": response or "", "reference": q.get("reference")}
+            for response, q in zip(model_responses, questions)
+        ])
+        return [(v["score"], {"judge_reason": v["reason"], "judge_cached": v["cached"],
+                              "metrics": {metric: v[metric] for metric in COST_METRICS}}) for v in verdicts]
+
+    def summarize(self, question_results: list[dict]) -> dict:
+        """
+        Returns benchmark-specific fields to add to (or override in) the model-benchmark
+        result entry, computed from its per-question results. The default adds the judge's
+        total token and time cost when responses were judged.
+
+        Args:
+            question_results (list[dict]): The per-question results of all trials.
+        """
+        if self.judge is None:
+            return {}
+        from utils.judge import summarize_judge_cost
+        return summarize_judge_cost(question_results)
+
+    def get_generation_overrides(self, question_data: dict) -> dict:
+        """
+        Returns per-question overrides for the generation request, e.g. a structured-output
+        `format` or tighter `options` (num_predict, stop). Keys are top-level request fields;
+        'options' is merged over the configured model options. The default overrides nothing.
+        """
+        return {}
+
+    def get_variants(self) -> list["BaseBenchmark"]:
+        """
+        Returns the benchmark instances to run for this configuration entry, e.g. one per
+        answer mode when modes are compared. The default is the benchmark itself.
+        """
+        return [self]
+
+    def run_questions(self, model_name: str, questions: list[dict], model_options: dict, trial: int = 0) -> list[dict] | None:
+        """
+        Lets benchmarks that do not generate text (e.g. embedding throughput) send their own
+        requests. Returns per-question results shaped like the evaluator's (question_id, score,
+        tokens_s, latency_s, ttft_s, prompt_tokens, output_tokens, error), or None to have the
+        evaluator generate and score responses. The default returns None.
+        """
+        return None
+
     def get_name(self) -> str:
         """Returns the name of the benchmark."""
         return self.name
\ No newline at end of file
@@ -0,0 +1,199 @@
+import os
+import re
+import copy
+import json
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ollama_client import embed
+from benchmarks.base_benchmark import BaseBenchmark
+from utils import stats
+
+logger = logging.getLogger(__name__)
+
+_WORDS = ("system model network memory signal energy market river season language method record value "
+          "process design pattern answer history question report service storage engine layer "
+          "quickly carefully often rarely measure build change follow improve reduce observe compare").split()
+
+
+class EmbeddingThroughput(BaseBenchmark):
+    """
+    Embedding throughput against Ollama's /api/embed.
+
+    A corpus (a text file with one document per line, a JSON Lines file with a 'text' field, or
+    seeded synthetic documents) is embedded in batches of `batch_size`, with `concurrency`
+    requests in flight. One variant runs per batch size and concurrency, each with its own
+    SystemMonitor run, and reports documents/s, tokens/s, batch latency percentiles and memory.
+    Embeddings are written to a memory-mapped .npy file per model and variant as they arrive,
+    so large corpora never sit in RAM; set `output_dir` to null to discard them.
+
+    Every batch counts as one "question", scored 1.0 when it returned one embedding per document.
+    """
+    def __init__(self,
+                 models: list[str] | None = None,
+                 corpus_file: str | None = None,
+                 num_documents: int = 2000,
+                 words_per_document: int = 128,
+                 batch_sizes: list[int] | None = None,
+                 concurrency_levels: list[int] | None = None,
+                 output_dir: str | None = "results/embeddings",
+                 seed: int = 42):
+        self.models = models or None # None runs the configured models
+        self.corpus_file = corpus_file
+        self.num_documents = num_documents
+        self.words_per_document = words_per_document
+        self.batch_sizes = batch_sizes or [1, 16, 64]
+        self.concurrency_levels = concurrency_levels or [1, 4]
+        self.output_dir = output_dir
+        self.seed = seed
+        self.batch_size = self.batch_sizes[0]
+        self.concurrency = self.concurrency_levels[0]
+        self._corpus_cache = {} # Loaded corpus, shared with the variants
+        super().__init__(self._variant_name())
+        self.questions = []
+
+    def _variant_name(self) -> str:
+        return f"Embedding Throughput (batch {self.batch_size}, concurrency {self.concurrency})"
+
+    def get_variants(self) -> list[BaseBenchmark]:
+        """One variant per batch size and concurrency level."""
+        variants = []
+        for batch_size in self.batch_sizes:
+            for concurrency in self.concurrency_levels:
+                variant = copy.copy(self)
+                variant.batch_size = batch_size
+                variant.concurrency = concurrency
+                variant.name = variant._variant_name()
+                variant.questions = []
+                variants.append(variant)
+        return variants
+
+    def _corpus(self) -> list[str]:
+        if "documents" not in self._corpus_cache:
+            self._corpus_cache["documents"] = self._load_corpus()
+            logger.info(f"Embedding corpus: {len(self._corpus_cache['documents'])} documents.")
+        return self._corpus_cache["documents"]
+
+    def _load_corpus(self) -> list[str]:
+        if self.corpus_file:
+            with open(self.corpus_file, 'r', encoding='utf-8') as f:
+                if os.path.splitext(self.corpus_file)[1] == ".jsonl":
+                    documents = [json.loads(line)["text"] for line in f if line.strip()]
+                else:
+                    documents = [line.strip() for line in f if line.strip()]
+            return documents[:self.num_documents] if self.num_documents else documents
+        rng = random.Random(self.seed)
+        return [" ".join(rng.choice(_WORDS) for _ in range(self.words_per_document))
+                for _ in range(self.num_documents)]
+
+    def get_questions(self):
+        if not self.questions:
+            num_documents = len(self._corpus())
+            self.questions = [{"id": start // self.batch_size, "start": start,
+                               "end": min(start + self.batch_size, num_documents)}
+                              for start in range(0, num_documents, self.batch_size)]
+        return self.questions
+
+    def evaluate(self, model_response: str, question_data: dict) -> (float | None):
+        return None # Batches are checked in `run_questions`; nothing is generated.
+
+    def run_questions(self, model_name: str, questions: list[dict], model_options: dict, trial: int = 0) -> list[dict]:
+        """Embeds every batch with `concurrency` requests in flight, streaming the vectors to disk."""
+        documents = self._corpus()
+        writer = _EmbeddingWriter(self._output_path(model_name, trial), len(documents)) if self.output_dir else None
+        run_start = time.perf_counter()
+
+        def embed_batch(q_data: dict) -> dict:
+            start_s = time.perf_counter() - run_start
+            response = embed(model_name, documents[q_data["start"]:q_data["end"]], model_options)
+            end_s = time.perf_counter() - run_start
+            embeddings = response["embeddings"] or []
+            num_documents = q_data["end"] - q_data["start"]
+            if writer is not None and embeddings:
+                writer.write(q_data["start"], embeddings)
+            latency = response["latency_s"]
+            return {
+                "question_id": q_data["id"],
+                "subject": None,
+                "trial": trial,
+                "score": None if response["error"] else (1.0 if len(embeddings) == num_documents else 0.0),
+                "tokens_s": response["prompt_tokens"] / latency if response["prompt_tokens"] and latency else None,
+                "latency_s": latency,
+                "ttft_s": None,
+                "prompt_tokens": response["prompt_tokens"],
+                "output_tokens": None,
+                "error": response["error"],
+                "error_class": response.get("error_class"),
+                "attempts": response.get("attempts", 1),
+                "documents": num_documents,
+                "embedding_dim": len(embeddings[0]) if embeddings else None,
+                "start_s": start_s,
+                "end_s": end_s,
+            }
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(embed_batch, questions))
+        if writer is not None:
+            writer.close()
+        return results
+
+    def _output_path(self, model_name: str, trial: int) -> str:
+        safe_model = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        return os.path.join(self.output_dir, f"{safe_model}_b{self.batch_size}_c{self.concurrency}_t{trial}.npy")
+
+    def summarize(self, question_results: list[dict]) -> dict:
+        """Documents/s and tokens/s over each trial's wall time (averaged over trials), and batch latency percentiles."""
+        trials = {}
+        for q in question_results:
+            if not q.get("error"):
+                trials.setdefault(q["trial"], []).append(q)
+        docs_s, tokens_s = [], []
+        for batches in trials.values():
+            wall_time = max(q["end_s"] for q in batches) - min(q["start_s"] for q in batches)
+            if wall_time > 0:
+                docs_s.append(sum(q["documents"] for q in batches) / wall_time)
+                tokens_s.append(sum(q["prompt_tokens"] or 0 for q in batches) / wall_time)
+        latencies = [q["latency_s"] for batches in trials.values() for q in batches]
+        dims = [q["embedding_dim"] for batches in trials.values() for q in batches if q.get("embedding_dim")]
+        return {
+            "embedding_batch_size": self.batch_size,
+            "embedding_concurrency": self.concurrency,
+            "embedding_dim": dims[0] if dims else None,
+            "docs_per_s": stats.mean(docs_s),
+            "embed_tokens_per_s": stats.mean(tokens_s),
+            "batch_latency_p50_s": stats.percentile(latencies, 50),
+            "batch_latency_p95_s": stats.percentile(latencies, 95),
+            "batch_latency_p99_s": stats.percentile(latencies, 99),
+        }
+
+
+class _EmbeddingWriter:
+    """
+    Writes embedding rows into a memory-mapped .npy file (float32). The file is created with
+    the first batch, once the embedding dimension is known; batches may arrive out of order.
+    """
+    def __init__(self, path: str, num_rows: int):
+        self.path = path
+        self.num_rows = num_rows
+        self._array = None
+        self._lock = threading.Lock()
+
+    def write(self, start: int, embeddings: list[list[float]]):
+        with self._lock:
+            if self._array is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._array = np.lib.format.open_memmap(self.path, mode="w+", dtype=np.float32,
+                                                        shape=(self.num_rows, len(embeddings[0])))
+        # Batches cover disjoint rows, so they can be written without holding the lock.
+        self._array[start:start + len(embeddings)] = np.asarray(embeddings, dtype=np.float32)
+
+    def close(self):
+        if self._array is not None:
+            self._array.flush()
+            logger.info(f"Embeddings written to {self.path}")
+            self._array = None
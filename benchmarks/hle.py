@@ -2,6 +2,9 @@
 from benchmarks.base_benchmark import BaseBenchmark
 
 class HLEAdapter(BaseBenchmark):
+    # Creative-writing responses are sent to the LLM judge in batches when `use_judge` is enabled.
+    scorer_batchable = True
+
     def __init__(self):
         super().__init__("Holistic Language Evaluation (HLE)")
         
@@ -17,7 +20,7 @@ class HLEAdapter(BaseBenchmark):
                 "id": "hle_creative_1",
                 "prompt": "Write a very short story (2-3 sentences) about a curious cat exploring a new room.",
                 "type": "creative_writing",
-                # Evaluation for creative tasks is harder, might be qualitative or use LLM-as-judge. For now, simple length check.
+                # Scored by the LLM judge when configured; otherwise by a simple length check.
                 "min_sentences": 2
             }
         ]
@@ -39,4 +42,15 @@ class HLEAdapter(BaseBenchmark):
             # Simple check: number of sentences (approx by periods, question marks, exclamations)
             sentences = model_response.count('.') + model_response.count('!') + model_response.count('?')
             return 1.0 if sentences >= question_data.get("min_sentences", 2) else 0.0
-        return 0.0 # Default score if type not handled
\ No newline at end of file
+        return 0.0 # Default score if type not handled
+
+    def evaluate_batch(self, model_responses: list[str], questions: list[dict]) -> list[tuple[float | None, dict]]:
+        results = super().evaluate_batch(model_responses, questions)
+        if self.judge is None:
+            return results
+        judged = [i for i, q in enumerate(questions) if q.get("type") == "creative_writing"]
+        if judged:
+            verdicts = self.judge_responses([model_responses[i] for i in judged], [questions[i] for i in judged])
+            for i, verdict in zip(judged, verdicts):
+                results[i] = verdict
+        return results
@@ -1,46 +1,129 @@
-# ollama_eval_project/benchmarks/live_code_bench_adapter.py
+import json
+import logging
 from benchmarks.base_benchmark import BaseBenchmark
-# For a real LiveCodeBench, you'd need a secure execution environment.
-# import subprocess
-# import tempfile
-# import os
+from utils.code_sandbox import extract_code, run_tests
+from utils.disk_cache import DiskCache, cache_key
+
+logger = logging.getLogger(__name__)
+
 
 class LiveCodeBenchAdapter(BaseBenchmark):
-    def __init__(self):
-        super().__init__("LiveCodeBench (Conceptual)")
-        # TODO: LiveCodeBench involves generating code and running it.
-        # This requires:
-        # 1. The LiveCodeBench dataset of problems.
-        # 2. A secure way to execute LLM-generated code (e.g., Docker containers).
-        # 3. Test cases for each problem to verify correctness.
-        print(f"NOTICE: {self.name} adapter is a conceptual stub. Full implementation is complex and requires a secure code execution environment.")
-        self.questions = [
-            {
-                "id": "lcb_python_q1",
-                "prompt": "Write a Python function `add(a, b)` that returns the sum of two numbers.",
-                "language": "python",
-                # For real evaluation, you'd have test cases like:
-                # "test_cases": [ {"input": (1, 2), "output": 3}, {"input": (-1, 1), "output": 0} ]
-                "expected_fragment_to_pass_test": "def add(a, b):\n    return a + b" # Very simplistic check
-            }
-        ]
+    """
+    Code generation graded by execution: the solution is extracted from the response and run
+    against the problem's test cases in sandboxed subprocesses (see `utils.code_sandbox`).
+
+    Problems are read from a JSON Lines file in LiveCodeBench's `code_generation_lite` format
+    (question_id, question_content, starter_code, public_test_cases, metadata with func_name).
+    Without a data file a built-in example problem is used. Execution results are cached by a
+    hash of the code and its tests, so re-scoring a known solution is instant.
+    """
+    scorer_cpu_heavy = True
+
+    def __init__(self,
+                 data_file: str | None = None,
+                 max_problems: int | None = None,
+                 timeout_s: float = 6.0,
+                 memory_mb: int = 512,
+                 isolate_network: bool = True,
+                 cache_file: str | None = "cache/scoring_cache.db"):
+        super().__init__("LiveCodeBench" if data_file else "LiveCodeBench (Example)")
+        self.data_file = data_file
+        self.max_problems = max_problems
+        self.timeout_s = timeout_s
+        self.memory_mb = memory_mb
+        self.isolate_network = isolate_network
+        self.cache = DiskCache(cache_file, namespace="code_execution") if cache_file else None
+        self.questions = []
 
     def get_questions(self):
-        print(f"WARNING: {self.name}.get_questions() uses a conceptual example.")
+        if not self.questions:
+            if self.data_file:
+                self.questions = self._load_data()
+            else:
+                logger.warning(f"{self.name} uses a built-in example problem; set data_file for the real dataset.")
+                self.questions = [{
+                    "id": "lcb_python_q1",
+                    "prompt": self._format_prompt(
+                        "Write a Python function `add(a, b)` that returns the sum of two numbers.",
+                        "def add(a, b):\n    pass"),
+                    "tests": [{"input": "1\n2", "output": "3", "testtype": "functional"},
+                              {"input": "-1\n1", "output": "0", "testtype": "functional"}],
+                    "fn_name": "add",
+                }]
         return self.questions
 
+    def _load_data(self) -> list[dict]:
+        questions = []
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                tests = item.get("public_test_cases") or []
+                if isinstance(tests, str):
+                    tests = json.loads(tests)
+                private_tests = item.get("private_test_cases")
+                if isinstance(private_tests, list):
+                    tests += private_tests
+                elif isinstance(private_tests, str) and private_tests.lstrip().startswith("["):
+                    tests += json.loads(private_tests)
+                # Compressed (pickled) private tests are not loaded: unpickling data files is unsafe.
+                metadata = item.get("metadata") or {}
+                if isinstance(metadata, str):
+                    metadata = json.loads(metadata or "{}")
+                if not tests:
+                    logger.warning(f"Problem on line {line_number} of {self.data_file} has no test cases. Skipping.")
+                    continue
+                questions.append({
+                    "id": item.get("question_id", f"lcb_{line_number}"),
+                    "subject": item.get("difficulty"),
+                    "prompt": self._format_prompt(item.get("question_content", ""), item.get("starter_code")),
+                    "tests": tests,
+                    "fn_name": metadata.get("func_name"),
+                })
+                if self.max_problems and len(questions) >= self.max_problems:
+                    break
+        logger.info(f"Loaded {len(questions)} problems from {self.data_file}")
+        return questions
+
+    @staticmethod
+    def _format_prompt(question: str, starter_code: str | None) -> str:
+        prompt = ("You will be given a question (problem specification) and will generate a correct Python program "
+                  f"that matches the specification and passes all tests.\n\nQuestion: {question}\n\n")
+        if starter_code:
+            prompt += ("You will use the following starter code to write the solution to the problem "
+                       f"and enclose your code within delimiters.\n```python\n{starter_code}\n```\n")
+        else:
+            prompt += ("Read the inputs from stdin, solve the problem and write the answer to stdout. "
+                       "Enclose your code within delimiters as follows.\n```python\n# YOUR CODE HERE\n```\n")
+        return prompt
+
     def evaluate(self, model_response: str, question_data: dict) -> (float | None):
-        # TODO: Implement code extraction, execution, and validation against test cases.
-        # This is highly complex and security-sensitive.
-        # - Extract the code block from model_response.
-        # - Write to a temporary file.
-        # - Run it (e.g., using subprocess in a sandboxed environment).
-        # - Capture output and compare against expected outputs from test cases.
-        print(f"WARNING: {self.name}.evaluate() uses a conceptual check for question ID {question_data.get('id')}.")
-        
-        # Simplistic check for demonstration: does the response contain the function definition?
-        # THIS IS NOT A REAL EVALUATION.
-        expected_fragment = question_data.get("expected_fragment_to_pass_test")
-        if expected_fragment and expected_fragment in model_response:
-            return 1.0 # Indicates the model likely produced the function definition
-        return 0.0
\ No newline at end of file
+        return self.evaluate_with_details(model_response, question_data)[0]
+
+    def evaluate_with_details(self, model_response: str, question_data: dict) -> tuple[float | None, dict]:
+        code = extract_code(model_response)
+        if code is None:
+            return 0.0, {"error": "no code found in response"}
+
+        key = cache_key(code, question_data["tests"], question_data.get("fn_name"), self.timeout_s, self.memory_mb)
+        result = self.cache.get(key) if self.cache else None
+        cached = result is not None
+        if result is None:
+            result = run_tests(code, question_data["tests"], fn_name=question_data.get("fn_name"),
+                               timeout_s=self.timeout_s, memory_mb=self.memory_mb,
+                               isolate_network=self.isolate_network)
+            if self.cache:
+                self.cache.set(key, result)
+        logger.debug("Question %s: %d/%d tests passed%s", question_data.get("id"), result["passed"], result["total"],
+                     " (cached)" if cached else "")
+        details = {"passed": result["passed"], "total": result["total"], "error": result["error"], "cached": cached,
+                   "metrics": {"exec_time_s": result["exec_time_s"]}}
+        return (1.0 if result["all_passed"] else 0.0), details
+
+    def summarize(self, question_results: list[dict]) -> dict:
+        """Adds the test execution time per problem, to set against the generation time."""
+        exec_times = [q["exec_time_s"] for q in question_results if q.get("exec_time_s") is not None]
+        if not exec_times:
+            return {}
+        return {"avg_exec_time_s": sum(exec_times) / len(exec_times), "total_exec_time_s": sum(exec_times)}
@@ -0,0 +1,120 @@
+import copy
+import random
+import logging
+from benchmarks.base_benchmark import BaseBenchmark
+from utils import stats
+
+logger = logging.getLogger(__name__)
+
+# Filler vocabulary for the haystack: plain sentences with no numbers, so the needle's passkey
+# is the only number in the prompt.
+_SUBJECTS = ["The river", "A quiet village", "The old library", "Every traveller", "The morning market",
+             "A tall lighthouse", "The northern forest", "Our neighbour", "The harbour crane", "A patient gardener"]
+_VERBS = ["watches over", "slowly changes", "remembers", "leans toward", "wanders past", "gathers",
+          "looks after", "quietly follows", "welcomes", "returns to"]
+_OBJECTS = ["the fields beyond the hill", "the colours of the season", "a stack of forgotten letters",
+            "the sound of distant bells", "the narrow stone bridge", "the smell of fresh bread",
+            "the edge of the valley", "a crowd of curious children", "the last light of the evening",
+            "the clouds drifting over the bay"]
+_CITIES = ["Oslo", "Lima", "Nairobi", "Hanoi", "Quito", "Tbilisi", "Perth", "Dakar", "Riga", "Cusco",
+           "Bergen", "Kyoto", "Porto", "Tunis", "Zagreb", "Austin"]
+
+# Rough tokens per filler word for common BPE tokenizers; the actual prompt token count
+# reported by the server is recorded per question.
+TOKENS_PER_WORD = 1.3
+
+
+class LongContextNeedle(BaseBenchmark):
+    """
+    Synthetic needle-in-a-haystack benchmark for long-context scaling.
+
+    Every question hides one passkey sentence at a given depth of a seeded filler text of about
+    `context_length` tokens and asks for it back. One variant runs per context length and
+    `num_ctx` setting, so each gets its own result entry with its own SystemMonitor run: the
+    report then shows retrieval accuracy, prompt-processing tokens/s, TTFT and peak RAM/VRAM
+    as the context grows.
+    """
+    def __init__(self,
+                 context_lengths: list[int] | None = None,
+                 num_ctx_values: list[int] | None = None,
+                 depths: list[float] | None = None,
+                 needles_per_depth: int = 2,
+                 seed: int = 42):
+        self.context_lengths = context_lengths or [2048, 8192, 32768]
+        self.num_ctx_values = num_ctx_values # None sizes num_ctx to each context length
+        self.depths = depths or [0.1, 0.5, 0.9]
+        self.needles_per_depth = needles_per_depth
+        self.seed = seed
+        self.context_length = self.context_lengths[0]
+        self.num_ctx = self._default_num_ctx(self.context_length)
+        super().__init__(self._variant_name())
+        self.questions = []
+
+    @staticmethod
+    def _default_num_ctx(context_length: int) -> int:
+        """Room for the haystack plus the instructions, the question and a short answer."""
+        return context_length + 512
+
+    def _variant_name(self) -> str:
+        return f"Long-Context Needle ({self.context_length} tokens, num_ctx={self.num_ctx})"
+
+    def get_variants(self) -> list[BaseBenchmark]:
+        """One variant per context length and num_ctx setting (each length gets a fitting num_ctx by default)."""
+        variants = []
+        for context_length in self.context_lengths:
+            for num_ctx in self.num_ctx_values or [self._default_num_ctx(context_length)]:
+                variant = copy.copy(self)
+                variant.context_length = context_length
+                variant.num_ctx = num_ctx
+                variant.name = variant._variant_name()
+                variant.questions = []
+                variants.append(variant)
+        return variants
+
+    def get_questions(self):
+        if not self.questions:
+            # Seeded by length, so every num_ctx setting of a length sees the same haystacks.
+            rng = random.Random(f"{self.seed}-{self.context_length}")
+            for depth in self.depths:
+                for n in range(self.needles_per_depth):
+                    city = rng.choice(_CITIES)
+                    passkey = str(rng.randint(10000, 99999))
+                    haystack = self._haystack(rng, depth, f"The secret passkey for {city} is {passkey}.")
+                    self.questions.append({
+                        "id": f"needle_{self.context_length}_{depth}_{n}",
+                        "subject": f"depth {depth:.0%}",
+                        "prompt": (f"Read the following text carefully.\n\n{haystack}\n\n"
+                                   f"What is the secret passkey for {city}? Answer with the number only."),
+                        "passkey": passkey,
+                        "depth": depth,
+                    })
+            logger.info(f"Generated {len(self.questions)} needle questions of ~{self.context_length} tokens.")
+        return self.questions
+
+    def _haystack(self, rng: random.Random, depth: float, needle: str) -> str:
+        num_words = int(self.context_length / TOKENS_PER_WORD)
+        sentences, words = [], 0
+        while words < num_words:
+            sentence = f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}."
+            sentences.append(sentence)
+            words += len(sentence.split())
+        sentences.insert(int(len(sentences) * depth), needle)
+        return " ".join(sentences)
+
+    def get_generation_overrides(self, question_data: dict) -> dict:
+        return {"options": {"num_ctx": self.num_ctx, "num_predict": 32}}
+
+    def evaluate(self, model_response: str, question_data: dict) -> (float | None):
+        return 1.0 if model_response and question_data["passkey"] in model_response else 0.0
+
+    def summarize(self, question_results: list[dict]) -> dict:
+        """
+        Tags the entry with its context length and the actual prompt size. Prompt tokens/s and the
+        median TTFT (robust to the model reload a num_ctx change causes) are in every result entry.
+        """
+        ok = [q for q in question_results if not q.get("error")]
+        return {
+            "context_length": self.context_length,
+            "num_ctx": self.num_ctx,
+            "avg_prompt_tokens": stats.mean([q["prompt_tokens"] for q in ok if q.get("prompt_tokens") is not None]),
+        }
@@ -1,77 +1,97 @@
-# ollama_eval_project/benchmarks/math_500_adapter.py
-from benchmarks.base_benchmark import BaseBenchmark
+import os
 import re
+import json
+import logging
+from benchmarks.base_benchmark import BaseBenchmark
+from utils.tracing import traced
+from utils.sampling import stratified_sample
+from utils.math_answers import extract_boxed, normalize_answer, EquivalenceChecker
+
+logger = logging.getLogger(__name__)
+
 
 class Math500Adapter(BaseBenchmark):
-    def __init__(self):
-        super().__init__("MATH-500 (Subset)")
-        # TODO: Full MATH-500 integration requires dataset and potentially specific parsing for answers.
-        # The MATH dataset problems are complex and often require step-by-step reasoning.
-        # Evaluation often involves checking the final numerical answer.
-        print(f"NOTICE: {self.name} adapter is a stub. Full implementation requires the MATH dataset and robust answer extraction.")
-        self.questions = [
-            {
-                "id": "math_q1",
-                "prompt": "Natalia sold clips to 48 of her friends in April, and then she sold half as many clips in May. How many clips did Natalia sell altogether in April and May?",
-                "latex_solution": "In April, Natalia sold 48 clips. In May, she sold half as many clips as in April, so she sold $48/2 = 24$ clips. Altogether, in April and May, she sold $48 + 24 = 72$ clips. The final answer is $\boxed{72}$.",
-                "numerical_answer": "72"
-            },
-            {
-                "id": "math_q2",
-                "prompt": "What is the value of $3 + 5 \\times 2$?",
-                "latex_solution": "$3 + 5 \\times 2 = 3 + 10 = 13$. The final answer is $\boxed{13}$.",
-                "numerical_answer": "13"
-            }
-            # Add more representative questions if developing further
-        ]
+    """
+    MATH-500 (HuggingFaceH4/MATH-500): competition math problems with LaTeX final answers.
+
+    The model's last \\boxed{...} answer is compared with the reference by normalization,
+    numeric comparison and, when sympy is installed, symbolic equivalence with a timeout per
+    comparison. Scoring runs in the pipeline's worker processes and every verdict is cached,
+    so repeated runs and models giving the same answer do not redo the algebra.
+    """
+    HF_DATASET_NAME = "HuggingFaceH4/MATH-500"
+    PROMPT_TEMPLATE = ("Solve the following math problem step by step. "
+                       "Put your final answer within \\boxed{{}}.\n\n{problem}")
+    scorer_cpu_heavy = True
+
+    def __init__(self,
+                 data_file: str | None = None,
+                 fraction: float | None = None,
+                 sampling_seed: int | None = 42,
+                 comparison_timeout_s: float = 5.0,
+                 cache_file: str | None = "cache/scoring_cache.db"):
+        super().__init__("MATH-500")
+        self.data_file = data_file
+        self.fraction = fraction
+        self.sampling_seed = sampling_seed
+        self.checker = EquivalenceChecker(cache_file=cache_file, timeout_s=comparison_timeout_s)
+        self.questions = []
 
     def get_questions(self):
-        print(f"WARNING: {self.name}.get_questions() uses example questions.")
+        if not self.questions:
+            items = self._load_data()
+            if self.fraction is not None and items:
+                # Stratified by subject so every area of the split stays represented.
+                items = stratified_sample(items, self.fraction, key="subject", seed=self.sampling_seed)
+            self.questions = [{
+                "id": item.get("unique_id") or f"math_{index}",
+                "subject": item.get("subject"),
+                "level": item.get("level"),
+                "prompt": self.PROMPT_TEMPLATE.format(problem=item["problem"]),
+                "answer": item.get("answer") or extract_boxed(item.get("solution", "")),
+            } for index, item in enumerate(items)]
+            logger.info(f"Total MATH-500 problems loaded: {len(self.questions)}")
         return self.questions
 
+    @traced("math500.load_data")
+    def _load_data(self) -> list[dict]:
+        """Reads the problems from `data_file` (JSON or JSON Lines) or else from the Hugging Face dataset/cache."""
+        if self.data_file:
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                if os.path.splitext(self.data_file)[1] == ".json":
+                    return json.load(f)
+                return [json.loads(line) for line in f if line.strip()]
+        try:
+            from datasets import load_dataset
+            return list(load_dataset(self.HF_DATASET_NAME, split="test"))
+        except Exception as e:
+            logger.error(f"Could not load {self.HF_DATASET_NAME} (set data_file to a local copy): {e}")
+            return []
+
+    @traced("math500.extract_answer")
     def _extract_answer(self, model_response: str) -> str | None:
-        """
-        A simple attempt to extract a final numerical answer.
-        Robust answer extraction from LLM math responses is a research problem.
-        This might look for "The final answer is X" or the last number in the response.
-        """
-        # Try to find numbers preceded by "answer is", "result is", etc.
-        patterns = [
-            r"answer is\s*([+-]?\d+\.?\d*)",
-            r"result is\s*([+-]?\d+\.?\d*)",
-            r"\boxed{([+-]?\d+\.?\d*)}", # LaTeX box
-            r"([+-]?\d+\.?\d*)\s*$", # Last number in the string
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, model_response, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        
-        # Fallback: find any number in the last line
-        last_line = model_response.strip().split('\n')[-1]
-        numbers = re.findall(r"([+-]?\d+\.?\d*)", last_line)
-        if numbers:
-            return numbers[-1]
-            
-        return None
+        """Takes the last \\boxed{} answer, falling back to "the (final) answer is X"."""
+        if not model_response:
+            return None
+        response = re.sub(r"<think>.*?</think>", "", model_response, flags=re.DOTALL | re.IGNORECASE)
+        boxed = extract_boxed(response)
+        if boxed is not None:
+            return boxed
+        match = re.findall(r"answer is:?\s*\$?([^\n$]+?)\$?\s*(?:\.\s*)?$", response, re.IGNORECASE | re.MULTILINE)
+        return match[-1].strip() if match else None
 
+    def extract_answer(self, model_response: str) -> str | None:
+        """The normalized final answer, so that spelling variants of one answer vote together."""
+        return normalize_answer(self._extract_answer(model_response)) or None
 
     def evaluate(self, model_response: str, question_data: dict) -> (float | None):
-        print(f"WARNING: {self.name}.evaluate() uses example logic for question ID {question_data.get('id')}.")
-        if not model_response:
-            return 0.0
-            
-        extracted_answer = self._extract_answer(model_response)
-        expected_answer = question_data.get("numerical_answer")
+        return self.evaluate_with_details(model_response, question_data)[0]
 
-        if extracted_answer is not None and expected_answer is not None:
-            try:
-                # Compare as floats if they might have decimals, or as integers
-                if "." in extracted_answer or "." in expected_answer:
-                    return 1.0 if abs(float(extracted_answer) - float(expected_answer)) < 1e-3 else 0.0
-                else:
-                    return 1.0 if int(extracted_answer) == int(expected_answer) else 0.0
-            except ValueError:
-                # Could not convert extracted answer to number
-                return 0.0
-        return 0.0
\ No newline at end of file
+    def evaluate_with_details(self, model_response: str, question_data: dict) -> tuple[float | None, dict]:
+        extracted = self._extract_answer(model_response)
+        expected = question_data.get("answer")
+        if extracted is None or expected is None:
+            return 0.0, {"expected": expected, "extracted": extracted}
+        verdict = self.checker.check(extracted, expected)
+        logger.debug("Question %s: expected '%s', got '%s' (%s)", question_data.get("id"), expected, extracted, verdict)
+        return (1.0 if verdict["equivalent"] else 0.0), {"expected": expected, "extracted": extracted, **verdict}
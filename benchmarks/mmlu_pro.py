@@ -1,7 +1,11 @@
 from benchmarks.base_benchmark import BaseBenchmark
 from datasets import load_dataset
+from utils.tracing import traced
+from utils.sampling import seeded_sample
+from utils.core_set import load_core_set, predict_from_core_set
 import re
 import ast # For safely evaluating string representation of lists from CSVs (if ever used as fallback)
+import copy
 import json
 import logging
 import math
@@ -19,23 +23,47 @@ class MMLUPro(BaseBenchmark):
     COL_ANSWER_INDEX = 'answer_index' # The 0-based index
     COL_CATEGORY = 'category' # Subject identifier
 
+    ANSWER_MODES = ("free", "constrained", "both")
+    # Generation limits of the constrained mode: '{"Answer": "C"' is well under 16 tokens, and the
+    # closing brace ends generation (the answer is read with CONSTRAINED_ANSWER_RE).
+    CONSTRAINED_NUM_PREDICT = 16
+    CONSTRAINED_STOP = ["}"]
+    CONSTRAINED_ANSWER_RE = re.compile(r'"Answer"\s*:\s*"([A-J])"')
+
     def __init__(self,
                  subjects: list[str] | None = None,
                  data_split: str = "test",
-                 percentage_per_subject: float | None = None):
-        super().__init__(f"MMLU-Pro ({data_split})")
+                 percentage_per_subject: float | None = None,
+                 sampling_seed: int | None = 42,
+                 core_set: str | None = None,
+                 answer_mode: str = "free"):
+        if answer_mode not in self.ANSWER_MODES:
+            raise ValueError(f"Unknown answer_mode '{answer_mode}', expected one of {self.ANSWER_MODES}")
+        self.base_name = f"MMLU-Pro ({data_split})" + (" [core set]" if core_set else "")
+        super().__init__(self.base_name + (" [constrained]" if answer_mode == "constrained" else ""))
 
 
         self.subjects_to_run_filter = subjects
         self.data_split = data_split
         self.percentage_per_subject = percentage_per_subject
-        self.questions = [] # Cache for loaded questions
+        self.sampling_seed = sampling_seed # None takes the first N questions of each subject
+        self.core_set = load_core_set(core_set) if core_set else None
+        self.core_weights = {item["question_id"]: item["weight"] for item in self.core_set["items"]} if self.core_set else {}
+        self.answer_mode = answer_mode
+        self._question_cache = {} # Loaded questions, shared with the answer-mode variants
 
         notice_msg = f"NOTICE: {self.name} adapter initialized for HF dataset ({self.HF_DATASET_NAME}, default config)."
         if self.subjects_to_run_filter:
             notice_msg += f" Will filter for specified subjects: {self.subjects_to_run_filter}."
+        if self.answer_mode != "free":
+            notice_msg += f" Answer mode: {self.answer_mode}."
+        if self.core_set:
+            bound = self.core_set.get('error_bound_pp')
+            notice_msg += (f" Using a core set of {len(self.core_set['items'])} questions"
+                           f" (validated error bound: {f'{bound:.2f} pp' if bound is not None else 'unknown'}).")
         logging.info(notice_msg)
 
+    @traced("mmlu_pro.format_prompt")
     def _format_prompt(self, subject: str, question_text: str, options: dict) -> str:
         """
         Formats a one-shot prompt to provide a clear example for the model.}
@@ -72,6 +100,7 @@ Now, solve the following question:
         
         return f"{one_shot_example}\n{prompt.strip()}"
 
+    @traced("mmlu_pro.load_data")
     def _load_data(self):
         loaded_questions = []
         logging.info(f"Loading data for {self.HF_DATASET_NAME} (split: {self.data_split}, config: 'default')...")
@@ -109,11 +138,18 @@ Now, solve the following question:
                 
                 num_questions_total = len(items_in_subject)
 
-                if self.percentage_per_subject is not None:
+                if self.core_set is not None:
+                    current_subject_items_to_load = [
+                        item for item in items_in_subject
+                        if f"{subject_name}_{item.get(self.COL_QUESTION_ID)}" in self.core_weights
+                    ]
+                    logger.info(f"Core set: {len(current_subject_items_to_load)} of {num_questions_total} questions for subject '{subject_name}'.")
+                elif self.percentage_per_subject is not None:
                     percentage = max(0.0, min(100.0, self.percentage_per_subject))
                     num_to_take = math.ceil(num_questions_total * (percentage / 100.0))
                     logger.info(f"Limiting to {percentage}% ({num_to_take} of {num_questions_total}) questions for subject '{subject_name}'.")
-                    current_subject_items_to_load = items_in_subject[:num_to_take]
+                    # Seeded random sample within each subject (stratified by subject).
+                    current_subject_items_to_load = seeded_sample(items_in_subject, num_to_take, self.sampling_seed, stratum=subject_name)
                 else:
                     logger.info(f"No percentage Limit set, Loading all {num_questions_total} questions for subject '{subject_name}'.")
                     percentage_per_subject = 100.0
@@ -199,10 +235,64 @@ Now, solve the following question:
         return loaded_questions
 
     def get_questions(self):
-        if not self.questions: # Load data only once
-            self.questions = self._load_data()
-        return self.questions
-
+        if "questions" not in self._question_cache: # Load data only once
+            self._question_cache["questions"] = self._load_data()
+        return self._question_cache["questions"]
+
+    def get_variants(self) -> list[BaseBenchmark]:
+        """In "both" answer mode, runs the free-form and the constrained variant on the same questions."""
+        if self.answer_mode != "both":
+            return [self]
+        variants = []
+        for mode in ("free", "constrained"):
+            variant = copy.copy(self)
+            variant.answer_mode = mode
+            variant.name = self.base_name + (" [constrained]" if mode == "constrained" else "")
+            variants.append(variant)
+        return variants
+
+    def get_generation_overrides(self, question_data: dict) -> dict:
+        """
+        In constrained mode, restricts the output to {"Answer": <letter>} with Ollama's structured
+        outputs (a JSON schema whose enum holds the question's option letters) and caps its length.
+        """
+        if self.answer_mode != "constrained":
+            return {}
+        letters = [letter for letter, text in question_data["options"].items() if text is not None]
+        return {
+            "format": {
+                "type": "object",
+                "properties": {"Answer": {"type": "string", "enum": letters}},
+                "required": ["Answer"],
+            },
+            "options": {"num_predict": self.CONSTRAINED_NUM_PREDICT, "stop": self.CONSTRAINED_STOP},
+        }
+
+    def summarize(self, question_results: list[dict]) -> dict:
+        """
+        Tags the entry with its answer mode; with a core set, also replaces the score by the
+        predicted full-split score.
+        """
+        summary = {"answer_mode": self.answer_mode, "variant_of": self.base_name}
+        if self.core_set is None:
+            return summary
+        responses = {}
+        for q in question_results:
+            if q.get("score") is not None:
+                responses.setdefault(str(q["question_id"]), []).append(q["score"])
+        responses = {qid: sum(v) / len(v) for qid, v in responses.items()}
+        predicted = predict_from_core_set(self.core_set, responses)
+        if predicted is None:
+            return summary
+        return {
+            **summary,
+            "score": predicted,
+            "core_set_raw_score": sum(responses.values()) / len(responses) * 100,
+            "core_set_error_bound_pp": self.core_set.get("error_bound_pp"),
+            "core_set_estimator": self.core_set.get("estimator"),
+        }
+
+    @traced("mmlu_pro.extract_choice")
     def _extract_choice(self, model_response: str) -> str | None:
         if not model_response:
             return None
@@ -229,41 +319,49 @@ Now, solve the following question:
                             if isinstance(value, str) and len(value) == 1 and 'A' <= value.upper() <= 'J':
                                 return value.upper()
                             else:
-                                logger.warning(f"Found answer key, but value '{value}' is not a valid choice.")
+                                logger.warning("Found answer key, but value '%s' is not a valid choice.", value)
                                 return None
                     #logger.warning(f"JSON response did not contain an 'Answer' key. Response: {parsed_json}")
                     #return None
         except (json.JSONDecodeError, Exception):
             # If JSON parsing fails, pass silently to the next fallback method.
-            logger.debug("Full JSON parsing failed, attempting fallback methods.Attempted reponse: {processed_response}")
+            logger.debug("Full JSON parsing failed, attempting fallback methods. Attempted response: %s", processed_response)
             pass
         
         # 3. Fallback A: Targeted regex for malformed/incomplete JSON.
         # This looks specifically for the "Answer": "X" pattern.
         match = re.search(r'["\']Answer["\']\s*:\s*["\']([A-J])["\']', processed_response, re.IGNORECASE)
         if match:
-            logger.debug(f"Extracted '{match.group(1).upper()}' using targeted JSON regex fallback.")
+            logger.debug("Extracted '%s' using targeted JSON regex fallback.", match.group(1).upper())
             return match.group(1).upper()
 
         # 4. Fallback B: Regex for natural language answers
         match = re.search(r"(?:correct|answer|option)\s+(?:is|was)\s*:?\s*\(?([A-J])\)?", processed_response, re.IGNORECASE)
         if match:
-            logger.debug(f"Extracted '{match.group(1).upper()}' using natural language regex.")
+            logger.debug("Extracted '%s' using natural language regex.", match.group(1).upper())
             return match.group(1).upper()
 
         match = re.match(r"\s*([A-J])(?:[.)\s]|$)", processed_response)
         if match:
-            logger.debug(f"Extracted '{match.group(1).upper()}' using start-of-string choice regex.")
+            logger.debug("Extracted '%s' using start-of-string choice regex.", match.group(1).upper())
             return match.group(1).upper()
             
-        logger.warning(f"Could not extract a valid choice from response: '{processed_response[:100]}...'")
+        logger.warning("Could not extract a valid choice from response: '%.100s...'", processed_response)
         return None
 
     def evaluate(self, model_response: str, question_data: dict) -> (float | None):
-        extracted_choice = self._extract_choice(model_response)
+        return self.evaluate_with_details(model_response, question_data)[0]
+
+    def extract_answer(self, model_response: str) -> str | None:
+        match = self.CONSTRAINED_ANSWER_RE.search(model_response or "") if self.answer_mode == "constrained" else None
+        return match.group(1) if match else self._extract_choice(model_response)
+
+    def evaluate_with_details(self, model_response: str, question_data: dict) -> tuple[float | None, dict]:
+        extracted_choice = self.extract_answer(model_response)
         correct_answer = question_data.get("correct_answer_char")
-        logging.info(f"Evaluating question {question_data['id']}: Expected '{correct_answer}', Got '{extracted_choice}'")
-        if correct_answer == "INVALID_ANSWER": return 0.0
-        if extracted_choice is None: return 0.0
-        if extracted_choice == correct_answer: return 1.0
-        return 0.0
\ No newline at end of file
+        logger.debug("Evaluating question %s: Expected '%s', Got '%s'", question_data['id'], correct_answer, extracted_choice)
+        details = {"expected": correct_answer, "extracted": extracted_choice}
+        if correct_answer == "INVALID_ANSWER": return 0.0, details
+        if extracted_choice is None: return 0.0, details
+        if extracted_choice == correct_answer: return 1.0, details
+        return 0.0, details
\ No newline at end of file
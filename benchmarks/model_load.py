@@ -0,0 +1,119 @@
+import time
+import logging
+
+from ollama_client import generate, unload_model, list_loaded_models
+from benchmarks.base_benchmark import BaseBenchmark
+from utils.monitoring import SystemMonitor
+from utils import stats
+
+logger = logging.getLogger(__name__)
+
+
+class ModelLoadProfile(BaseBenchmark):
+    """
+    Cold-start vs warm-state profiling, for setups that hot-swap models on shared GPUs.
+
+    Every trial first unloads the model (`keep_alive: 0`) and waits until Ollama no longer lists
+    it as loaded. Then one cold request measures the model load time, the time to the first
+    response and the RAM/VRAM the load added (SystemMonitor snapshots before and after), and
+    `warm_requests` more requests with the same short prompt measure the warm-state latency.
+    Run with several trials (`evaluation.trials`) to see how repeatable the load time is.
+
+    Questions carry the phase ("cold" or "warm") as their subject, so the per-subject breakdown
+    shows the two phases side by side. A response scores 1.0 when it is not empty.
+    """
+    def __init__(self,
+                 models: list[str] | None = None,
+                 prompt: str = "Reply with the single word: ready.",
+                 warm_requests: int = 5,
+                 num_predict: int = 16,
+                 keep_alive: str = "5m",
+                 unload_timeout_s: float = 30.0,
+                 settle_s: float = 2.0):
+        super().__init__("Model Load Profile")
+        self.models = models or None # None runs the configured models
+        self.prompt = prompt
+        self.warm_requests = warm_requests
+        self.num_predict = num_predict
+        self.keep_alive = keep_alive # Keeps the model loaded between the cold and warm requests
+        self.unload_timeout_s = unload_timeout_s
+        self.settle_s = settle_s # Pause before the memory baseline, while freed memory is returned
+        self.questions = []
+
+    def get_questions(self):
+        if not self.questions:
+            self.questions = [{"id": i, "subject": "cold" if i == 0 else "warm", "prompt": self.prompt}
+                              for i in range(1 + self.warm_requests)]
+        return self.questions
+
+    def evaluate(self, model_response: str, question_data: dict) -> (float | None):
+        return 1.0 if model_response and model_response.strip() else 0.0
+
+    def _wait_until_unloaded(self, model_name: str) -> bool:
+        deadline = time.perf_counter() + self.unload_timeout_s
+        while time.perf_counter() < deadline:
+            loaded, error = list_loaded_models()
+            if error is None and model_name not in loaded:
+                return True
+            time.sleep(0.5)
+        return False
+
+    def run_questions(self, model_name: str, questions: list[dict], model_options: dict, trial: int = 0) -> list[dict]:
+        """Unloads the model, then sends the cold request followed by the warm ones."""
+        monitor = SystemMonitor()
+        error = unload_model(model_name)
+        if error is None and not self._wait_until_unloaded(model_name):
+            error = f"{model_name} was still loaded after {self.unload_timeout_s:.0f} s"
+        if error:
+            logger.warning(f"Cold-start measurement of {model_name} may include a loaded model: {error}")
+        time.sleep(self.settle_s)
+        baseline = monitor.sample()
+
+        options = {**model_options, "num_predict": self.num_predict}
+        results = []
+        for q_data in questions:
+            response = generate(model_name, q_data["prompt"], options, keep_alive=self.keep_alive)
+            cold = q_data["subject"] == "cold"
+            loaded = monitor.sample() if cold else None
+            results.append({
+                "question_id": q_data["id"],
+                "subject": q_data["subject"],
+                "trial": trial,
+                "score": None if response["error"] else self.evaluate(response["text"], q_data),
+                "tokens_s": response["tokens_per_second"],
+                "latency_s": response["latency_s"],
+                "ttft_s": response["ttft_s"],
+                "prompt_tokens": response["prompt_tokens"],
+                "output_tokens": response["output_tokens"],
+                "error": response["error"],
+                "error_class": response.get("error_class"),
+                "attempts": response.get("attempts", 1),
+                "load_duration_s": response["load_duration_s"],
+                "unloaded": cold and error is None,
+                "ram_increase_gb": loaded["ram_used_gb"] - baseline["ram_used_gb"] if loaded else None,
+                "vram_increase_gb": loaded["gpu_mem_used_gb"] - baseline["gpu_mem_used_gb"] if loaded else None,
+            })
+        return results
+
+    def summarize(self, question_results: list[dict]) -> dict:
+        """Cold load time (mean and range over trials), time to first response, memory added by the load and warm latency."""
+        answered = [q for q in question_results if not q.get("error")]
+        # Trials where the unload did not go through measured a warm model; leave them out.
+        cold = [q for q in answered if q["subject"] == "cold" and q.get("unloaded")]
+        warm = [q for q in answered if q["subject"] == "warm"]
+        load_times = [q["load_duration_s"] for q in cold if q.get("load_duration_s") is not None]
+        cold_latency = stats.mean([q["latency_s"] for q in cold])
+        warm_latency = stats.median([q["latency_s"] for q in warm])
+        return {
+            "cold_trials": len(cold),
+            "cold_load_s": stats.mean(load_times),
+            "cold_load_min_s": min(load_times) if load_times else None,
+            "cold_load_max_s": max(load_times) if load_times else None,
+            "cold_ttft_s": stats.mean([q["ttft_s"] for q in cold if q.get("ttft_s") is not None]),
+            "cold_first_response_s": cold_latency,
+            "load_ram_increase_gb": stats.mean([q["ram_increase_gb"] for q in cold]),
+            "load_vram_increase_gb": stats.mean([q["vram_increase_gb"] for q in cold]),
+            "warm_latency_s": warm_latency,
+            "warm_ttft_s": stats.median([q["ttft_s"] for q in warm if q.get("ttft_s") is not None]),
+            "cold_start_penalty_s": cold_latency - warm_latency if cold_latency is not None and warm_latency is not None else None,
+        }
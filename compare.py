@@ -0,0 +1,74 @@
+import sys
+import yaml
+import logging
+import argparse
+
+from utils.results_store import ResultsStore
+from utils.regression import compare_runs, format_findings
+
+logger = logging.getLogger(__name__)
+
+
+def print_findings(findings: list[dict], baseline_label: str, current_label: str) -> bool:
+    """
+    Prints the comparison table and a verdict.
+
+    Returns:
+        bool: True if any regression was found.
+    """
+    print(f"\n--- REGRESSION CHECK: {current_label} vs baseline {baseline_label} ---")
+    if not findings:
+        print("No comparable model/benchmark pairs found.")
+        return False
+    print(format_findings(findings))
+    regressions = [f for f in findings if f["regression"]]
+    if regressions:
+        print(f"{len(regressions)} significant regression(s) detected.")
+    else:
+        print("No significant regressions detected.")
+    return bool(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare a stored run against a baseline and exit non-zero on significant regressions.")
+    parser.add_argument('--baseline', required=True, help='Baseline run ID or tag.')
+    parser.add_argument('--current', default='latest', help='Current run ID or tag (default: latest run).')
+    parser.add_argument('--config', type=str, default='config.yaml', help='Path to the configuration file.')
+    parser.add_argument('--db', type=str, help='Results database (default: results_store.path from the config).')
+    parser.add_argument('--alpha', type=float, help='Significance level of the statistical tests.')
+    parser.add_argument('--min-relative-change', type=float,
+                        help='Smallest relative throughput/latency/energy change that counts as a regression (e.g. 0.05).')
+    parser.add_argument('--min-accuracy-drop', type=float,
+                        help='Smallest accuracy drop, in percentage points, that counts as a regression.')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    try:
+        with open(args.config, 'r') as f:
+            config = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        config = {}
+
+    thresholds = dict(config.get('regression') or {})
+    for key in ('alpha', 'min_relative_change', 'min_accuracy_drop'):
+        if getattr(args, key) is not None:
+            thresholds[key] = getattr(args, key)
+
+    db_path = args.db or (config.get('results_store') or {}).get('path', 'results.db')
+    with ResultsStore(db_path) as store:
+        baseline_id = store.resolve_run(args.baseline)
+        current_id = store.resolve_run(args.current)
+        if baseline_id is None or current_id is None:
+            missing = args.baseline if baseline_id is None else args.current
+            logger.error(f"Run '{missing}' not found in {db_path}.")
+            sys.exit(2)
+        baseline_results = store.get_run_results(baseline_id, include_questions=True)
+        current_results = store.get_run_results(current_id, include_questions=True)
+
+    findings = compare_runs(baseline_results, current_results, thresholds)
+    sys.exit(1 if print_findings(findings, baseline_id, current_id) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+import io
+import os
+import re
+import sys
+import hmac
+import json
+import uuid
+import secrets
+import yaml
+import logging
+import argparse
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from main import setup_logging, load_backends, load_benchmarks, load_reporters, run_and_report, new_run_id
+from ollama_client import get_model_sizes
+from utils.monitoring import device_memory_gb
+from utils.planner import plan_run
+from utils.progress import ProgressDisplay
+from utils.results_store import ResultsStore
+from utils import request_policy
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    One submitted evaluation: a full config (the daemon's own, a config file, or either with some
+    top-level sections replaced), the models to run and the memory the largest of them needs.
+    """
+    def __init__(self, config: dict, models: list[str], tag: str | None = None, exclusive: bool = True,
+                 memory_gb: float | None = None):
+        self.job_id = uuid.uuid4().hex[:8]
+        self.config = config
+        self.models = models
+        self.tag = tag
+        self.exclusive = exclusive
+        self.memory_gb = memory_gb # None if unknown; such jobs always run alone
+        self.status = "queued" # queued -> running -> finished | failed, or queued -> cancelled
+        self.submitted_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.run_id = None
+        self.error = None
+        self.num_results = None
+        self.co_scheduled_with = set() # Jobs that ran at the same time (their timings affect each other)
+        self.progress = None
+
+    def to_dict(self) -> dict:
+        def iso(value):
+            return value.isoformat(timespec="seconds") if value else None
+
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "models": self.models,
+            "tag": self.tag,
+            "exclusive": self.exclusive,
+            "memory_gb": round(self.memory_gb, 2) if self.memory_gb is not None else None,
+            "submitted_at": iso(self.submitted_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+            "run_id": self.run_id,
+            "num_results": self.num_results,
+            "error": self.error,
+            "co_scheduled_with": sorted(self.co_scheduled_with),
+        }
+
+
+class JobScheduler:
+    """
+    Runs submitted jobs in submission order on one inference box.
+
+    A job starts when nothing else runs, or - if neither it nor any running job is exclusive -
+    when the memory of all running jobs plus its own fits into `capacity_gb`. Otherwise it waits,
+    and so do the jobs behind it, so a large job is never starved by a stream of small ones.
+    Jobs are exclusive by default, because co-scheduled jobs share the GPU and slow each other down.
+    """
+    def __init__(self, capacity_gb: float, run_job, poll_interval_s: float = 1.0):
+        """
+        Args:
+            capacity_gb (float): Memory available for models (VRAM, or RAM without a GPU).
+            run_job (callable): Runs one job: run_job(job) -> number of result entries.
+            poll_interval_s (float): How often the queue is re-checked without any event.
+        """
+        self.capacity_gb = capacity_gb
+        self.run_job = run_job
+        self.poll_interval_s = poll_interval_s
+        self._jobs = {}
+        self._queue = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def submit(self, job: Job) -> Job:
+        with self._condition:
+            self._jobs[job.job_id] = job
+            self._queue.append(job)
+            self._condition.notify()
+        logger.info(f"Job {job.job_id} queued: {', '.join(job.models)} (est. {job.to_dict()['memory_gb']} GB, "
+                    f"{'exclusive' if job.exclusive else 'shared'})")
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a queued job; running jobs cannot be cancelled."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                return False
+            job.status = "cancelled"
+            job.finished_at = datetime.now()
+            self._queue.remove(job)
+            self._condition.notify()
+        logger.info(f"Job {job_id} cancelled.")
+        return True
+
+    def get(self, job_id: str) -> Job | None:
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        with self._condition:
+            return list(self._jobs.values())
+
+    def can_start(self, job: Job) -> bool:
+        running = [j for j in self._jobs.values() if j.status == "running"]
+        if not running:
+            return True
+        if job.exclusive or job.memory_gb is None:
+            return False
+        if any(j.exclusive or j.memory_gb is None for j in running):
+            return False
+        return sum(j.memory_gb for j in running) + job.memory_gb <= self.capacity_gb
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="job-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        with self._condition:
+            while self._running:
+                while self._queue and self.can_start(self._queue[0]):
+                    job = self._queue.pop(0)
+                    running = [j for j in self._jobs.values() if j.status == "running"]
+                    for other in running:
+                        other.co_scheduled_with.add(job.job_id)
+                        job.co_scheduled_with.add(other.job_id)
+                    job.status = "running"
+                    job.started_at = datetime.now()
+                    threading.Thread(target=self._run, args=(job,), name=f"job-{job.job_id}", daemon=True).start()
+                self._condition.wait(self.poll_interval_s)
+
+    def _run(self, job: Job):
+        logger.info(f"Job {job.job_id} started.")
+        try:
+            num_results = self.run_job(job)
+            status, error = "finished", None
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+            num_results, status, error = None, "failed", str(e)
+        with self._condition:
+            job.num_results = num_results
+            job.status = status
+            job.error = error
+            job.finished_at = datetime.now()
+            self._condition.notify()
+        logger.info(f"Job {job.job_id} {status}.")
+
+
+def job_models(config: dict, models: list[str] | None = None) -> list[str]:
+    """The models a job loads: its own (or the config's) plus any benchmark-specific ones."""
+    names = list(models or config.get('models_to_evaluate') or [])
+    for params in (config.get('benchmarks') or {}).values():
+        if params.get('enabled'):
+            names += [m for m in params.get('models') or [] if m not in names]
+    return names
+
+
+def estimate_memory_gb(models: list[str], model_sizes: dict, overhead: float = 1.2) -> float | None:
+    """
+    The memory of the largest model (models are evaluated one after another), with `overhead`
+    for the KV cache and runtime buffers. None if the size of any model is unknown.
+    """
+    sizes = [model_sizes.get(model) for model in models]
+    if not sizes or None in sizes:
+        return None
+    return max(sizes) * overhead / 1024**3
+
+
+# Config sections a job may replace. The others name files the daemon would read or write
+# (results_store, logging, reporters, tracing) or servers it would send prompts to (backends, judge).
+JOB_CONFIG_SECTIONS = {"models_to_evaluate", "model_options", "evaluation", "benchmarks", "self_consistency"}
+# Benchmark parameters that are paths (data_file, cache_file, output_dir, core_set, ...).
+_PATH_PARAMETER = re.compile(r"(_file|_dir|_path)$|^core_set$")
+
+
+def _check_overrides(overrides: dict):
+    """Raises ValueError for config overrides a job may not make (see JOB_CONFIG_SECTIONS)."""
+    if not isinstance(overrides, dict):
+        raise ValueError("\"config\" must be an object of config sections.")
+    forbidden = sorted(set(overrides) - JOB_CONFIG_SECTIONS)
+    if forbidden:
+        raise ValueError(f"Jobs may not override {', '.join(forbidden)} "
+                         f"(allowed: {', '.join(sorted(JOB_CONFIG_SECTIONS))}).")
+    for name, params in (overrides.get('benchmarks') or {}).items():
+        if not isinstance(params or {}, dict):
+            raise ValueError(f"The parameters of {name} must be an object.")
+        paths = sorted(key for key in (params or {}) if _PATH_PARAMETER.search(key))
+        if paths:
+            raise ValueError(f"Jobs may not set paths ({', '.join(paths)} of {name}).")
+
+
+def create_job(request: dict, base_config: dict, overhead: float = 1.2, exclusive_by_default: bool = True,
+               config_dir: str | None = None) -> Job:
+    """
+    Builds a job from a submission:
+    {"config_path": str, "config": {section: ...}, "models": [...], "tag": str, "exclusive": bool}
+    (all optional). Top-level sections in "config" (only those in JOB_CONFIG_SECTIONS) replace those
+    of the config file or the daemon's config. "config_path" must name a file in `config_dir`.
+
+    Raises:
+        ValueError: If the config file is not allowed or cannot be read, an override is not allowed
+            or no models are given.
+    """
+    config = base_config
+    if request.get('config_path'):
+        if not config_dir:
+            raise ValueError("Config files are disabled (set daemon.job_config_dir).")
+        path = os.path.realpath(os.path.join(config_dir, request['config_path']))
+        if os.path.dirname(path) != os.path.realpath(config_dir):
+            raise ValueError(f"Config file {request['config_path']} is not in {config_dir}.")
+        try:
+            with open(path, 'r') as f:
+                config = yaml.safe_load(f) or {}
+        except OSError as e:
+            raise ValueError(f"Cannot read config file {request['config_path']}: {e}")
+    overrides = request.get('config') or {}
+    _check_overrides(overrides)
+    config = {**config, **overrides}
+    models = request.get('models') or config.get('models_to_evaluate') or []
+    if not models:
+        raise ValueError("No models given in the job or its config.")
+    memory_gb = estimate_memory_gb(job_models(config, models), get_model_sizes(), overhead)
+    return Job(config, models, tag=request.get('tag'), exclusive=request.get('exclusive', exclusive_by_default),
+               memory_gb=memory_gb)
+
+
+def run_config_job(job: Job) -> int:
+    """Runs a job through the same pipeline as `main.py`: results database, then the configured reporters."""
+    config = job.config
+    backends = load_backends(config)
+    if not all(backend.check_connection() for backend in backends):
+        raise RuntimeError("An inference backend is not reachable.")
+    benchmarks = load_benchmarks(config)
+    results_db = (config.get('results_store') or {}).get('path', 'results.db')
+    with ResultsStore(results_db) as store:
+        plan = plan_run(job.models, benchmarks, backends, store, config.get('evaluation'))
+    job.progress = ProgressDisplay(plan, stream=io.StringIO())
+
+    run_started_at = datetime.now()
+    job.run_id = new_run_id(run_started_at)
+    logger.info(f"Job {job.job_id}: run ID {job.run_id}")
+    results = run_and_report(config, job.models, benchmarks, backends, load_reporters(config, results_db),
+                             job.run_id, run_started_at, tag=job.tag, progress=job.progress,
+                             co_scheduled_with=job.co_scheduled_with)
+    return len(results)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    The job API. Every response is JSON. All endpoints but /health need the daemon's shared
+    secret in the X-Auth-Token header.
+    """
+    JOB_PATH = re.compile(r"^/jobs/([0-9a-f]+)(/progress)?$")
+    TOKEN_HEADER = "X-Auth-Token"
+
+    def _authorized(self) -> bool:
+        token = self.headers.get(self.TOKEN_HEADER) or ""
+        if hmac.compare_digest(token.encode("utf-8"), self.server.token.encode("utf-8")):
+            return True
+        self._send(401, {"error": f"Missing or wrong {self.TOKEN_HEADER} header."})
+        return False
+
+    def do_GET(self):
+        scheduler = self.server.scheduler
+        if self.path == "/health":
+            return self._send(200, {"status": "ok", "capacity_gb": round(scheduler.capacity_gb, 2)})
+        if not self._authorized():
+            return
+        if self.path == "/jobs":
+            return self._send(200, [job.to_dict() for job in scheduler.jobs()])
+        match = self.JOB_PATH.match(self.path)
+        job = scheduler.get(match.group(1)) if match else None
+        if job is None:
+            return self._send(404, {"error": "Not found"})
+        if match.group(2):
+            return self._send(200, {"job_id": job.job_id, "status": job.status,
+                                    **(job.progress.snapshot() if job.progress else {})})
+        return self._send(200, job.to_dict())
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path != "/jobs":
+            return self._send(404, {"error": "Not found"})
+        if self.headers.get_content_type() != "application/json":
+            return self._send(415, {"error": "Jobs must be sent as application/json."})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("The job must be a JSON object.")
+            job = create_job(request, self.server.base_config, **self.server.job_defaults)
+        except (ValueError, json.JSONDecodeError) as e:
+            return self._send(400, {"error": str(e)})
+        self.server.scheduler.submit(job)
+        self._send(202, job.to_dict())
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        match = self.JOB_PATH.match(self.path)
+        if not match or match.group(2):
+            return self._send(404, {"error": "Not found"})
+        if not self.server.scheduler.cancel(match.group(1)):
+            return self._send(409, {"error": "Only queued jobs can be cancelled."})
+        self._send(200, self.server.scheduler.get(match.group(1)).to_dict())
+
+    def _send(self, status: int, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class EvaluationServer(ThreadingHTTPServer):
+    """HTTP server exposing a `JobScheduler` (see `_RequestHandler` for the endpoints)."""
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], scheduler: JobScheduler, base_config: dict, token: str,
+                 job_defaults: dict | None = None):
+        if not token:
+            raise ValueError("The daemon needs a shared secret.")
+        super().__init__(address, _RequestHandler)
+        self.scheduler = scheduler
+        self.token = token
+        self.base_config = base_config
+        self.job_defaults = job_defaults or {}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run evaluations as a local service: submit jobs over HTTP and let one scheduler share the GPU.")
+    parser.add_argument('--config', type=str, default='config.yaml', help='Default configuration for submitted jobs.')
+    parser.add_argument('--host', type=str, help='Address to listen on (default: daemon.host from the config).')
+    parser.add_argument('--port', type=int, help='Port to listen on (default: daemon.port from the config).')
+    args = parser.parse_args()
+
+    try:
+        with open(args.config, 'r') as f:
+            config = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        setup_logging()
+        logging.error(f"Configuration file not found at {args.config}")
+        sys.exit(1)
+    setup_logging(config.get('logging') or {})
+    request_policy.configure(config.get('request_policy')) # Shared by all jobs, like the circuit breakers
+
+    daemon_config = config.get('daemon') or {}
+    capacity_gb = daemon_config.get('memory_gb') or device_memory_gb()
+    scheduler = JobScheduler(capacity_gb, run_config_job, daemon_config.get('poll_interval_s', 1.0))
+    job_defaults = {"overhead": daemon_config.get('memory_overhead', 1.2),
+                    "exclusive_by_default": daemon_config.get('exclusive_by_default', True),
+                    "config_dir": daemon_config.get('job_config_dir')}
+    token = os.environ.get('LLMPCBENCH_DAEMON_TOKEN') or daemon_config.get('token')
+    generated = not token
+    if generated:
+        token = secrets.token_urlsafe(24)
+    address = (args.host or daemon_config.get('host', '127.0.0.1'), args.port or daemon_config.get('port', 8765))
+    server = EvaluationServer(address, scheduler, config, token, job_defaults)
+    scheduler.start()
+    logging.info(f"Evaluation daemon listening on http://{address[0]}:{server.server_address[1]} "
+                 f"({capacity_gb:.1f} GB for models)")
+    if generated:
+        # Printed rather than logged, so the secret does not end up in the log file.
+        print(f"No daemon.token configured; send this one in the {_RequestHandler.TOKEN_HEADER} header: {token}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        scheduler.stop()
+        unfinished = [job.job_id for job in scheduler.jobs() if job.status in ("queued", "running")]
+        if unfinished:
+            logging.warning(f"Daemon stopped with unfinished jobs: {', '.join(unfinished)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,26 @@
+import os
 import time
+import queue
+import random
 import logging
-from ollama_client import get_ollama_response
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from ollama_client import generate
 from benchmarks.base_benchmark import BaseBenchmark
+from backends.base_backend import BaseBackend
+from backends.ollama_backend import OllamaBackend
 from utils.monitoring import SystemMonitor 
+from utils.tracing import span
+from utils.early_stopping import EarlyStopper
+from utils.sampling import stratified_sample
+from utils import stats
 
 
 logger = logging.getLogger(__name__)
 
-def run_evaluation(models_to_test: list[str], benchmarks_to_run: list[BaseBenchmark], model_options: dict ):
+def run_evaluation(models_to_test: list[str], benchmarks_to_run: list[BaseBenchmark], model_options: dict,
+                   record_writer=None, evaluation_options: dict | None = None,
+                   backends: list[BaseBackend] | None = None, progress=None):
     """
     Runs the specified benchmarks on the specified Ollama models.
 
@@ -15,13 +28,47 @@ def run_evaluation(models_to_test: list[str], benchmarks_to_run: list[BaseBenchm
         models_to_test (list[str]): A list of Ollama model names.
         benchmarks_to_run (list[BaseBenchmark]): A list of benchmark objects.
         model_options (dict) : Additional options for the models, such as temperature, max tokens, etc.
+        record_writer (QuestionRecordWriter, optional): Receives one structured record per question
+                      (prompt, response, score, timings, scorer details).
+        evaluation_options (dict, optional): The `evaluation` section of the config:
+                      trials (int): How often each model-benchmark pair is run (default 1).
+                      warmup_questions (int): Questions sent before measuring, to load the model
+                                              and warm its caches; they are left out of the trials
+                                              (default 0).
+                      confidence (float): Confidence level of the bootstrap intervals (default 0.95).
+                      bootstrap_resamples (int): Number of bootstrap resamples (default 1000).
+                      pipeline (dict): Worker counts and queue sizes of the generation/scoring
+                                       pipeline, see `_run_questions` and `_make_scoring_executor`.
+                      adaptive (dict): Sequential early stopping, see `_make_stopper`. When enabled,
+                                       questions are asked in a seeded random order and a model stops
+                                       once its score is settled; the entry then also holds
+                                       'questions_total', 'questions_skipped', 'stop_reason',
+                                       'est_gpu_time_saved_s' and 'est_energy_saved_wh'.
+        backends (list[BaseBackend], optional): Inference engines to run every model on, one result
+                      entry per engine (default: Ollama).
+        progress (ProgressDisplay, optional): Shows live progress, throughput and ETAs.
 
     Returns:
         list: A list of dictionaries, where each dictionary contains
               the results for a model-benchmark pair.
-              {'model': str, 'benchmark': str, 'score': float, 'avg_tokens_s': float | None}
+              {'model': str, 'benchmark': str, 'backend': str, 'score': float,
+               'avg_tokens_s', 'weighted_tokens_s': float | None,
+               'avg_output_tokens', 'avg_latency_s', 'avg_prompt_tokens_s', 'median_ttft_s': float | None,
+               'score_ci', 'tokens_s_ci', 'energy_wh_ci': [low, high] | None,
+               'num_questions': int, 'successful_evals': int, 'num_errors': int,
+               'subjects': dict,         (per-subject breakdown, see `_subject_breakdown`)
+               'trials': list[dict],     (score, tokens/s and energy of each trial)
+               'questions': list[dict]}  (one entry per question and trial, see `_run_questions`)
+              plus the SystemMonitor summary fields, averaged over the trials.
     """
     all_results = []
+    evaluation_options = evaluation_options or {}
+    num_trials = max(1, int(evaluation_options.get('trials', 1)))
+    warmup_questions = max(0, int(evaluation_options.get('warmup_questions', 0)))
+    adaptive_options = evaluation_options.get('adaptive') or {}
+    adaptive = bool(adaptive_options.get('enabled'))
+    pipeline_options = evaluation_options.get('pipeline') or {}
+    backends = backends or [OllamaBackend()]
 
     if not models_to_test:
         logger.warning("No models specified for evaluation.")
@@ -33,80 +80,526 @@ def run_evaluation(models_to_test: list[str], benchmarks_to_run: list[BaseBenchm
     for benchmark in benchmarks_to_run:
         benchmark_name = benchmark.get_name()
         logger.info(f"Running Benchmark: {benchmark_name}...")
-        questions = benchmark.get_questions()
+        with span("benchmark.get_questions", benchmark=benchmark_name):
+            questions = benchmark.get_questions()
         if not questions:
             logger.warning(f"No questions found for benchmark {benchmark_name}. Skipping.")
             continue
-        for model_name in models_to_test:
-            logger.info(f"\n--- Evaluating Model: {model_name} on {benchmark_name} ---")
+        if benchmark.question_fraction is not None and benchmark.question_fraction < 1:
+            questions = stratified_sample(questions, benchmark.question_fraction, key="subject", seed=42)
+            logger.info(f"Asking {len(questions)} questions of {benchmark_name} to fit the time budget.")
+        if adaptive:
+            # Benchmarks usually list questions grouped by subject; a stopped run must still have
+            # seen a representative sample. All models get the same order, so their prefixes match.
+            questions = list(questions)
+            random.Random(adaptive_options.get('seed', 0)).shuffle(questions)
+        settled_intervals = {}  # backend -> {model: final score interval}, for the separation criterion
+        scoring_executor = _make_scoring_executor(benchmark, pipeline_options)
+        try:
+            runs = [(backend, model_name) for backend in backends for model_name in benchmark.models or models_to_test]
+            runs_own_requests = type(benchmark).run_questions is not BaseBenchmark.run_questions
+            warmup_set = questions[:warmup_questions]
+            if warmup_set and not runs_own_requests:
+                # Warm-up questions are not asked again in the trials, where the server's prompt cache
+                # would answer them faster. Every model gets the same warm-up and measured questions.
+                warmup_set = questions[:min(warmup_questions, len(questions) - 1)]
+                questions = questions[len(warmup_set):]
+            for backend, model_name in runs:
+                if runs_own_requests and not isinstance(backend, OllamaBackend):
+                    logger.warning(f"{benchmark_name} sends its own requests to Ollama; skipping it on {backend.name}.")
+                    continue
+                engine = f" ({backend.name})" if len(backends) > 1 else ""
+                logger.info(f"\n--- Evaluating Model: {model_name}{engine} on {benchmark_name} ---")
 
-            monitor = SystemMonitor(interval=1)
-            monitor.start()
-            
-            total_score = 0
-            num_questions = len(questions)
-            successful_evals = 0
+                if warmup_set:
+                    with span("evaluator.warmup", model=model_name):
+                        _run_warmup(model_name, warmup_set, model_options, backend)
+
+                if progress is not None:
+                    progress.start_pair(model_name, benchmark_name, backend.name,
+                                        sum(1 for q in questions if q.get("prompt") or runs_own_requests) * num_trials)
+                trial_runs, stoppers = [], []
+                for trial in range(num_trials):
+                    if num_trials > 1:
+                        logger.info(f"Trial {trial + 1}/{num_trials}")
+                    stopper = _make_stopper(adaptive_options, settled_intervals.get(backend.name, {})) if adaptive else None
+                    monitor = SystemMonitor(interval=1)
+                    monitor.start()
+                    question_results = benchmark.run_questions(model_name, questions, model_options, trial=trial)
+                    if question_results is not None:
+                        if progress is not None:
+                            progress.update(len(question_results))
+                    else:
+                        question_results = _run_questions(model_name, benchmark, questions, model_options, record_writer,
+                                                          trial=trial, stopper=stopper, pipeline_options=pipeline_options,
+                                                          scoring_executor=scoring_executor, backend=backend,
+                                                          progress=progress)
+                    monitoring_results = monitor.stop() # End monitoring
+                    trial_runs.append((question_results, monitoring_results))
+                    stoppers.append(stopper)
+                if progress is not None:
+                    progress.finish_pair()
+
+                result_entry = _build_result_entry(model_name, benchmark_name, trial_runs, evaluation_options)
+                result_entry["backend"] = backend.name
+                if adaptive:
+                    result_entry.update(_early_stopping_summary(questions, trial_runs, stoppers))
+                    interval = stoppers[-1].final_interval()
+                    if interval is not None:
+                        # Only models on the same engine are separated from each other.
+                        settled_intervals.setdefault(backend.name, {})[model_name] = interval
+                result_entry.update(benchmark.summarize(result_entry["questions"]))
+                result_entry["static_info"] = monitor.static_info
+                all_results.append(result_entry) 
+
+                avg_score_percent = result_entry["score"]
+                avg_tps = result_entry["avg_tokens_s"]
+                successful_evals = result_entry["successful_evals"]
+                logger.info(f"Summary for {model_name}{engine} on Benchmark {benchmark_name} :")
+                logger.info(f"    Average Score: {avg_score_percent:.2f}% {_format_ci(result_entry['score_ci'])} (over {successful_evals} evaluated questions)")
+                if avg_tps is not None:
+                    logger.info(f"    Average Tokens/Second: {avg_tps:.2f} {_format_ci(result_entry['tokens_s_ci'])}")
+                else:
+                    logger.warning(f"    Average Tokens/Second: N/A")
+                if result_entry['num_errors'] or result_entry['retries']:
+                    errors = ", ".join(f"{name} {count}" for name, count in sorted(result_entry['error_counts'].items()))
+                    logger.warning(f"    Request errors: {result_entry['num_errors']}{f' ({errors})' if errors else ''}, "
+                                   f"{result_entry['retries']} retries")
+                if result_entry.get('questions_skipped'):
+                    saved_s = result_entry['est_gpu_time_saved_s']
+                    logger.info(f"    Stopped early ({result_entry['stop_reason']}): skipped {result_entry['questions_skipped']} "
+                                f"questions{f', ~{saved_s:.0f} s of GPU time saved' if saved_s is not None else ''}")
             
-            all_tps = [] # To store tokens/second for each question
+                if 'avg_cpu_percent' in result_entry:
+                    logger.info(" System Usage (Avg):")
+                    logger.info(f"    CPU: {result_entry.get('avg_cpu_percent', 0):.2f}% | RAM: {result_entry.get('avg_ram_percent', 0):.2f}%")
+                    if 'avg_gpu_util_percent' in result_entry:
+                         logger.info(f"   GPU Util: {result_entry.get('avg_gpu_util_percent', 0):.2f}% | GPU Mem: {result_entry.get('avg_gpu_mem_percent', 0):.2f}%")
+                         logger.info(f"   Total GPU Energy: {result_entry.get('total_gpu_energy_wh', 0):.6f} Wh {_format_ci(result_entry['energy_wh_ci'])}")
+
+                with span("evaluator.cooldown"):
+                    time.sleep(5) # delay to avoid overwhelming the server
+        finally:
+            if scoring_executor is not None:
+                scoring_executor.shutdown()
+
+    return all_results
+
+
+def _run_warmup(model_name: str, questions: list[dict], model_options: dict, backend: BaseBackend | None = None):
+    """Sends warm-up questions so the model is loaded and its caches are warm; responses are discarded."""
+    logger.info(f"Sending {len(questions)} warm-up question(s) to {model_name} (excluded from metrics)...")
+    generate_fn = backend.generate if backend is not None else generate
+    for q_data in questions:
+        if q_data.get("prompt"):
+            generate_fn(model_name, q_data["prompt"], model_options)
 
+
+def _run_questions(model_name: str, benchmark: BaseBenchmark, questions: list[dict], model_options: dict,
+                   record_writer=None, trial: int = 0, stopper: EarlyStopper | None = None,
+                   pipeline_options: dict | None = None, scoring_executor=None,
+                   backend: BaseBackend | None = None, progress=None) -> list[dict]:
+    """
+    Sends every question to the model and scores the responses.
+    With a `stopper`, returns as soon as it reports the score as settled.
+
+    The work runs as a pipeline connected by bounded queues, so scoring never stalls generation:
+    a prompt producer thread feeds `generation_workers` threads calling the model, and the calling
+    thread scores the responses - inline, or on `scoring_executor` (a process pool, see
+    `_make_scoring_executor`) for CPU-heavy scorers. Batchable scorers get up to
+    `scoring_batch_size` responses per `evaluate_batch` call. Requests go to `backend` (default:
+    `ollama_client.generate`).
+
+    Returns:
+        list: One dictionary per question that has a prompt, in question order:
+              {'question_id', 'subject', 'trial': int, 'score': float | None, 'tokens_s', 'latency_s',
+               'ttft_s', 'prompt_tokens_s', 'load_duration_s', 'prompt_tokens', 'output_tokens',
+               'error': str | None, 'error_class': str | None, 'attempts': int}
+              (prompt_tokens_s is the prompt-processing throughput, load_duration_s the time the
+              server spent loading the model for this request)
+    """
+    pipeline_options = pipeline_options or {}
+    num_workers = max(1, int(pipeline_options.get('generation_workers', 1)))
+    queue_size = max(1, int(pipeline_options.get('queue_size', 32)))
+    batch_size = max(1, int(pipeline_options.get('scoring_batch_size', 16))) if benchmark.scorer_batchable else 1
+    samples_per_question = getattr(benchmark, 'samples_per_question', 1)
+    generate_fn = backend.generate if backend is not None else generate
+    benchmark_name = benchmark.get_name()
+    prompt_queue = queue.Queue(maxsize=queue_size)
+    response_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+
+    # Every thread ends with its sentinel (None), even when it fails: the stage after it counts them.
+    def produce():
+        try:
             for i, q_data in enumerate(questions):
-                prompt = q_data.get("prompt")
-                if not prompt:
-                    logger.warning(f"Question {i+1} has no prompt. Skipping.")
-                    num_questions -=1 
+                if stop_event.is_set():
+                    break
+                if not q_data.get("prompt"):
+                    logger.warning("Question %d has no prompt. Skipping.", i+1)
                     continue
+                prompt_queue.put((i, q_data))
+        except Exception as e:
+            logger.error(f"Queueing the questions of {benchmark_name} failed: {e}", exc_info=True)
+        finally:
+            for _ in range(num_workers):
+                prompt_queue.put(None)
 
-                logger.debug(f"Querying model for question {i+1}/{len(questions)}...")
-                logger.debug("Prompt : "+prompt)
-                response_text, tps, error = get_ollama_response(model_name, prompt, model_options)
-                logger.debug(f"Response received for question {response_text}.")
+    def generate_responses():
+        try:
+            while True:
+                item = prompt_queue.get()
+                if item is None:
+                    return
+                i, q_data = item
+                if stop_event.is_set():
+                    continue # Drain the remaining prompts without querying the model.
+                logger.debug("Querying model for question %d/%d...", i+1, len(questions))
+                try:
+                    overrides = benchmark.get_generation_overrides(q_data)
+                    options = {**model_options, **overrides.get("options", {})} if overrides else model_options
+                    payload = {k: v for k, v in overrides.items() if k != "options"}
+                    with span("evaluator.generate", model=model_name, question=q_data.get('id', i+1)):
+                        if samples_per_question > 1:
+                            response = _generate_samples(generate_fn, model_name, q_data["prompt"], options,
+                                                         payload, samples_per_question)
+                            q_data = {**q_data, "samples": response.pop("samples")}
+                        else:
+                            response = generate_fn(model_name, q_data["prompt"], options, **payload)
+                except Exception as e:
+                    logger.debug("Generation for question %d failed.", i+1, exc_info=True)
+                    response = _error_response(f"An unexpected error occurred: {e}")
+                response_queue.put((i, q_data, response))
+        finally:
+            response_queue.put(None)
 
-                if error:
-                    logger.error(f"Error getting response for question {q_data.get('id', i+1)}: {error}")
-                    num_questions -=1 
-                    continue
-                
-                if tps is not None:
-                    all_tps.append(tps)
-
-                question_score = benchmark.evaluate(response_text, q_data)
-                
-                if question_score is not None:
-                    total_score += question_score
-                    successful_evals += 1
-                    logger.debug(f"Question {q_data.get('id', i+1)} - Score: {question_score:.2f}" + (f", TPS: {tps:.2f}" if tps else "")+"\n")
-                else:
-                    logger.warning(f"Question {q_data.get('id', i+1)} - Could not be evaluated.")
-                    
-
-            monitoring_results = monitor.stop() # End monitoring
-            avg_score_percent = (total_score / successful_evals) * 100 if successful_evals > 0 else 0.0
-            avg_tps = sum(all_tps) / len(all_tps) if all_tps else None
-
-            result_entry = { 
-                "model": model_name, 
-                "benchmark": benchmark_name, 
-                "score": avg_score_percent, 
-                "avg_tokens_s": avg_tps, 
-                "static_info": monitor.static_info,
-            }
-            result_entry.update(monitoring_results) 
-            all_results.append(result_entry) 
+    threads = [threading.Thread(target=produce, name="prompt-producer", daemon=True)]
+    threads += [threading.Thread(target=generate_responses, name=f"generation-worker-{n}", daemon=True)
+                for n in range(num_workers)]
+    for thread in threads:
+        thread.start()
+
+    results_by_index = {}
+    batch, in_flight = [], []
 
-            logger.info(f"Summary for {model_name} on Benchmark {benchmark_name} :")
-            logger.info(f"    Average Score: {avg_score_percent:.2f}% (over {successful_evals} evaluated questions)")
-            if avg_tps is not None:
-                logger.info(f"    Average Tokens/Second: {avg_tps:.2f}")
+    def finish(scored_batch, scores):
+        for (i, q_data, response), (question_score, score_details) in zip(scored_batch, scores):
+            question_result = results_by_index[i]
+            question_result["score"] = question_score
+            question_result.update(score_details.get("metrics") or {})
+            question_id = question_result["question_id"]
+            if question_score is not None:
+                logger.debug("Question %s - Score: %.2f, TPS: %s", question_id, question_score, response["tokens_per_second"])
             else:
-                logger.warning(f"    Average Tokens/Second: N/A")
-            
-            if monitoring_results:
-                logger.info(" System Usage (Avg):")
-                logger.info(f"    CPU: {monitoring_results.get('avg_cpu_percent', 0):.2f}% | RAM: {monitoring_results.get('avg_ram_percent', 0):.2f}%")
-                if 'avg_gpu_util_percent' in monitoring_results:
-                     logger.info(f"   GPU Util: {monitoring_results.get('avg_gpu_util_percent', 0):.2f}% | GPU Mem: {monitoring_results.get('avg_gpu_mem_percent', 0):.2f}%")
-                     logger.info(f"   Total GPU Energy: {monitoring_results.get('total_gpu_energy_wh', 0):.6f} Wh")
+                logger.warning("Question %s - Could not be evaluated.", question_id)
+
+            if record_writer:
+                with span("evaluator.write_record"):
+                    record_writer.write({"model": model_name, "benchmark": benchmark_name, **question_result,
+                                         "prompt": q_data["prompt"], "response": response["text"],
+                                         "details": score_details})
+
+            if (stopper is not None and question_score is not None and not stop_event.is_set()
+                    and stopper.update(question_score)):
+                logger.info(f"Score of {model_name} on {benchmark_name} settled after "
+                            f"{sum(1 for q in results_by_index.values() if q['score'] is not None)} "
+                            f"scored questions: {stopper.stop_reason}")
+                stop_event.set()
+
+    def submit(scored_batch):
+        responses = [response["text"] for _, _, response in scored_batch]
+        batch_questions = [q_data for _, q_data, _ in scored_batch]
+        if scoring_executor is None:
+            with span("benchmark.evaluate", benchmark=benchmark_name, batch=len(scored_batch)):
+                finish(scored_batch, _score_safely(benchmark, responses, batch_questions))
+        else:
+            in_flight.append((scored_batch, scoring_executor.submit(_score_in_worker, responses, batch_questions)))
+
+    def collect(wait: bool):
+        while in_flight and (wait or in_flight[0][1].done()):
+            scored_batch, future = in_flight.pop(0)
+            with span("benchmark.evaluate", benchmark=benchmark_name, batch=len(scored_batch)):
+                try:
+                    scores = future.result()
+                except Exception as e:
+                    logger.error(f"Scoring a batch of {len(scored_batch)} responses failed: {e}")
+                    scores = [(None, {"error": str(e)})] * len(scored_batch)
+            finish(scored_batch, scores)
+
+    finished_workers = 0
+    while finished_workers < num_workers:
+        item = response_queue.get()
+        if item is None:
+            finished_workers += 1
+        else:
+            i, q_data, response = item
+            question_result = {
+                "question_id": q_data.get('id', i+1),
+                "subject": q_data.get("subject"),
+                "trial": trial,
+                "score": None,
+                "tokens_s": response["tokens_per_second"],
+                "latency_s": response["latency_s"],
+                "ttft_s": response["ttft_s"],
+                "prompt_tokens_s": _prompt_tokens_s(response),
+                "load_duration_s": response.get("load_duration_s"),
+                "prompt_tokens": response["prompt_tokens"],
+                "output_tokens": response["output_tokens"],
+                "error": response["error"],
+                "error_class": response.get("error_class"),
+                "attempts": response.get("attempts", 1),
+            }
+            results_by_index[i] = question_result
+            if progress is not None:
+                progress.update()
+            if response["error"]:
+                logger.error("Error getting response for question %s: %s", question_result["question_id"], response["error"])
+                if record_writer:
+                    record_writer.write({"model": model_name, "benchmark": benchmark_name, **question_result})
+            else:
+                batch.append(item)
+        # Score once a batch is full (every response, for unbatched scorers); the rest is flushed at the end.
+        if len(batch) >= batch_size:
+            submit(batch)
+            batch = []
+        collect(wait=False)
+    if batch:
+        submit(batch)
+    collect(wait=True)
+
+    for thread in threads:
+        thread.join()
+    return [results_by_index[i] for i in sorted(results_by_index)]
+
+
+def _error_response(message: str) -> dict:
+    """A response in the shape of `ollama_client.generate`'s for a request that failed before or outside the client."""
+    return {"text": None, "tokens_per_second": None, "error": message, "prompt_tokens": None, "output_tokens": None,
+            "load_duration_s": None, "prompt_eval_duration_s": None, "ttft_s": None, "latency_s": None,
+            "error_class": "other", "attempts": 0}
+
+
+def _prompt_tokens_s(response: dict) -> float | None:
+    """Prompt-processing throughput of a response, or None when the server did not report it."""
+    if response.get("prompt_tokens") and response.get("prompt_eval_duration_s"):
+        return response["prompt_tokens"] / response["prompt_eval_duration_s"]
+    return None
+
+
+def _generate_samples(generate_fn, model_name: str, prompt: str, options: dict, payload: dict, k: int) -> dict:
+    """
+    Sends k concurrent requests with seeds seed, seed+1, ... (for self-consistency) and combines them
+    into one response: tokens are summed, latency is the wall time of the whole group, and the
+    texts of the successful samples are returned under 'samples'.
+    """
+    base_seed = options.get('seed') or 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=k) as pool:
+        responses = list(pool.map(
+            lambda n: generate_fn(model_name, prompt, {**options, 'seed': base_seed + n}, **payload), range(k)))
+    wall_time = time.perf_counter() - start
+    ok = [r for r in responses if not r["error"]]
+    return {
+        "text": ok[0]["text"] if ok else None,
+        "samples": [r["text"] for r in ok],
+        "tokens_per_second": stats.mean([r["tokens_per_second"] for r in ok if r["tokens_per_second"] is not None]),
+        "latency_s": wall_time,
+        "ttft_s": min((r["ttft_s"] for r in ok if r["ttft_s"] is not None), default=None),
+        "prompt_tokens": sum(r["prompt_tokens"] or 0 for r in ok),
+        "output_tokens": sum(r["output_tokens"] or 0 for r in ok),
+        "error": None if ok else responses[0]["error"],
+    }
+
+
+def _score_safely(benchmark: BaseBenchmark, responses: list[str], batch_questions: list[dict]) -> list[tuple]:
+    """Scores a batch, turning a scorer failure into unscored results instead of aborting the run."""
+    try:
+        return benchmark.evaluate_batch(responses, batch_questions)
+    except Exception as e:
+        logger.error(f"Scoring a batch of {len(responses)} responses failed: {e}")
+        return [(None, {"error": str(e)})] * len(responses)
+
+
+_worker_benchmark = None # The benchmark scoring in this worker process
+
+
+def _init_scoring_worker(benchmark: BaseBenchmark):
+    global _worker_benchmark
+    _worker_benchmark = benchmark
+
+
+def _score_in_worker(responses: list[str], batch_questions: list[dict]) -> list[tuple]:
+    return _score_safely(_worker_benchmark, responses, batch_questions)
+
+
+def _make_scoring_executor(benchmark: BaseBenchmark, pipeline_options: dict | None = None):
+    """
+    Starts a process pool for benchmarks whose scorer is CPU-heavy, so scoring neither blocks
+    generation nor contends for the GIL. Returns None when scoring should run inline.
+    """
+    pipeline_options = pipeline_options or {}
+    num_processes = int(pipeline_options.get('scoring_workers', os.cpu_count() or 1))
+    if not benchmark.scorer_cpu_heavy or num_processes < 1:
+        return None
+    logger.info(f"Scoring {benchmark.get_name()} in {num_processes} worker processes.")
+    return ProcessPoolExecutor(max_workers=num_processes, initializer=_init_scoring_worker, initargs=(benchmark,))
+
+
+def _make_stopper(adaptive_options: dict, settled_intervals: dict) -> EarlyStopper:
+    """
+    Creates the early stopper of one trial from the `evaluation.adaptive` config section:
+    target_ci_width (float | None): Stop once the score interval is at most this wide, in percentage points.
+    stop_on_separation (bool): Stop once the interval no longer overlaps any model already evaluated.
+    confidence (float), min_questions (int), check_every (int): See `EarlyStopper`.
+    """
+    return EarlyStopper(
+        target_width=adaptive_options.get('target_ci_width', 5.0),
+        confidence=adaptive_options.get('confidence', 0.99),
+        min_questions=adaptive_options.get('min_questions', 50),
+        check_every=adaptive_options.get('check_every', 10),
+        competitors=dict(settled_intervals),
+        stop_on_separation=adaptive_options.get('stop_on_separation', True),
+    )
+
+
+def _early_stopping_summary(questions: list[dict], trial_runs: list[tuple[list[dict], dict]],
+                            stoppers: list[EarlyStopper]) -> dict:
+    """
+    Counts the questions early stopping skipped and estimates the generation time and GPU energy
+    that saved, from the average latency and energy per evaluated question.
+    """
+    total = sum(1 for q in questions if q.get("prompt"))
+    evaluated = [q for question_results, _ in trial_runs for q in question_results]
+    skipped = total * len(trial_runs) - len(evaluated)
+    latencies = [q["latency_s"] for q in evaluated if q["latency_s"] is not None]
+    energies = [m.get('total_gpu_energy_wh') for _, m in trial_runs if m.get('total_gpu_energy_wh') is not None]
+    reasons = sorted({s.stop_reason for s in stoppers if s.stop_reason})
+    return {
+        "questions_total": total,
+        "questions_skipped": skipped,
+        "stop_reason": "; ".join(reasons) or None,
+        "est_gpu_time_saved_s": stats.mean(latencies) * skipped if latencies else None,
+        "est_energy_saved_wh": sum(energies) / len(evaluated) * skipped if energies and evaluated else None,
+    }
+
+
+def _merge_monitoring(monitoring_runs: list[dict]) -> dict:
+    """Combines the SystemMonitor summaries of several trials: maxima are maxed, everything else averaged."""
+    merged = {}
+    keys = {key for run in monitoring_runs for key in run}
+    for key in keys:
+        values = [run[key] for run in monitoring_runs if run.get(key) is not None]
+        if values:
+            merged[key] = max(values) if key.startswith('max_') else sum(values) / len(values)
+    return merged
+
+
+def _build_result_entry(model_name: str, benchmark_name: str, trial_runs: list[tuple[list[dict], dict]],
+                        evaluation_options: dict | None = None) -> dict:
+    """
+    Aggregates the per-question results of all trials into a model-benchmark result entry,
+    with bootstrap confidence intervals for score, tokens/s and energy.
+    """
+    evaluation_options = evaluation_options or {}
+    confidence = evaluation_options.get('confidence', 0.95)
+    resamples = evaluation_options.get('bootstrap_resamples', 1000)
+
+    all_questions, trials = [], []
+    for question_results, monitoring_results in trial_runs:
+        all_questions.extend(question_results)
+        scores = [q["score"] for q in question_results if q["score"] is not None]
+        all_tps = [q["tokens_s"] for q in question_results if q["tokens_s"] is not None]
+        trials.append({
+            "score": (sum(scores) / len(scores)) * 100 if scores else 0.0,
+            "avg_tokens_s": stats.mean(all_tps),
+            "total_gpu_energy_wh": monitoring_results.get('total_gpu_energy_wh'),
+            "num_questions": sum(1 for q in question_results if not q["error"]),
+        })
+
+    # Resample questions (not trials x questions) so repeated answers to one question are not
+    # treated as independent evidence.
+    scores_by_question = {}
+    for q in all_questions:
+        if q["score"] is not None:
+            scores_by_question.setdefault(q["question_id"], []).append(q["score"] * 100)
+    question_scores = [sum(v) / len(v) for v in scores_by_question.values()]
+    all_tps = [q["tokens_s"] for q in all_questions if q["tokens_s"] is not None]
+    timed = [q for q in all_questions if q["tokens_s"] and q["output_tokens"]]
+    generation_time = sum(q["output_tokens"] / q["tokens_s"] for q in timed)
+    energies = [t["total_gpu_energy_wh"] for t in trials if t["total_gpu_energy_wh"] is not None]
+
+    entry = {
+        "model": model_name,
+        "benchmark": benchmark_name,
+        "score": stats.mean([t["score"] for t in trials]),
+        "avg_tokens_s": stats.mean(all_tps),
+        # Total output tokens over total generation time, so long answers weigh in by their length.
+        "weighted_tokens_s": sum(q["output_tokens"] for q in timed) / generation_time if generation_time else None,
+        "avg_output_tokens": stats.mean([q["output_tokens"] for q in all_questions if q["output_tokens"] is not None]),
+        "avg_latency_s": stats.mean([q["latency_s"] for q in all_questions if q["latency_s"] is not None and not q["error"]]),
+        "avg_prompt_tokens_s": stats.mean([q["prompt_tokens_s"] for q in all_questions if q.get("prompt_tokens_s") is not None]),
+        # Median: the first request's TTFT includes loading the model.
+        "median_ttft_s": stats.median([q["ttft_s"] for q in all_questions if q.get("ttft_s") is not None and not q["error"]]),
+        "score_ci": stats.bootstrap_ci(question_scores, n_resamples=resamples, confidence=confidence),
+        "tokens_s_ci": stats.bootstrap_ci(all_tps, n_resamples=resamples, confidence=confidence),
+        # Energy is sampled per run, so its interval needs at least two trials.
+        "energy_wh_ci": stats.bootstrap_ci(energies, n_resamples=resamples, confidence=confidence),
+        "confidence": confidence,
+        "num_questions": round(stats.mean([t["num_questions"] for t in trials])),
+        "successful_evals": sum(1 for q in all_questions if q["score"] is not None),
+        "num_errors": sum(1 for q in all_questions if q["error"]),
+        # Failed questions by the class of their final error, and the retries spent on all questions.
+        "error_counts": _error_counts(all_questions),
+        "retries": sum(max(0, (q.get("attempts") or 1) - 1) for q in all_questions),
+        "subjects": _subject_breakdown(all_questions),
+        "trials": trials,
+        "questions": all_questions,
+    }
+    entry.update(_merge_monitoring([monitoring_results for _, monitoring_results in trial_runs]))
+    return entry
+
+
+def _error_counts(questions: list[dict]) -> dict:
+    """{error class: number of failed questions}, e.g. {'timeout': 2, 'server_error': 1}."""
+    counts = {}
+    for q in questions:
+        if q["error"]:
+            error_class = q.get("error_class") or "other"
+            counts[error_class] = counts.get(error_class, 0) + 1
+    return counts
+
+
+def _subject_breakdown(questions: list[dict]) -> dict:
+    """
+    Aggregates the per-question results by subject (e.g. the MMLU-Pro categories), whose response
+    lengths and therefore latencies can differ a lot.
+
+    Returns:
+        dict: {subject: {'num_questions': int, 'score': float | None (%), 'avg_tokens_s',
+               'avg_output_tokens', 'latency_p50_s', 'latency_p90_s', 'latency_p99_s': float | None}},
+              empty when the benchmark has no subjects.
+    """
+    by_subject = {}
+    for q in questions:
+        if q.get("subject") is not None:
+            by_subject.setdefault(str(q["subject"]), []).append(q)
+    breakdown = {}
+    for subject, subject_questions in sorted(by_subject.items()):
+        ok = [q for q in subject_questions if not q["error"]]
+        scores = [q["score"] * 100 for q in subject_questions if q["score"] is not None]
+        latencies = [q["latency_s"] for q in ok if q["latency_s"] is not None]
+        breakdown[subject] = {
+            "num_questions": len(subject_questions),
+            "score": stats.mean(scores),
+            "avg_tokens_s": stats.mean([q["tokens_s"] for q in ok if q["tokens_s"] is not None]),
+            "avg_output_tokens": stats.mean([q["output_tokens"] for q in ok if q["output_tokens"] is not None]),
+            "latency_p50_s": stats.percentile(latencies, 50),
+            "latency_p90_s": stats.percentile(latencies, 90),
+            "latency_p99_s": stats.percentile(latencies, 99),
+        }
+    return breakdown
 
-            time.sleep(5) # delay to avoid overwhelming the server
 
-    return all_results
\ No newline at end of file
+def _format_ci(ci) -> str:
+    """Formats a confidence interval for log output."""
+    return f"[{ci[0]:.2f}, {ci[1]:.2f}]" if ci else ""
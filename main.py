@@ -1,21 +1,46 @@
 import os
 import sys
+import uuid
+import queue
+import atexit
 import yaml
 import inspect
 import logging
 import argparse
-import importlib.util
+import importlib
 import re
+from datetime import datetime
 
 from evaluator import run_evaluation
-from ollama_client import check_ollama_connection
 from benchmarks.base_benchmark import BaseBenchmark
+from backends.base_backend import BaseBackend
+from backends.ollama_backend import OllamaBackend
 from reporters.base_reporter import BaseReporter
-from logging.handlers import RotatingFileHandler
+from utils.tracing import tracer, span
+from utils.records import QuestionRecordWriter
+from utils.results_store import ResultsStore
+from utils.regression import compare_runs
+from utils.judge import Judge
+from utils.self_consistency import SelfConsistency, supports_self_consistency
+from utils.planner import plan_run, allocate_budget, scale_plan, format_plan, parse_duration
+from utils.progress import ProgressDisplay
+from utils import request_policy
+from compare import print_findings
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 
-def setup_logging():
-    """Configures logging to file and console."""
+def setup_logging(logging_config: dict | None = None):
+    """
+    Configures logging to file and console.
+
+    Log records are handed to a queue and written by a background listener thread,
+    so the evaluation loop never blocks on file or console I/O.
+
+    Returns:
+        QueueListener: The running listener. It is stopped, flushing any queued records, at interpreter exit.
+    """
+    logging_config = logging_config or {}
+
     # Check if handlers are already configured to avoid duplicates
     if logging.getLogger().hasHandlers():
         logging.getLogger().handlers.clear()
@@ -23,27 +48,47 @@ def setup_logging():
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
 
-    # This will append to the log and rotate it when it reaches 1MB, keeping 5 backups.
-    log_file = "evaluation.log"
-    max_bytes = 1 * 1024 * 1024  # 1 MB
-    backup_count = 5
+    # This will append to the log and rotate it when it reaches max_bytes, keeping backup_count backups.
+    log_file = logging_config.get('log_file', "evaluation.log")
+    max_bytes = logging_config.get('max_bytes', 50 * 1024 * 1024)  # 50 MB
+    backup_count = logging_config.get('backup_count', 5)
     file_handler = RotatingFileHandler(
         log_file,
         maxBytes=max_bytes,
         backupCount=backup_count,
         encoding='utf-8'
     )  
-    file_handler.setLevel(logging.DEBUG)  # Log everything to the file
+    file_handler.setLevel(logging_config.get('file_level', 'DEBUG'))  # Log everything to the file by default
     file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
 
     # Create a console handler to print logs to the console
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)  # Only show INFO and above on console
+    console_handler.setLevel(logging_config.get('console_level', 'INFO'))  # Only show INFO and above on console
     console_formatter = logging.Formatter('%(levelname)s - %(message)s')
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+
+    # Only loggers below the most verbose handler level need to do any work.
+    root_logger.setLevel(min(file_handler.level, console_handler.level))
+
+    log_queue = queue.Queue(-1)
+    root_logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+def _self_consistency_variants(benchmarks: list[BaseBenchmark], sc_config: dict) -> list[BaseBenchmark]:
+    """Replaces each benchmark that supports majority voting by one self-consistency variant per k."""
+    expanded = []
+    for benchmark in benchmarks:
+        if not supports_self_consistency(benchmark):
+            logging.warning(f"{benchmark.get_name()} does not support self-consistency; running it once per question.")
+            expanded.append(benchmark)
+            continue
+        for k in sc_config.get('k_values', [1, 3, 5]):
+            expanded.append(SelfConsistency(benchmark, int(k), temperature=sc_config.get('temperature', 0.7)))
+    return expanded
 
 def load_modules_from_path(path, base_class):
     """Dynamically loads modules from path and finds classes inheriting from a base class."""
@@ -51,72 +96,218 @@ def load_modules_from_path(path, base_class):
     for filename in os.listdir(path):
         if filename.endswith('.py') and not filename.startswith('__'):
             module_name = filename[:-3]
-            module_path = os.path.join(path, filename)
-            
-            spec = importlib.util.spec_from_file_location(module_name, module_path)
-            if spec and spec.loader:
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                for name, obj in inspect.getmembers(module, inspect.isclass):
-                    if issubclass(obj, base_class) and obj is not base_class:
-                       loaded_classes[name] = obj
+            # Imported as part of its package (not from the file under a second name), so its classes
+            # are the same objects everywhere else imports them and isinstance checks hold.
+            module = importlib.import_module(f"{os.path.normpath(path).replace(os.sep, '.')}.{module_name}")
+            for name, obj in inspect.getmembers(module, inspect.isclass):
+                if issubclass(obj, base_class) and obj is not base_class:
+                   loaded_classes[name] = obj
     return loaded_classes
 
+def load_backends(config: dict) -> list[BaseBackend]:
+    """Instantiates the enabled backends of a config (Ollama if none is enabled)."""
+    available_backends = load_modules_from_path('backends', BaseBackend)
+    backends = []
+    for name, params in (config.get('backends') or {}).items():
+        if params.get('enabled') and name in available_backends:
+            backends.append(available_backends[name](**{k: v for k, v in params.items() if k != 'enabled'}))
+            logging.info(f"Loaded backend: {name}")
+    backends = backends or [OllamaBackend()]
+    if len({backend.name for backend in backends}) < len(backends):
+        raise ValueError("Backends must have distinct names; set `name` on each.")
+    return backends
+
+def load_benchmarks(config: dict) -> list[BaseBenchmark]:
+    """Instantiates the enabled benchmarks of a config, expanded into their variants."""
+    sc_config = config.get('self_consistency') or {}
+    judge_config = config.get('judge') or {}
+    judge = None
+    if judge_config.get('model'):
+        judge = Judge(**judge_config)
+    available_benchmarks = load_modules_from_path('benchmarks', BaseBenchmark)
+    benchmarks_to_run = []
+    for name, params in (config.get('benchmarks') or {}).items():
+        if params.get('enabled') and name in available_benchmarks:
+            cls = available_benchmarks[name]
+            instance_params = {k: v for k, v in params.items() if k not in ('enabled', 'use_judge')}
+            variants = cls(**instance_params).get_variants()
+            if params.get('use_judge'):
+                if judge is None:
+                    logging.warning(f"{name} has use_judge enabled, but no judge model is configured.")
+                for variant in variants:
+                    variant.judge = judge
+            if sc_config.get('enabled'):
+                variants = _self_consistency_variants(variants, sc_config)
+            benchmarks_to_run.extend(variants)
+            logging.info(f"Loaded benchmark: {name}")
+    return benchmarks_to_run
+
+def load_reporters(config: dict, results_db: str) -> list[BaseReporter]:
+    """Instantiates the enabled reporters of a config."""
+    available_reporters = load_modules_from_path('reporters', BaseReporter)
+    reporters_to_run = []
+    for name, params in (config.get('reporters') or {}).items():
+        if params.get('enabled') and name in available_reporters:
+            cls = available_reporters[name]
+            reporters_to_run.append(cls({'database': results_db, 'model_families': config.get('model_families'), **params}))
+            logging.info(f"Loaded reporter: {name}")
+    return reporters_to_run
+
+def run_and_report(config: dict, models: list[str], benchmarks: list[BaseBenchmark], backends: list[BaseBackend],
+                   reporters: list[BaseReporter], run_id: str, run_started_at: datetime, tag: str | None = None,
+                   progress=None, co_scheduled_with: set | None = None) -> list[dict]:
+    """
+    Runs the evaluation, stores the results in the results database and hands them to the reporters.
+    `co_scheduled_with` (daemon jobs) holds the jobs that ran alongside this one; it is stored with
+    every result entry, so planner history and regression baselines can leave those timings out.
+
+    Returns:
+        list: The result entries of `run_evaluation` (empty if nothing was evaluated).
+    """
+    logging_config = config.get('logging') or {}
+    results_db = (config.get('results_store') or {}).get('path', 'results.db')
+    record_writer = None
+    if logging_config.get('question_records_file'):
+        record_writer = QuestionRecordWriter(logging_config['question_records_file'], run_id=run_id)
+    try:
+        results = run_evaluation(models, benchmarks, config.get('model_options', {}), record_writer=record_writer,
+                                 evaluation_options=config.get('evaluation'), backends=backends, progress=progress)
+    finally:
+        if record_writer:
+            record_writer.close()
+
+    # --- Store Results ---
+    if results:
+        overlapping = sorted(set(co_scheduled_with or ())) # A copy: the scheduler may still add to it
+        for res in results:
+            res['run_id'] = run_id
+            if overlapping:
+                res['co_scheduled_with'] = overlapping
+        with ResultsStore(results_db) as store:
+            store.save_run(run_id, results, tag=tag, config=config, started_at=run_started_at.isoformat(timespec="seconds"))
+
+    # Present the results
+    # --- Report Results ---
+    if results:
+        for reporter in reporters:
+            with span("reporter.report", reporter=type(reporter).__name__):
+                reporter.report(results)
+    else:
+        logging.warning("Evaluation finished but produced no results.")
+    return results
+
+def new_run_id(started_at: datetime) -> str:
+    """A run ID that sorts by start time, e.g. "20250101-120000-1a2b3c"."""
+    return f"{started_at.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
 def main():
     parser = argparse.ArgumentParser(description="A framework for benchmarking local LLMs via Ollama.")
     parser.add_argument('--config', type=str, default='config.yaml', help='Path to the configuration file.')
     parser.add_argument('--models', nargs='+', help='Override models from config file. e.g., --models llama3:8b qwen2:7b')
+    parser.add_argument('--tag', type=str, help='Label stored with this run in the results database (e.g. "ollama-0.9.2").')
+    parser.add_argument('--compare-to', type=str, metavar='BASELINE',
+                        help='After the run, compare it against a stored baseline run (ID or tag) and exit non-zero on significant regressions.')
+    parser.add_argument('--trace', nargs='?', const='trace.json', metavar='FILE',
+                        help='Record timing spans and write a Chrome/Perfetto trace to FILE (default: trace.json).')
+    parser.add_argument('--plan', action='store_true',
+                        help='Estimate the run time and energy of every model and benchmark from stored history, then exit without evaluating.')
+    parser.add_argument('--time-budget', type=str, metavar='DURATION',
+                        help='Ask only as many questions per benchmark as fit this wall-clock budget (e.g. 3600, 90m, 2h).')
     args = parser.parse_args()
-    setup_logging()
+    try:
+        time_budget_s = parse_duration(args.time_budget) if args.time_budget else None
+    except ValueError as e:
+        parser.error(str(e))
 
-    if not check_ollama_connection():
-        sys.exit(1)
-    
     try:
         with open(args.config, 'r') as f:
             config = yaml.safe_load(f)
     except FileNotFoundError:
+        setup_logging()
         logging.error(f"Configuration file not found at {args.config}")
         sys.exit(1)
 
+    logging_config = config.get('logging') or {}
+    setup_logging(logging_config)
+    request_policy.configure(config.get('request_policy'))
+
+    # --- Discover and Load Backends ---
+    try:
+        backends = load_backends(config)
+    except ValueError as e:
+        logging.error(str(e))
+        sys.exit(1)
+    if not args.plan and not all(backend.check_connection() for backend in backends):
+        sys.exit(1)
+
+    run_started_at = datetime.now()
+    run_id = new_run_id(run_started_at)
+    logging.info(f"Run ID: {run_id}")
+
+    # --- Tracing ---
+    tracing_config = config.get('tracing') or {}
+    trace_file = args.trace or (tracing_config.get('output_file', 'trace.json') if tracing_config.get('enabled') else None)
+    if trace_file:
+        tracer.enable()
+        logging.info(f"Tracing enabled. Trace will be written to {trace_file}")
+
     # --- Load Models and Options---
     models_to_evaluate = args.models if args.models else config.get('models_to_evaluate', [])
-    model_options = config.get('model_options', {})
     if not models_to_evaluate:
         logging.error("No models specified in config or via CLI. Exiting.")
         sys.exit(1)
 
     # --- Discover and Load Benchmarks ---
-    available_benchmarks = load_modules_from_path('benchmarks', BaseBenchmark)
-    benchmarks_to_run = []
-    for name, params in config.get('benchmarks', {}).items():
-        if params.get('enabled') and name in available_benchmarks:
-            cls = available_benchmarks[name]
-            instance_params = {k: v for k, v in params.items() if k != 'enabled'}
-            benchmarks_to_run.append(cls(**instance_params))
-            logging.info(f"Loaded benchmark: {name}")
+    benchmarks_to_run = load_benchmarks(config)
+
+    results_db = (config.get('results_store') or {}).get('path', 'results.db')
+
+    # --- Plan the Run ---
+    evaluation_config = config.get('evaluation') or {}
+    show_progress = evaluation_config.get('progress', True)
+    plan = None
+    if args.plan or time_budget_s is not None or show_progress:
+        with ResultsStore(results_db) as store:
+            plan = plan_run(models_to_evaluate, benchmarks_to_run, backends, store, evaluation_config)
+        if time_budget_s is not None:
+            fractions = allocate_budget(plan, time_budget_s)
+            for benchmark in benchmarks_to_run:
+                if fractions.get(benchmark.get_name(), 1.0) < 1.0:
+                    benchmark.question_fraction = fractions[benchmark.get_name()]
+            plan = scale_plan(plan, fractions)
+        if args.plan or time_budget_s is not None:
+            print("\n--- RUN PLAN ---")
+            print(format_plan(plan))
+        if args.plan:
+            return
 
     # --- Discover and Load Reporters ---
-    available_reporters = load_modules_from_path('reporters', BaseReporter)
-    reporters_to_run = []
-    for name, params in config.get('reporters', {}).items():
-        if params.get('enabled') and name in available_reporters:
-            cls = available_reporters[name]
-            reporters_to_run.append(cls(params))
-            logging.info(f"Loaded reporter: {name}")
-    
+    reporters_to_run = load_reporters(config, results_db)
+
     # --- Run Evaluation ---
     logging.info(f"Starting evaluation for models: {', '.join(models_to_evaluate)}")
-    results = run_evaluation(models_to_evaluate, benchmarks_to_run, model_options)
+    results = run_and_report(config, models_to_evaluate, benchmarks_to_run, backends, reporters_to_run, run_id,
+                             run_started_at, tag=args.tag,
+                             progress=ProgressDisplay(plan) if show_progress else None)
 
+    if trace_file:
+        tracer.disable()
+        tracer.export_chrome_trace(trace_file)
+        print("\n--- TRACE SUMMARY (time per stage) ---")
+        print(tracer.format_summary())
 
-    # Present the results
-    # --- Report Results ---
-    if results:
-        for reporter in reporters_to_run:
-            reporter.report(results)
-    else:
-        logging.warning("Evaluation finished but produced no results.")
+    # --- Regression Check ---
+    if args.compare_to and results:
+        with ResultsStore(results_db) as store:
+            baseline_id = store.resolve_run(args.compare_to)
+            baseline_results = store.get_run_results(baseline_id, include_questions=True) if baseline_id else []
+        if baseline_id is None or baseline_id == run_id:
+            logging.error(f"Baseline run '{args.compare_to}' not found in {results_db} (or it refers to this run).")
+            sys.exit(2)
+        findings = compare_runs(baseline_results, results, config.get('regression'))
+        if print_findings(findings, baseline_id, run_id):
+            logging.info("LLM Evaluation Project finished with regressions.")
+            sys.exit(1)
 
     logging.info("LLM Evaluation Project finished.")
  
@@ -0,0 +1,261 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+from unittest import mock
+
+from tabulate import tabulate
+
+logger = logging.getLogger(__name__)
+
+# Regressions are flagged when a case runs this much slower than its baseline (0.25 = 25%).
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_BASELINE_FILE = "microbench_baselines.json"
+
+_SUBJECTS = ["biology", "business", "chemistry", "computer science", "economics", "engineering", "health",
+             "history", "law", "math", "other", "philosophy", "physics", "psychology"]
+_WORDS = ("first consider the options carefully then compare each one with what the question asks "
+          "maybe the second choice fits better wait let me recheck the numbers so the result is "
+          "likely correct although option could also work because of the given constraint").split()
+
+
+def _sentence(rng: random.Random, num_words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(num_words))
+
+
+def synthetic_mmlu_rows(num_rows: int, seed: int = 0) -> list[dict]:
+    """Rows shaped like TIGER-Lab/MMLU-Pro (question_id, question, options, answer, answer_index, category)."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(num_rows):
+        num_options = rng.choice([4, 10, 10, 10])
+        answer_index = rng.randrange(num_options)
+        rows.append({
+            "question_id": i,
+            "question": _sentence(rng, rng.randint(15, 80)) + "?",
+            "options": [_sentence(rng, rng.randint(2, 12)) for _ in range(num_options)],
+            "answer": chr(ord('A') + answer_index),
+            "answer_index": answer_index,
+            "category": rng.choice(_SUBJECTS),
+        })
+    return rows
+
+
+def synthetic_responses(num_responses: int, think_words: int = 400, seed: int = 0) -> list[str]:
+    """Reasoning-model responses: a long <think> block followed by an answer in one of the usual formats."""
+    rng = random.Random(seed)
+    endings = ['{{"Answer": "{0}"}}', 'The final answer is {{"Answer": "{0}"}}.', "The answer is ({0})",
+               "Answer: {0}", "I am not sure about this one.", '```json\n{{"answer": "{0}"}}\n```']
+    responses = []
+    for _ in range(num_responses):
+        think = _sentence(rng, rng.randint(think_words // 2, think_words * 2))
+        letter = rng.choice("ABCDEFGHIJ")
+        responses.append(f"<think>{think}</think>\n{rng.choice(endings).format(letter)}")
+    return responses
+
+
+def synthetic_results(num_runs: int, results_per_run: int, seed: int = 0) -> list[tuple[str, list[dict]]]:
+    """Stored-run shaped results for the HTML report: (run_id, result entries)."""
+    rng = random.Random(seed)
+    runs = []
+    for r in range(num_runs):
+        entries = []
+        for m in range(results_per_run):
+            score = rng.uniform(20, 90)
+            entries.append({
+                "model": f"model-{m % 8}:{rng.choice(['4b', '8b', '14b'])}", "benchmark": f"Benchmark {m // 8}",
+                "backend": "ollama", "score": score, "avg_tokens_s": rng.uniform(10, 120),
+                "weighted_tokens_s": rng.uniform(10, 120), "num_questions": 100, "successful_evals": 100,
+                "score_ci": [score - 5, score + 5], "tokens_s_ci": [10.0, 20.0], "energy_wh_ci": None,
+                "total_gpu_energy_wh": rng.uniform(0.5, 5), "avg_cpu_percent": 20.0, "avg_ram_percent": 40.0,
+                "avg_gpu_util_percent": 80.0, "max_gpu_mem_used_gb": rng.uniform(4, 20), "confidence": 0.95,
+                "trials": [{}], "subjects": {s: {"num_questions": 7, "score": score, "avg_tokens_s": 40.0,
+                                                 "avg_output_tokens": 300.0, "latency_p50_s": 2.0,
+                                                 "latency_p90_s": 3.5, "latency_p99_s": 5.0} for s in _SUBJECTS},
+            })
+        runs.append((f"20250101-{r:06d}-bench", entries))
+    return runs
+
+
+# --- Cases ---
+# Each case builds its data for a size scale and returns the function to time; the setup is not timed.
+
+def case_extract_choice(scale: float):
+    from benchmarks.mmlu_pro import MMLUPro
+    benchmark = MMLUPro()
+    responses = synthetic_responses(max(1, int(20_000 * scale)))
+
+    def run():
+        for response in responses:
+            benchmark._extract_choice(response)
+    return run
+
+
+def case_mmlu_load_data(scale: float):
+    from benchmarks import mmlu_pro
+    rows = synthetic_mmlu_rows(max(1, int(100_000 * scale)))
+    benchmark = mmlu_pro.MMLUPro()
+
+    def run():
+        # The Hugging Face download is replaced by the synthetic rows; parsing and prompt building are timed.
+        with mock.patch.object(mmlu_pro, "load_dataset", return_value=rows):
+            questions = benchmark._load_data()
+        assert len(questions) == len(rows)
+    return run
+
+
+def case_format_prompt(scale: float):
+    from benchmarks.mmlu_pro import MMLUPro
+    benchmark = MMLUPro()
+    items = [(row["category"], row["question"], {chr(ord('A') + i): text for i, text in enumerate(row["options"])})
+             for row in synthetic_mmlu_rows(max(1, int(100_000 * scale)))]
+
+    def run():
+        for subject, question, options in items:
+            benchmark._format_prompt(subject, question, options)
+    return run
+
+
+def case_system_monitor_sample(scale: float):
+    from utils.monitoring import SystemMonitor
+    monitor = SystemMonitor()
+    num_samples = max(1, int(1000 * scale))
+
+    def run():
+        for _ in range(num_samples):
+            monitor.sample()
+    return run
+
+
+def case_html_report(scale: float):
+    from reporters.html_reporter import HTMLReporter
+    from utils.results_store import ResultsStore
+    directory = tempfile.mkdtemp(prefix="microbench-")
+    database = os.path.join(directory, "results.db")
+    runs = synthetic_results(max(1, int(100 * scale)), results_per_run=24)
+    with ResultsStore(database) as store:
+        for run_id, entries in runs:
+            store.save_run(run_id, entries)
+    reporter = HTMLReporter({"database": database, "output_file": os.path.join(directory, "report.html")})
+    latest_run_id, latest = runs[-1]
+    latest = [{**entry, "run_id": latest_run_id} for entry in latest]
+
+    def run():
+        reporter.report(latest)
+    return run
+
+
+CASES = {
+    "extract_choice": case_extract_choice,
+    "mmlu_load_data": case_mmlu_load_data,
+    "format_prompt": case_format_prompt,
+    "system_monitor_sample": case_system_monitor_sample,
+    "html_report": case_html_report,
+}
+
+
+def time_case(run, repeat: int = 5) -> float:
+    """The fastest of `repeat` runs, in seconds (the least disturbed by other load on the machine)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def machine_key() -> str:
+    """Baselines only compare on the machine (and Python version) that recorded them."""
+    try:
+        import cpuinfo
+        cpu = cpuinfo.get_cpu_info().get('brand_raw') or platform.machine()
+    except Exception:
+        cpu = platform.machine()
+    return f"{platform.node()} | {cpu} | Python {platform.python_version_tuple()[0]}.{platform.python_version_tuple()[1]}"
+
+
+def compare_to_baseline(timings: dict, baseline: dict | None, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """
+    Returns:
+        list: One row per case: {'case', 'baseline_s': float | None, 'current_s': float,
+              'change': float | None (relative), 'regression': bool}
+    """
+    rows = []
+    for case, current in timings.items():
+        base = (baseline or {}).get(case)
+        change = current / base - 1 if base else None
+        rows.append({"case": case, "baseline_s": base, "current_s": current, "change": change,
+                     "regression": change is not None and change > threshold})
+    return rows
+
+
+def format_comparison(rows: list[dict]) -> str:
+    def ms(value):
+        return f"{value * 1000:.1f}" if value is not None else "N/A"
+
+    table = [[row["case"], ms(row["baseline_s"]), ms(row["current_s"]),
+              f"{row['change'] * 100:+.1f}%" if row["change"] is not None else "N/A",
+              "REGRESSION" if row["regression"] else ("ok" if row["baseline_s"] else "no baseline")]
+             for row in rows]
+    return tabulate(table, headers=["Case", "Baseline (ms)", "Current (ms)", "Change", "Status"], tablefmt="grid")
+
+
+def load_baselines(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the harness's own hot paths on synthetic data and fail on slowdowns against stored baselines.")
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), help='Cases to run (default: all).')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the fastest counts.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Size of the synthetic data (1.0 = 100k MMLU-Pro rows).')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Relative slowdown that counts as a regression (default: 0.25).')
+    parser.add_argument('--baselines', type=str, default=DEFAULT_BASELINE_FILE, help='Baseline file.')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the timings as the new baseline.')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    timings = {}
+    for name in args.cases or CASES:
+        run = CASES[name](args.scale)
+        run() # Warm-up: imports, caches and lazily compiled regexes
+        timings[name] = time_case(run, args.repeat)
+        print(f"{name}: {timings[name] * 1000:.1f} ms")
+
+    baselines = load_baselines(args.baselines)
+    key = machine_key()
+    stored = baselines.get(key) or {}
+    # Timings at another data scale do not compare.
+    baseline = stored.get("cases") if stored.get("scale") == args.scale else None
+    rows = compare_to_baseline(timings, baseline, args.threshold)
+    print(f"\n--- MICROBENCHMARKS ({key}, scale {args.scale:g}) ---")
+    print(format_comparison(rows))
+
+    if args.update_baseline:
+        cases = {**(baseline or {}), **timings}
+        baselines[key] = {"scale": args.scale, "cases": cases}
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Baseline updated in {args.baselines}.")
+        return
+    if baseline is None:
+        print("No baseline for this machine at this scale; record one with --update-baseline.")
+    regressions = [row["case"] for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} case(s) slowed down by more than {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
+import time
 import requests
-import json
 import logging
+from utils.tracing import span
+from utils.request_policy import get_policy, RequestError
 
 logger = logging.getLogger(__name__)
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
 OLLAMA_TAGS_URL = "http://localhost:11434/api/tags"
+OLLAMA_EMBED_URL = "http://localhost:11434/api/embed"
+OLLAMA_PS_URL = "http://localhost:11434/api/ps"
 
 def check_ollama_connection():
     """Checks if the Ollama API is running and reachable."""
@@ -18,57 +22,203 @@ def check_ollama_connection():
         logger.error(f"Error details: {e}")
         return False
 
-def get_ollama_response(model_name: str, prompt: str, options: dict = {}):
+DEFAULT_SYSTEM_PROMPT = "You are an expert AI assistant that excels at following user instructions to answer questions accurately."
+
+
+def _ns_to_s(value):
+    """Converts an Ollama nanosecond duration to seconds, passing None through."""
+    return value / 1_000_000_000 if value is not None else None
+
+
+def generate(model_name: str, prompt: str, options: dict | None = None, **payload_overrides) -> dict:
     """
-    Sends a prompt to the Ollama API and gets a response.
+    Sends a prompt to the Ollama API and returns the response with its timing metrics.
 
     Args:
         model_name (str): The name of the Ollama model to use.
         prompt (str): The prompt to send to the model.
+        options (dict, optional): Model options (temperature, seed, num_ctx, ...).
+        **payload_overrides: Extra top-level fields for the /api/generate payload
+                             (e.g. format, system, keep_alive).
 
     Returns:
-        tuple: (generated_text, tokens_per_second, error_message)
-               tokens_per_second is None if an error occurs or if metrics are unavailable.
-               error_message is None if successful.
+        dict: {'text': str | None, 'tokens_per_second': float | None, 'error': str | None,
+               'prompt_tokens': int | None, 'output_tokens': int | None,
+               'load_duration_s', 'prompt_eval_duration_s', 'eval_duration_s',
+               'total_duration_s', 'ttft_s', 'latency_s': float | None,
+               'error_class': str | None, 'attempts': int}
+               ttft_s is the server-side time to first token (model load + prompt processing);
+               latency_s is the client-side wall time of the successful attempt. Failed attempts
+               are retried as the request policy allows (see `utils.request_policy`); error_class
+               is the class of the final failure (e.g. "timeout", "server_error").
     """
+    result = {
+        "text": None, "tokens_per_second": None, "error": None,
+        "prompt_tokens": None, "output_tokens": None,
+        "load_duration_s": None, "prompt_eval_duration_s": None, "eval_duration_s": None,
+        "total_duration_s": None, "ttft_s": None, "latency_s": None, "error_class": None, "attempts": 0,
+    }
+    start_time = time.perf_counter()
     try:
         payload = {
             "model": model_name,
             "prompt": prompt,
             "stream": False,  
             #"format": "json",  # Request JSON response. This is confusing some models, so not using it for now.
-            "options": options,
-            "system": "You are an expert AI assistant that excels at following user instructions to answer questions accurately."
-
+            "options": options or {},
+            "system": DEFAULT_SYSTEM_PROMPT,
         }
-        response = requests.post(OLLAMA_API_URL, json=payload, timeout=300) 
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        logger.debug(f"Ollama API Response: {response.text}")
-        response_data = response.json()
-        generated_text = response_data.get("response", "{}").strip()
+        payload.update(payload_overrides)
+
+        def attempt(timeout):
+            attempt_start = time.perf_counter()
+            with span("ollama.request", model=model_name):
+                response = requests.post(OLLAMA_API_URL, json=payload, timeout=timeout)
+            latency = time.perf_counter() - attempt_start
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            with span("ollama.decode"):
+                return response.json(), latency
+
+        (response_data, result["latency_s"]), result["attempts"] = get_policy().call(OLLAMA_API_URL, attempt)
+        result["text"] = response_data.get("response", "{}").strip()
 
-        # Calculate tokens per second
         # eval_count = number of tokens in the response
         # eval_duration = nanoseconds for generating the response
         eval_count = response_data.get("eval_count")
         eval_duration_ns = response_data.get("eval_duration")
+        result["prompt_tokens"] = response_data.get("prompt_eval_count")
+        result["output_tokens"] = eval_count
+        result["load_duration_s"] = _ns_to_s(response_data.get("load_duration"))
+        result["prompt_eval_duration_s"] = _ns_to_s(response_data.get("prompt_eval_duration"))
+        result["eval_duration_s"] = _ns_to_s(eval_duration_ns)
+        result["total_duration_s"] = _ns_to_s(response_data.get("total_duration"))
+        if result["prompt_eval_duration_s"] is not None:
+            result["ttft_s"] = (result["load_duration_s"] or 0.0) + result["prompt_eval_duration_s"]
 
-        tokens_per_second = None
+        # Calculate tokens per second
         if eval_count is not None and eval_duration_ns is not None and eval_duration_ns > 0:
-            eval_duration_s = eval_duration_ns / 1_000_000_000  # Convert nanoseconds to seconds
-            tokens_per_second = eval_count / eval_duration_s
-        
-        return generated_text, tokens_per_second, None
+            result["tokens_per_second"] = eval_count / result["eval_duration_s"]
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Ollama API request failed: {e}")
-        return None, None, f"API request failed: {e}"
-    except json.JSONDecodeError:
-        logger.error("Failed to decode Ollama API response.")
-        return None, None, "Failed to decode API response."
+    except RequestError as e:
+        result["error_class"], result["attempts"] = e.error_class, e.attempts
+        if e.error_class == "decode":
+            logger.error("Failed to decode Ollama API response.")
+            result["error"] = "Failed to decode API response."
+        else:
+            logger.error(f"Ollama API request failed after {e.attempts} attempt(s): {e}")
+            result["error"] = f"API request failed: {e}"
+    except Exception as e:
+        logger.error(f"An unexpected error occurred in generate: {e}")
+        result["error"] = f"An unexpected error occurred: {e}"
+        result["error_class"] = "other"
+
+    if result["error"]:
+        result["text"] = None
+        result["tokens_per_second"] = None
+    if result["latency_s"] is None:
+        result["latency_s"] = time.perf_counter() - start_time
+    return result
+
+def embed(model_name: str, inputs: list[str], options: dict | None = None, **payload_overrides) -> dict:
+    """
+    Embeds a batch of texts with the Ollama /api/embed endpoint.
+
+    Args:
+        model_name (str): The name of the Ollama embedding model to use.
+        inputs (list[str]): The texts to embed in one request.
+        options (dict, optional): Model options (num_ctx, ...).
+        **payload_overrides: Extra top-level fields for the /api/embed payload (e.g. truncate, keep_alive).
+
+    Returns:
+        dict: {'embeddings': list[list[float]] | None, 'error': str | None, 'prompt_tokens': int | None,
+               'load_duration_s', 'total_duration_s', 'latency_s': float | None,
+               'error_class': str | None, 'attempts': int}  (see `generate`)
+    """
+    result = {"embeddings": None, "error": None, "prompt_tokens": None,
+              "load_duration_s": None, "total_duration_s": None, "latency_s": None,
+              "error_class": None, "attempts": 0}
+    start_time = time.perf_counter()
+    try:
+        payload = {"model": model_name, "input": inputs, "options": options or {}}
+        payload.update(payload_overrides)
+
+        def attempt(timeout):
+            attempt_start = time.perf_counter()
+            with span("ollama.embed", model=model_name, batch=len(inputs)):
+                response = requests.post(OLLAMA_EMBED_URL, json=payload, timeout=timeout)
+            latency = time.perf_counter() - attempt_start
+            response.raise_for_status()
+            return response.json(), latency
+
+        (response_data, result["latency_s"]), result["attempts"] = get_policy().call(OLLAMA_EMBED_URL, attempt)
+        result["embeddings"] = response_data.get("embeddings")
+        result["prompt_tokens"] = response_data.get("prompt_eval_count")
+        result["load_duration_s"] = _ns_to_s(response_data.get("load_duration"))
+        result["total_duration_s"] = _ns_to_s(response_data.get("total_duration"))
+    except RequestError as e:
+        result["error_class"], result["attempts"] = e.error_class, e.attempts
+        if e.error_class == "decode":
+            logger.error("Failed to decode Ollama embed response.")
+            result["error"] = "Failed to decode API response."
+        else:
+            logger.error(f"Ollama embed request failed after {e.attempts} attempt(s): {e}")
+            result["error"] = f"API request failed: {e}"
     except Exception as e:
-        logger.error(f"An unexpected error occurred in get_ollama_response: {e}")
-        return None, None, f"An unexpected error occurred: {e}"
+        logger.error(f"An unexpected error occurred in embed: {e}")
+        result["error"] = f"An unexpected error occurred: {e}"
+        result["error_class"] = "other"
+
+    if result["error"]:
+        result["embeddings"] = None
+    if result["latency_s"] is None:
+        result["latency_s"] = time.perf_counter() - start_time
+    return result
+
+def unload_model(model_name: str) -> str | None:
+    """
+    Asks Ollama to unload a model right away (a request without a prompt and `keep_alive: 0`).
+
+    Returns:
+        str | None: An error message, or None if the request succeeded.
+    """
+    try:
+        response = requests.post(OLLAMA_API_URL, json={"model": model_name, "keep_alive": 0}, timeout=60)
+        response.raise_for_status()
+        return None
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to unload {model_name}: {e}")
+        return f"Unload request failed: {e}"
+
+def list_loaded_models():
+    """
+    Lists the models Ollama currently holds in memory (/api/ps).
+
+    Returns:
+        tuple: (list of model names, error message or None)
+    """
+    try:
+        response = requests.get(OLLAMA_PS_URL, timeout=10)
+        response.raise_for_status()
+        return [model['name'] for model in response.json().get('models', [])], None
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to list loaded models: {e}")
+        return [], f"Failed to list loaded models: {e}"
+
+def get_ollama_response(model_name: str, prompt: str, options: dict = {}):
+    """
+    Sends a prompt to the Ollama API and gets a response.
+
+    Args:
+        model_name (str): The name of the Ollama model to use.
+        prompt (str): The prompt to send to the model.
+
+    Returns:
+        tuple: (generated_text, tokens_per_second, error_message)
+               tokens_per_second is None if an error occurs or if metrics are unavailable.
+               error_message is None if successful.
+    """
+    result = generate(model_name, prompt, options)
+    return result["text"], result["tokens_per_second"], result["error"]
 
 def list_ollama_models():
     """
@@ -86,6 +236,28 @@ def list_ollama_models():
     except Exception as e:
         return [], f"An unexpected error occurred while fetching models: {e}"
 
+def get_model_digest(model_name: str) -> str | None:
+    """Returns the digest of a local model (it changes whenever the model is re-pulled), or None if unknown."""
+    try:
+        response = requests.get(OLLAMA_TAGS_URL, timeout=10)
+        response.raise_for_status()
+        for model in response.json().get('models', []):
+            if model_name in (model.get('name'), model.get('model')):
+                return model.get('digest')
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Could not look up the digest of {model_name}: {e}")
+    return None
+
+def get_model_sizes() -> dict:
+    """Returns {model name: size on disk in bytes} for the local models, or {} if Ollama is unreachable."""
+    try:
+        response = requests.get(OLLAMA_TAGS_URL, timeout=10)
+        response.raise_for_status()
+        return {model['name']: model.get('size') for model in response.json().get('models', []) if model.get('size')}
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Could not look up the model sizes: {e}")
+        return {}
+
 if __name__ == '__main__':
     # Test the client
     logger.info("Available Ollama models:")
@@ -13,4 +13,38 @@ class BaseReporter(ABC):
         Args:
             results_data (list[dict]): A list of result dictionaries from the evaluator.
         """
-        pass
\ No newline at end of file
+        pass
+
+    @staticmethod
+    def format_ci(ci, digits: int = 2) -> str | None:
+        """Formats a [low, high] confidence interval, or returns None if there is none."""
+        if not ci:
+            return None
+        return f"[{ci[0]:.{digits}f}, {ci[1]:.{digits}f}]"
+
+    SUBJECT_HEADERS = ["Subject", "Questions", "Score (%)", "Tokens/s", "Avg Output Tokens",
+                       "Latency p50 (s)", "Latency p90 (s)", "Latency p99 (s)"]
+
+    @staticmethod
+    def subject_rows(res: dict) -> list[list[str]]:
+        """Formats the per-subject breakdown of a result entry (see SUBJECT_HEADERS); empty without subjects."""
+        def fmt(value, digits=2):
+            return f"{value:.{digits}f}" if value is not None else "N/A"
+
+        return [[subject, str(s['num_questions']), fmt(s['score']), fmt(s['avg_tokens_s']),
+                 fmt(s['avg_output_tokens'], 0), fmt(s['latency_p50_s']), fmt(s['latency_p90_s']),
+                 fmt(s['latency_p99_s'])]
+                for subject, s in (res.get('subjects') or {}).items()]
+
+    @staticmethod
+    def format_early_stop(res: dict) -> str | None:
+        """Summarizes the questions and GPU time adaptive early stopping saved, or returns None."""
+        if res.get('questions_total') is None:
+            return None
+        skipped = res.get('questions_skipped') or 0
+        summary = f"{skipped} of {res['questions_total'] * max(1, len(res.get('trials', [])))} questions skipped"
+        if skipped and res.get('est_gpu_time_saved_s') is not None:
+            summary += f"\n~{res['est_gpu_time_saved_s']:.0f} s GPU time saved"
+        if skipped and res.get('est_energy_saved_wh') is not None:
+            summary += f", ~{res['est_energy_saved_wh']:.4f} Wh"
+        return summary
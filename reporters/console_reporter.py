@@ -2,6 +2,7 @@ import logging
 from datetime import datetime
 from tabulate import tabulate
 from reporters.base_reporter import BaseReporter
+from utils.variant_comparison import compare_variants
 
 logger = logging.getLogger(__name__)
 
@@ -20,24 +21,224 @@ class ConsoleReporter(BaseReporter):
         print(f"\n--- CONSOLE EVALUATION RESULTS ({current_time}) ---")
         print(f"CPU: {cpu_model} | GPU: {gpu_models}")
 
+        confidence = results_data[0].get('confidence', 0.95)
+        ci_label = f"{confidence * 100:g}% CI"
         headers = [
-            "Model", "Benchmark", "Score (%)", "Tokens/s", "Avg CPU %",
-            "Avg RAM %", "Avg GPU %", "GPU Energy (Wh)"
+            "Model", "Benchmark", "Score (%)", f"Score {ci_label}", "Tokens/s", f"Tokens/s {ci_label}",
+            "Avg CPU %", "Avg RAM %", "Avg GPU %", "GPU Energy (Wh)", f"Energy {ci_label}"
         ]
         
+        multiple_engines = len({res.get('backend') for res in results_data}) > 1
         table_data = []
         for res in results_data:
             row = [
-                res.get('model', 'N/A'),
+                f"{res.get('model', 'N/A')} ({res.get('backend')})" if multiple_engines else res.get('model', 'N/A'),
                 res.get('benchmark', 'N/A'),
                 f"{res.get('score', 0):.2f}",
+                self.format_ci(res.get('score_ci')) or "N/A",
                 f"{res.get('avg_tokens_s', 0):.2f}" if res.get('avg_tokens_s') else "N/A",
+                self.format_ci(res.get('tokens_s_ci')) or "N/A",
                 f"{res.get('avg_cpu_percent', 0):.2f}",
                 f"{res.get('avg_ram_percent', 0):.2f}",
                 f"{res.get('avg_gpu_util_percent', 0):.2f}" if 'avg_gpu_util_percent' in res else "N/A",
                 f"{res.get('total_gpu_energy_wh', 0):.6f}" if 'total_gpu_energy_wh' in res else "N/A",
+                self.format_ci(res.get('energy_wh_ci'), digits=6) or "N/A",
             ]
             table_data.append(row)
 
         print(tabulate(table_data, headers=headers, tablefmt="grid"))
-        print("--- END OF CONSOLE REPORT ---")
\ No newline at end of file
+        if any(len(res.get('trials', [])) > 1 for res in results_data):
+            print(f"Scores, tokens/s and energy are averaged over {len(results_data[0].get('trials', []))} trials.")
+        early_stopped = [res for res in results_data if res.get('questions_total') is not None]
+        if early_stopped:
+            print("Adaptive early stopping:")
+            for res in early_stopped:
+                summary = self.format_early_stop(res).replace("\n", ", ")
+                reason = f" ({res['stop_reason']})" if res.get('stop_reason') else ""
+                print(f"  {res.get('model', 'N/A')} on {res.get('benchmark', 'N/A')}: {summary}{reason}")
+        for res in results_data:
+            if res.get('num_errors') or res.get('retries'):
+                errors = ", ".join(f"{name} {count}" for name, count in sorted((res.get('error_counts') or {}).items()))
+                print(f"Request errors for {res.get('model', 'N/A')} on {res.get('benchmark', 'N/A')}: "
+                      f"{res.get('num_errors', 0)} failed{f' ({errors})' if errors else ''}, {res.get('retries', 0)} retries "
+                      f"(failed questions are not scored)")
+        for res in results_data:
+            if res.get('avg_exec_time_s') is not None:
+                generation = f"{res['avg_latency_s']:.2f} s" if res.get('avg_latency_s') is not None else "N/A"
+                print(f"{res.get('model', 'N/A')} on {res.get('benchmark', 'N/A')}: generation {generation}, "
+                      f"test execution {res['avg_exec_time_s']:.2f} s per problem")
+        for res in results_data:
+            if res.get('judge_time_s') is not None:
+                print(f"Judge cost for {res.get('model', 'N/A')} on {res.get('benchmark', 'N/A')} (not included above): "
+                      f"{res['judge_prompt_tokens']:.0f} prompt + {res['judge_output_tokens']:.0f} output tokens, "
+                      f"{res['judge_time_s']:.1f} s")
+        if self.config.get('subject_breakdown', True):
+            self._print_subject_breakdown(results_data)
+        self._print_engine_comparison(results_data)
+        self._print_variant_comparison(results_data)
+        self._print_answer_mode_comparison(results_data)
+        self._print_self_consistency_scaling(results_data)
+        self._print_long_context_scaling(results_data)
+        self._print_embedding_throughput(results_data)
+        self._print_model_load_profile(results_data)
+        print("--- END OF CONSOLE REPORT ---")
+
+    def _print_embedding_throughput(self, results_data: list[dict]):
+        """Shows documents/s, tokens/s, batch latency percentiles and peak memory per batch size and concurrency."""
+        entries = [res for res in results_data if res.get('embedding_batch_size') is not None]
+        if not entries:
+            return
+        entries.sort(key=lambda res: (res.get('model', ''), res['embedding_batch_size'], res['embedding_concurrency']))
+
+        def fmt(value, digits=2):
+            return f"{value:.{digits}f}" if value is not None else "N/A"
+
+        headers = ["Model", "Batch Size", "Concurrency", "Docs/s", "Tokens/s", "Batch p50 (s)", "Batch p95 (s)",
+                   "Batch p99 (s)", "Peak RAM (GB)", "Peak VRAM (GB)", "Errors"]
+        rows = [[
+            res.get('model', 'N/A'), res['embedding_batch_size'], res['embedding_concurrency'],
+            fmt(res.get('docs_per_s'), 1), fmt(res.get('embed_tokens_per_s'), 1), fmt(res.get('batch_latency_p50_s'), 3),
+            fmt(res.get('batch_latency_p95_s'), 3), fmt(res.get('batch_latency_p99_s'), 3),
+            fmt(res.get('max_ram_used_gb')), fmt(res.get('max_gpu_mem_used_gb')), res.get('num_errors', 0),
+        ] for res in entries]
+        print("Embedding throughput:")
+        print(tabulate(rows, headers=headers, tablefmt="grid"))
+
+    def _print_model_load_profile(self, results_data: list[dict]):
+        """Shows cold load time, time to first response, memory added by the load and warm latency per model."""
+        entries = [res for res in results_data if 'cold_load_s' in res]
+        if not entries:
+            return
+
+        def fmt(value, digits=2):
+            return f"{value:.{digits}f}" if value is not None else "N/A"
+
+        headers = ["Model", "Cold Trials", "Load (s)", "Load Range (s)", "Cold TTFT (s)", "First Response (s)",
+                   "RAM Added (GB)", "VRAM Added (GB)", "Warm Latency (s)", "Warm TTFT (s)"]
+        rows = [[
+            res.get('model', 'N/A'), res.get('cold_trials', 0), fmt(res.get('cold_load_s')),
+            f"{fmt(res.get('cold_load_min_s'))}-{fmt(res.get('cold_load_max_s'))}" if res.get('cold_trials') else "N/A",
+            fmt(res.get('cold_ttft_s')), fmt(res.get('cold_first_response_s')), fmt(res.get('load_ram_increase_gb')),
+            fmt(res.get('load_vram_increase_gb')), fmt(res.get('warm_latency_s'), 3), fmt(res.get('warm_ttft_s'), 3),
+        ] for res in entries]
+        print("Cold start vs warm state:")
+        print(tabulate(rows, headers=headers, tablefmt="grid"))
+
+    def _print_long_context_scaling(self, results_data: list[dict]):
+        """Shows retrieval accuracy, prompt throughput, TTFT and peak memory per context length (and model)."""
+        entries = [res for res in results_data if res.get('context_length') is not None]
+        if not entries:
+            return
+        entries.sort(key=lambda res: (res.get('model', ''), res['context_length'], res.get('num_ctx') or 0))
+
+        def fmt(value, digits=2):
+            return f"{value:.{digits}f}" if value is not None else "N/A"
+
+        headers = ["Model", "Context (tokens)", "num_ctx", "Prompt Tokens", "Retrieval (%)", "Prompt Tokens/s",
+                   "Median TTFT (s)", "Peak RAM (GB)", "Peak VRAM (GB)"]
+        rows = [[
+            res.get('model', 'N/A'), res['context_length'], res.get('num_ctx'), fmt(res.get('avg_prompt_tokens'), 0),
+            fmt(res.get('score')), fmt(res.get('avg_prompt_tokens_s'), 1), fmt(res.get('median_ttft_s')),
+            fmt(res.get('max_ram_used_gb')), fmt(res.get('max_gpu_mem_used_gb')),
+        ] for res in entries]
+        print("Long-context scaling:")
+        print(tabulate(rows, headers=headers, tablefmt="grid"))
+
+    def _print_subject_breakdown(self, results_data: list[dict]):
+        """Prints score, tokens/s, output length and latency percentiles per subject of each entry."""
+        for res in results_data:
+            rows = self.subject_rows(res)
+            if len(rows) > 1:
+                print(f"Per-subject breakdown for {res.get('model', 'N/A')} on {res.get('benchmark', 'N/A')}:")
+                print(tabulate(rows, headers=self.SUBJECT_HEADERS, tablefmt="simple"))
+
+    def _print_variant_comparison(self, results_data: list[dict]):
+        """Compares the sizes and quantizations of each base model, marking the Pareto-optimal ones."""
+        comparisons = compare_variants(results_data, self.config.get('model_families'))
+        if not comparisons:
+            return
+
+        def fmt(value, digits=2):
+            return f"{value:.{digits}f}" if value is not None else "N/A"
+
+        headers = ["Base Model", "Benchmark", "Variant", "Score (%)", "Tokens/s (weighted)", "Peak Mem (GB)",
+                   "Wh per Correct", "Pareto"]
+        rows = []
+        for group in comparisons:
+            family = group['family'] + (f" ({group['backend']})" if group['backend'] != "ollama" else "")
+            for variant in group['variants']:
+                rows.append([family, group['benchmark'], variant['model'], fmt(variant['score']),
+                             fmt(variant['weighted_tokens_s']), fmt(variant['peak_memory_gb']),
+                             fmt(variant['energy_per_correct_wh'], 5), "*" if variant['pareto'] else ""])
+        print("Variant comparison (* = Pareto-optimal on score, tokens/s, memory and energy per correct answer):")
+        print(tabulate(rows, headers=headers, tablefmt="grid"))
+
+    def _print_engine_comparison(self, results_data: list[dict]):
+        """Puts the inference engines side by side for every model and benchmark run on more than one."""
+        by_pair = {}
+        for res in results_data:
+            by_pair.setdefault((res.get('model', 'N/A'), res.get('benchmark', 'N/A')), []).append(res)
+        pairs = {pair: entries for pair, entries in by_pair.items() if len({r.get('backend') for r in entries}) > 1}
+        if not pairs:
+            return
+
+        def fmt(value, digits=2):
+            return f"{value:.{digits}f}" if value is not None else "N/A"
+
+        headers = ["Model", "Benchmark", "Engine", "Score (%)", "Tokens/s", "Prompt Tokens/s", "Median TTFT (s)",
+                   "Avg Latency (s)", "GPU Energy (Wh)"]
+        rows = []
+        for (model, benchmark), entries in pairs.items():
+            for res in entries:
+                rows.append([model, benchmark, res.get('backend', 'N/A'), fmt(res.get('score')),
+                             fmt(res.get('avg_tokens_s')), fmt(res.get('avg_prompt_tokens_s'), 1),
+                             fmt(res.get('median_ttft_s'), 3), fmt(res.get('avg_latency_s')),
+                             fmt(res.get('total_gpu_energy_wh'), 4)])
+        print("Engine comparison:")
+        print(tabulate(rows, headers=headers, tablefmt="grid"))
+
+    def _print_self_consistency_scaling(self, results_data: list[dict]):
+        """Shows accuracy against total tokens, generation wall time and energy for each k (and model)."""
+        entries = [res for res in results_data if res.get('self_consistency_k') is not None]
+        if not entries:
+            return
+        entries.sort(key=lambda res: (res['self_consistency_of'], res.get('total_time_s') or 0))
+        headers = ["Benchmark", "Model", "k", "Score (%)", "Total Tokens", "Wall Time (s)", "GPU Energy (Wh)"]
+        rows = [[
+            res['self_consistency_of'], res.get('model', 'N/A'), res['self_consistency_k'], f"{res.get('score', 0):.2f}",
+            res.get('total_tokens', 0), f"{res.get('total_time_s', 0):.1f}",
+            f"{res['total_gpu_energy_wh']:.4f}" if res.get('total_gpu_energy_wh') is not None else "N/A",
+        ] for res in entries]
+        print("Self-consistency scaling (sorted by wall time):")
+        print(tabulate(rows, headers=headers, tablefmt="grid"))
+
+    def _print_answer_mode_comparison(self, results_data: list[dict]):
+        """Compares benchmarks run in several answer modes (e.g. free-form vs. constrained) per model."""
+        groups = {}
+        for res in results_data:
+            if res.get('answer_mode') and res.get('variant_of'):
+                groups.setdefault((res.get('model'), res['variant_of']), []).append(res)
+        groups = {key: entries for key, entries in groups.items() if len(entries) > 1}
+        if not groups:
+            return
+
+        def fmt(value, digits=2):
+            return f"{value:.{digits}f}" if value is not None else "N/A"
+
+        headers = ["Model", "Benchmark", "Mode", "Score (%)", "Score vs free (pp)", "Tokens/s",
+                   "Avg Output Tokens", "Avg Latency (s)", "Generation Time Saved"]
+        rows = []
+        for (model, benchmark), entries in groups.items():
+            free = next((e for e in entries if e['answer_mode'] == 'free'), entries[0])
+            for res in entries:
+                saved = None
+                if res is not free and free.get('avg_latency_s') and res.get('avg_latency_s') is not None:
+                    saved = f"{(1 - res['avg_latency_s'] / free['avg_latency_s']) * 100:.1f}%"
+                delta = res.get('score', 0) - free.get('score', 0) if res is not free else None
+                rows.append([
+                    model, benchmark, res['answer_mode'], fmt(res.get('score')),
+                    f"{delta:+.2f}" if delta is not None else "-", fmt(res.get('avg_tokens_s')),
+                    fmt(res.get('avg_output_tokens'), 1), fmt(res.get('avg_latency_s'), 3), saved or "-",
+                ])
+        print("Answer mode comparison:")
+        print(tabulate(rows, headers=headers, tablefmt="grid"))
\ No newline at end of file
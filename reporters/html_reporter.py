@@ -1,12 +1,16 @@
 import os
+import html
+import uuid
 import logging
 from datetime import datetime
 from reporters.base_reporter import BaseReporter
+from utils.results_store import ResultsStore
+from utils.variant_comparison import compare_variants
 
 logger = logging.getLogger(__name__)
 
 # Define the HTML templates directly within the reporter file
-HTML_BASE_TEMPLATE = """
+HTML_PAGE_TEMPLATE = """
 <html>
 <head>
     <title>LLM Evaluation Results Log</title>
@@ -27,12 +31,46 @@ HTML_BASE_TEMPLATE = """
         th, td {{ border: 1px solid #e9ecef; text-align: left; padding: 10px; }}
         th {{ background-color: #007bff; color: white; font-weight: bold; white-space: nowrap; }}
         tr:nth-child(even) {{ background-color: #f2f2f2; }}
+        tr.pareto td {{ font-weight: bold; }}
+        .run-container h3 {{ color: #495057; margin-top: 24px; }}
+        tr.subject-row > td {{ background-color: #ffffff; padding: 4px 10px; }}
+        tr.subject-row summary {{ cursor: pointer; color: #007bff; }}
+        tr.subject-row table {{ margin: 8px 0; font-size: 0.95em; }}
         .na-value {{ color: #999; font-style: italic; }}
+        .filters, .pagination {{ text-align: center; margin-bottom: 20px; }}
+        .filters select, .filters input {{ margin: 0 6px; padding: 4px; }}
+        .pagination a, .pagination span {{ margin: 0 4px; }}
     </style>
 </head>
 <body>
     <h1>LLM Evaluation Results Log</h1>
-    </body>
+    <div class="filters">
+        Model: <select id="model-filter" onchange="applyFilters()"><option value="">All</option>{model_options}</select>
+        Benchmark: <select id="benchmark-filter" onchange="applyFilters()"><option value="">All</option>{benchmark_options}</select>
+        Search: <input id="text-filter" type="text" oninput="applyFilters()" placeholder="model, benchmark, tag...">
+    </div>
+    {pagination}
+    {runs}
+    {pagination}
+    <script>
+    function applyFilters() {{
+        var model = document.getElementById('model-filter').value;
+        var benchmark = document.getElementById('benchmark-filter').value;
+        var text = document.getElementById('text-filter').value.toLowerCase();
+        document.querySelectorAll('.run-container').forEach(function (run) {{
+            var visibleRows = 0;
+            run.querySelectorAll('tr.result-row').forEach(function (row) {{
+                var show = (!model || row.dataset.model === model)
+                    && (!benchmark || row.dataset.benchmark === benchmark)
+                    && (!text || run.innerText.toLowerCase().indexOf(text) !== -1);
+                row.style.display = show ? '' : 'none';
+                if (show) {{ visibleRows++; }}
+            }});
+            run.style.display = visibleRows ? '' : 'none';
+        }});
+    }}
+    </script>
+</body>
 </html>
 """
 
@@ -40,7 +78,7 @@ RUN_TEMPLATE = """
 <div class="run-container">
     <div class="run-header">
         <h2>Evaluation Run: {datetime}</h2>
-        <p>CPU: {cpu_model}<br>GPU: {gpu_models}</p>
+        <p>Run ID: {run_id}{tag}<br>CPU: {cpu_model}<br>GPU: {gpu_models}</p>
     </div>
     <table>
         <thead>
@@ -50,100 +88,221 @@ RUN_TEMPLATE = """
             {table_rows}
         </tbody>
     </table>
+    {variant_comparison}
 </div>
 """
 
+VARIANT_COMPARISON_TEMPLATE = """
+    <h3>Variant comparison</h3>
+    <p>Sizes and quantizations of each base model. Bold rows are Pareto-optimal: no other variant is at least as good on score, tokens/s, peak memory and energy per correct answer and better on one.</p>
+    <table>
+        <thead>
+            <tr><th>Base Model</th><th>Benchmark</th><th>Variant</th><th>Score (%)</th><th>Tokens/s (weighted)</th><th>Peak Mem (GB)</th><th>Wh per Correct</th><th>Pareto</th></tr>
+        </thead>
+        <tbody>
+            {rows}
+        </tbody>
+    </table>
+"""
+
+NA_HTML = '<span class="na-value">N/A</span>'
+
+
 class HTMLReporter(BaseReporter):
-    """Saves evaluation results to a cumulative HTML file."""
+    """
+    Renders the evaluation history stored in the results database as paginated HTML pages.
+
+    The newest runs are on `output_file`; all runs are archived on `<name>_page1.html` (oldest),
+    `<name>_page2.html`, etc. Each page can be filtered by model, benchmark or free text.
+    """
     config_key = "html" # Define config key for auto-discovery
 
     def __init__(self, config: dict):
         super().__init__(config)
         self.output_filename = self.config.get('output_file', 'evaluation_results.html')
+        self.database = self.config.get('database', 'results.db')
+        self.runs_per_page = max(1, int(self.config.get('runs_per_page', 20)))
 
     def report(self, results_data: list[dict]):
         if not results_data:
             logger.warning("No results were generated, skipping HTML report generation.")
             return
 
-        # --- START OF THE CORRECTED LOGIC ---
-        
-        static_info = results_data[0].get('static_info', {})
-        current_time_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        headers = [
-            "Model", "Benchmark", "Score (%)", "Tokens/s", "Avg CPU %", 
-            "Avg RAM %", "Avg GPU %", "GPU Energy (Wh)"
+        with ResultsStore(self.database) as store:
+            if not results_data[0].get('run_id'):
+                # Results that were not saved by the caller are stored here, so they show up in the history.
+                run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+                store.save_run(run_id, results_data)
+            self.render(store)
+
+    def page_filename(self, page: int) -> str:
+        """Returns the file name of the given (1-based) archive page; page 1 holds the oldest runs."""
+        stem, ext = os.path.splitext(self.output_filename)
+        return f"{stem}_page{page}{ext or '.html'}"
+
+    def render(self, store: ResultsStore):
+        """
+        Renders `output_file` (the newest runs) and the archive pages that changed.
+
+        Archive pages are numbered oldest-first, so a full page never changes again: only the
+        newest page is rewritten, plus the one before it when a run has just started a new page
+        (its "newer" link appears) and any page whose file is missing.
+        """
+        total_runs = store.count_runs()
+        num_pages = max(1, -(-total_runs // self.runs_per_page))
+        runs_on_newest_page = total_runs - (num_pages - 1) * self.runs_per_page
+        pages = [page for page in range(1, num_pages + 1)
+                 if page == num_pages or (page == num_pages - 1 and runs_on_newest_page == 1)
+                 or not os.path.exists(self.page_filename(page))]
+
+        try:
+            for page in pages:
+                runs = store.list_runs(limit=self.runs_per_page, offset=(page - 1) * self.runs_per_page,
+                                       in_storage_order=True)
+                self._write_page(self.page_filename(page), runs[::-1], store,
+                                 self._render_archive_pagination(page, num_pages))
+            self._write_page(self.output_filename, store.list_runs(limit=self.runs_per_page), store,
+                             self._render_index_pagination(num_pages))
+        except IOError as e:
+            logger.error(f"Error writing HTML report {self.output_filename}: {e}")
+            return
+        logger.info(f"HTML report successfully generated and saved to {self.output_filename} "
+                    f"({num_pages} archive page(s), {len(pages)} rewritten)")
+
+    def _write_page(self, filename: str, runs: list[dict], store: ResultsStore, pagination: str):
+        """Renders runs (newest first) into one page, written atomically so readers never see half a page."""
+        results = store.get_runs_results(runs)
+        entries = [res for run in runs for res in results[run['run_id']]]
+        models = sorted({str(res.get('model')) for res in entries})
+        benchmarks = sorted({str(res.get('benchmark')) for res in entries})
+        page_html = HTML_PAGE_TEMPLATE.format(
+            model_options="".join(f'<option value="{html.escape(m)}">{html.escape(m)}</option>' for m in models),
+            benchmark_options="".join(f'<option value="{html.escape(b)}">{html.escape(b)}</option>' for b in benchmarks),
+            pagination=pagination,
+            runs="\n".join(self._render_run(run, results[run['run_id']]) for run in runs),
+        )
+        temp_filename = f"{filename}.tmp"
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            f.write(page_html)
+        os.replace(temp_filename, filename)
+
+    def _page_link(self, filename: str, text: str) -> str:
+        return f'<a href="{html.escape(os.path.basename(filename))}">{text}</a>'
+
+    def _render_index_pagination(self, num_pages: int) -> str:
+        if num_pages == 1:
+            return ""
+        links = [self._page_link(self.page_filename(p), str(p)) for p in range(num_pages, 0, -1)]
+        return f'<div class="pagination">Latest runs | All runs, newest page first: {" ".join(links)}</div>'
+
+    def _render_archive_pagination(self, page: int, num_pages: int) -> str:
+        # Links only to pages that already exist, so full pages stay correct without re-rendering.
+        links = [self._page_link(self.output_filename, "Latest")]
+        if page < num_pages:
+            links.append(self._page_link(self.page_filename(page + 1), "&laquo; Newer"))
+        links.append(f"<span>Page {page}</span>")
+        if page > 1:
+            links.append(self._page_link(self.page_filename(page - 1), "Older &raquo;"))
+        return f'<div class="pagination">{" ".join(links)}</div>'
+
+    def get_headers(self) -> list[str]:
+        return [
+            "Model", "Engine", "Benchmark", "Score (%)", "Score CI", "Tokens/s", "Tokens/s CI", "Trials",
+            "Avg CPU %", "Avg RAM %", "Avg GPU %", "GPU Energy (Wh)", "Energy CI (Wh)", "Early Stop"
         ]
-        header_html = "<tr>" + "".join(f"<th>{h}</th>" for h in headers) + "</tr>"
 
-        rows_html_list = []
-        # Loop through each result and build the HTML row
-        for res in results_data:
-            row_html = "<tr>"
-            row_html += f"<td>{res.get('model', 'N/A')}</td>"
-            row_html += f"<td>{res.get('benchmark', 'N/A')}</td>"
-
-            # --- Simplified and Corrected Formatting Logic ---
-
-            # Format Score
-            score_val = res.get('score')
-            score_str = f"{score_val:.2f}" if score_val is not None else '<span class="na-value">N/A</span>'
-            row_html += f"<td>{score_str}</td>"
-
-            # Format Tokens/Second
-            tps_val = res.get('avg_tokens_s')
-            tps_str = f"{tps_val:.2f}" if tps_val is not None else '<span class="na-value">N/A</span>'
-            row_html += f"<td>{tps_str}</td>"
-
-            # Format required system metrics
-            row_html += f"<td>{res.get('avg_cpu_percent', 0):.2f}</td>"
-            row_html += f"<td>{res.get('avg_ram_percent', 0):.2f}</td>"
-
-            # Format optional GPU metrics
-            if 'avg_gpu_util_percent' in res:
-                gpu_util_str = f"{res.get('avg_gpu_util_percent', 0):.2f}"
-                gpu_energy_str = f"{res.get('total_gpu_energy_wh', 0):.6f}"
-                row_html += f"<td>{gpu_util_str}</td>"
-                row_html += f"<td>{gpu_energy_str}</td>"
-            else:
-                row_html += '<td><span class="na-value">N/A</span></td>'
-                row_html += '<td><span class="na-value">N/A</span></td>'
+    def render_cells(self, res: dict) -> list[str]:
+        """Returns the HTML contents of each table cell for one result entry."""
+        # Runs stored before backends existed all used Ollama.
+        cells = [html.escape(str(res.get('model', 'N/A'))), html.escape(str(res.get('backend', 'ollama'))),
+                 html.escape(str(res.get('benchmark', 'N/A')))]
+
+        # Format Score
+        score_val = res.get('score')
+        cells.append(f"{score_val:.2f}" if score_val is not None else NA_HTML)
+        cells.append(self.format_ci(res.get('score_ci')) or NA_HTML)
+
+        # Format Tokens/Second
+        tps_val = res.get('avg_tokens_s')
+        cells.append(f"{tps_val:.2f}" if tps_val is not None else NA_HTML)
+        cells.append(self.format_ci(res.get('tokens_s_ci')) or NA_HTML)
+        cells.append(str(len(res['trials'])) if res.get('trials') else NA_HTML)
+
+        # Format required system metrics
+        cells.append(f"{res.get('avg_cpu_percent', 0):.2f}")
+        cells.append(f"{res.get('avg_ram_percent', 0):.2f}")
+
+        # Format optional GPU metrics
+        if 'avg_gpu_util_percent' in res:
+            cells.append(f"{res.get('avg_gpu_util_percent', 0):.2f}")
+            cells.append(f"{res.get('total_gpu_energy_wh', 0):.6f}")
+        else:
+            cells.extend([NA_HTML, NA_HTML])
+        cells.append(self.format_ci(res.get('energy_wh_ci'), digits=6) or NA_HTML)
+        early_stop = self.format_early_stop(res)
+        cells.append(html.escape(early_stop, quote=False).replace("\n", "<br>") if early_stop else NA_HTML)
+        return cells
 
+    def _render_run(self, run: dict, results: list[dict]) -> str:
+        header_html = "<tr>" + "".join(f"<th>{h}</th>" for h in self.get_headers()) + "</tr>"
+        rows_html_list = []
+        for res in results:
+            row_html = (
+                f'<tr class="result-row" data-model="{html.escape(str(res.get("model", "")))}" '
+                f'data-benchmark="{html.escape(str(res.get("benchmark", "")))}">'
+            )
+            row_html += "".join(f"<td>{cell}</td>" for cell in self.render_cells(res))
             row_html += "</tr>"
             rows_html_list.append(row_html)
-        
-        table_rows_html = "\n".join(rows_html_list)
-
-        # Create the complete HTML block for this new run
-        new_run_html = RUN_TEMPLATE.format(
-            datetime=current_time_str,
-            cpu_model=static_info.get('cpu_model', 'N/A'),
-            gpu_models=static_info.get('gpu_models', 'N/A'),
+            subjects_html = self._render_subject_breakdown(res)
+            if subjects_html:
+                rows_html_list.append(subjects_html)
+
+        try:
+            run_time = datetime.fromisoformat(run['started_at']).strftime("%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError):
+            run_time = run.get('started_at') or 'N/A'
+
+        return RUN_TEMPLATE.format(
+            datetime=run_time,
+            run_id=html.escape(run['run_id']),
+            tag=f" | Tag: {html.escape(run['tag'])}" if run.get('tag') else "",
+            cpu_model=html.escape(run.get('cpu_model') or 'N/A'),
+            gpu_models=html.escape(run.get('gpu_models') or 'N/A'),
             header_row=header_html,
-            table_rows=table_rows_html
+            table_rows="\n".join(rows_html_list),
+            variant_comparison=self._render_variant_comparison(results),
         )
 
-        # Read existing file or create a new one and insert the new block
-        file_content = ""
-        if os.path.exists(self.output_filename):
-            with open(self.output_filename, 'r', encoding='utf-8') as f:
-                file_content = f.read()
-        
-        if not file_content:
-            file_content = HTML_BASE_TEMPLATE
-
-        insertion_point = "</h1>"
-        if insertion_point in file_content:
-            parts = file_content.split(insertion_point)
-            final_html = parts[0] + insertion_point + "\n" + new_run_html + "\n".join(parts[1:])
-        else:
-             final_html = file_content.replace("", new_run_html)
+    def _render_subject_breakdown(self, res: dict) -> str:
+        """A collapsible row under the result row, with the per-subject breakdown (if there are several subjects)."""
+        rows = self.subject_rows(res)
+        if len(rows) < 2:
+            return ""
+        header = "".join(f"<th>{h}</th>" for h in self.SUBJECT_HEADERS)
+        body = "".join("<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>" for row in rows)
+        return (
+            f'<tr class="result-row subject-row" data-model="{html.escape(str(res.get("model", "")))}" '
+            f'data-benchmark="{html.escape(str(res.get("benchmark", "")))}">'
+            f'<td colspan="{len(self.get_headers())}"><details><summary>Per-subject breakdown ({len(rows)} subjects)</summary>'
+            f'<table><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table></details></td></tr>'
+        )
 
-        # Write the updated content back to the file
-        try:
-            with open(self.output_filename, 'w', encoding='utf-8') as f:
-                f.write(final_html)
-            logger.info(f"HTML report successfully generated and saved to {self.output_filename}")
-        except IOError as e:
-            logger.error(f"Error writing HTML file {self.output_filename}: {e}")
\ No newline at end of file
+    def _render_variant_comparison(self, results: list[dict]) -> str:
+        comparisons = compare_variants(results, self.config.get('model_families'))
+        if not comparisons:
+            return ""
+
+        def fmt(value, digits=2):
+            return f"{value:.{digits}f}" if value is not None else NA_HTML
+
+        rows = []
+        for group in comparisons:
+            family = group['family'] + (f" ({group['backend']})" if group['backend'] != "ollama" else "")
+            for variant in group['variants']:
+                cells = [html.escape(family), html.escape(str(group['benchmark'])), html.escape(str(variant['model'])),
+                         fmt(variant['score']), fmt(variant['weighted_tokens_s']), fmt(variant['peak_memory_gb']),
+                         fmt(variant['energy_per_correct_wh'], 5), "&#9733;" if variant['pareto'] else ""]
+                row_class = ' class="pareto"' if variant['pareto'] else ""
+                rows.append(f"<tr{row_class}>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+        return VARIANT_COMPARISON_TEMPLATE.format(rows="\n".join(rows))
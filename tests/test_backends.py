@@ -0,0 +1,66 @@
+import json
+
+import backends.openai_compatible as openai_compatible
+from backends.llama_cpp import LlamaCppBackend
+from backends.openai_compatible import OpenAICompatibleBackend
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.lines = [f"data: {json.dumps(chunk)}" for chunk in chunks] + ["data: [DONE]"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+
+def content(text):
+    return {"choices": [{"delta": {"content": text}}]}
+
+
+def test_openai_backend_measures_timings_from_the_stream(monkeypatch):
+    sent = {}
+
+    def fake_post(url, json=None, **kwargs):
+        sent.update(json)
+        return FakeStream([content("The answer"), content(" is 4."),
+                           {"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": 3}}])
+
+    monkeypatch.setattr(openai_compatible.requests, "post", fake_post)
+    backend = OpenAICompatibleBackend(model_aliases={"qwen3:8b": "Qwen/Qwen3-8B"})
+    result = backend.generate("qwen3:8b", "2+2?", {"num_predict": 8, "num_ctx": 4096}, format={"type": "object"})
+
+    assert sent["model"] == "Qwen/Qwen3-8B"
+    assert sent["max_tokens"] == 8 and "num_ctx" not in sent
+    assert sent["response_format"]["json_schema"]["schema"] == {"type": "object"}
+    assert result["text"] == "The answer is 4."
+    assert (result["prompt_tokens"], result["output_tokens"]) == (12, 3)
+    assert result["error"] is None and result["ttft_s"] is not None
+
+
+def test_llama_cpp_backend_uses_server_timings(monkeypatch):
+    timings = {"prompt_n": 100, "prompt_ms": 250.0, "predicted_n": 40, "predicted_ms": 2000.0}
+    monkeypatch.setattr(openai_compatible.requests, "post",
+                        lambda url, json=None, **kwargs: FakeStream([content("ok"), {"choices": [], "timings": timings}]))
+    result = LlamaCppBackend().generate("model", "prompt")
+
+    assert result["ttft_s"] == 0.25
+    assert result["tokens_per_second"] == 20.0
+    assert (result["prompt_tokens"], result["output_tokens"]) == (100, 40)
+
+
+def test_loaded_backends_are_the_classes_the_evaluator_checks_for():
+    from main import load_backends
+    from backends.ollama_backend import OllamaBackend
+    backends = load_backends({"backends": {"OllamaBackend": {"enabled": True},
+                                           "LlamaCppBackend": {"enabled": True, "name": "llama.cpp"}}})
+    assert isinstance(backends[0], OllamaBackend) # Benchmarks with their own requests run only on Ollama
+    assert isinstance(backends[1], LlamaCppBackend)
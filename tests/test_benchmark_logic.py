@@ -1,5 +1,6 @@
 import pytest
 from benchmarks.mmlu_pro import MMLUPro
+from benchmarks.long_context import LongContextNeedle
 
 # We need an instance to test the private method
 # In a real scenario, you might initialize it with minimal/mock data
@@ -17,4 +18,49 @@ adapter = MMLUPro()
 ])
 def test_extract_choice(response, expected):
     """Tests the _extract_choice logic with various response formats."""
-    assert adapter._extract_choice(response) == expected
\ No newline at end of file
+    assert adapter._extract_choice(response) == expected
+
+def test_constrained_mode_requests_letter_schema_and_reads_truncated_json():
+    """The constrained variant restricts output to the question's letters; its stop sequence drops the closing brace."""
+    free, constrained = MMLUPro(answer_mode="both").get_variants()
+    question = {"id": "law_1", "options": {"A": "x", "B": "y", "C": None}, "correct_answer_char": "B"}
+    assert free.get_generation_overrides(question) == {}
+    overrides = constrained.get_generation_overrides(question)
+    assert overrides["format"]["properties"]["Answer"]["enum"] == ["A", "B"]
+    assert overrides["options"]["num_predict"] == MMLUPro.CONSTRAINED_NUM_PREDICT
+    assert constrained.get_name().endswith("[constrained]")
+    assert constrained.evaluate_with_details('{"Answer": "B"', question)[0] == 1.0
+
+
+def test_long_context_needle_variants_and_scoring():
+    variants = LongContextNeedle(context_lengths=[1000, 4000], depths=[0.5], needles_per_depth=1).get_variants()
+    assert [(v.context_length, v.num_ctx) for v in variants] == [(1000, 1512), (4000, 4512)]
+    short, long = variants[0].get_questions()[0], variants[1].get_questions()[0]
+    assert len(long["prompt"]) > 3 * len(short["prompt"])
+    assert f"is {short['passkey']}." in short["prompt"]
+    assert variants[0].evaluate(f"The passkey is {short['passkey']}.", short) == 1.0
+    assert variants[0].evaluate("12345", {**short, "passkey": "99999"}) == 0.0
+    assert variants[0].get_generation_overrides(short)["options"]["num_ctx"] == 1512
+
+def test_model_load_profile_unloads_then_measures_cold_and_warm(monkeypatch):
+    from benchmarks import model_load
+    calls, memory = [], iter([{"ram_used_gb": 10.0, "gpu_mem_used_gb": 1.0}, {"ram_used_gb": 11.0, "gpu_mem_used_gb": 6.5}])
+    monkeypatch.setattr(model_load, "unload_model", lambda model: calls.append(("unload", model)))
+    monkeypatch.setattr(model_load, "list_loaded_models", lambda: ([], None))
+    monkeypatch.setattr(model_load.SystemMonitor, "sample", lambda self: next(memory))
+
+    def fake_generate(model, prompt, options, **payload):
+        calls.append(("generate", payload["keep_alive"], options["num_predict"]))
+        cold = sum(1 for c in calls if c[0] == "generate") == 1
+        return {"text": "ready", "error": None, "tokens_per_second": 50.0, "prompt_tokens": 10, "output_tokens": 2,
+                "latency_s": 4.0 if cold else 0.25, "ttft_s": 3.9 if cold else 0.05, "load_duration_s": 3.8 if cold else 0.0}
+    monkeypatch.setattr(model_load, "generate", fake_generate)
+
+    benchmark = model_load.ModelLoadProfile(warm_requests=2, settle_s=0)
+    results = benchmark.run_questions("qwen3:8b", benchmark.get_questions(), {"temperature": 0})
+    assert calls[0] == ("unload", "qwen3:8b") and calls[1] == ("generate", "5m", 16)
+    assert [q["subject"] for q in results] == ["cold", "warm", "warm"]
+    summary = benchmark.summarize(results)
+    assert summary["cold_load_s"] == 3.8 and summary["warm_latency_s"] == 0.25
+    assert summary["load_ram_increase_gb"] == pytest.approx(1.0) and summary["load_vram_increase_gb"] == pytest.approx(5.5)
+    assert summary["cold_start_penalty_s"] == pytest.approx(3.75)
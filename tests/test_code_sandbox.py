@@ -0,0 +1,32 @@
+import sys
+import pytest
+from utils.code_sandbox import extract_code, run_tests
+from utils.disk_cache import DiskCache, cache_key
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="The sandbox relies on POSIX process limits.")
+
+
+def test_extract_code_takes_last_python_block():
+    response = "Try this:\n```python\nprint(1)\n```\nBetter:\n```python\nprint(2)\n```"
+    assert extract_code(response).strip() == "print(2)"
+
+
+def test_run_tests_grades_stdin_and_functional_solutions():
+    stdin_code = "a, b = map(int, input().split())\nprint(a + b)\n"
+    assert run_tests(stdin_code, [{"input": "1 2", "output": "3\n"}])["all_passed"]
+    functional = [{"input": "2\n3", "output": "5", "testtype": "functional"}]
+    result = run_tests("class Solution:\n    def add(self, a, b):\n        return a - b\n", functional, fn_name="add")
+    assert not result["all_passed"] and "wrong answer" in result["error"]
+
+
+def test_run_tests_kills_solutions_that_exceed_the_timeout():
+    result = run_tests("while True:\n    pass\n", [{"input": "", "output": ""}], timeout_s=1)
+    assert result["passed"] == 0 and "timed out" in result["error"]
+
+
+def test_disk_cache_roundtrip(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"), namespace="test")
+    key = cache_key("code", [{"input": "1"}])
+    assert cache.get(key) is None
+    cache.set(key, {"passed": 1})
+    assert DiskCache(str(tmp_path / "cache.db"), namespace="test").get(key) == {"passed": 1}
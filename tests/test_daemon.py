@@ -0,0 +1,117 @@
+import json
+import threading
+
+import pytest
+import urllib.request
+import urllib.error
+
+import daemon
+from daemon import EvaluationServer, Job, JobScheduler, create_job, estimate_memory_gb, job_models
+
+
+def _running(scheduler, *jobs):
+    for job in jobs:
+        scheduler.submit(job)
+        job.status = "running"
+    scheduler._queue.clear()
+
+
+def test_shared_jobs_co_schedule_only_while_they_fit():
+    scheduler = JobScheduler(capacity_gb=24, run_job=lambda job: 0)
+    _running(scheduler, Job({}, ["a"], exclusive=False, memory_gb=10))
+    assert scheduler.can_start(Job({}, ["b"], exclusive=False, memory_gb=12))
+    assert not scheduler.can_start(Job({}, ["c"], exclusive=False, memory_gb=16))
+    assert not scheduler.can_start(Job({}, ["d"], exclusive=True, memory_gb=1))
+    assert not scheduler.can_start(Job({}, ["e"], exclusive=False, memory_gb=None)) # Unknown size runs alone
+
+
+def test_exclusive_job_blocks_everything_behind_it():
+    scheduler = JobScheduler(capacity_gb=100, run_job=lambda job: 0)
+    _running(scheduler, Job({}, ["a"], exclusive=True, memory_gb=1))
+    assert not scheduler.can_start(Job({}, ["b"], exclusive=False, memory_gb=1))
+
+
+def test_memory_estimate_uses_the_largest_model_including_benchmark_models():
+    config = {"models_to_evaluate": ["small"],
+              "benchmarks": {"EmbeddingThroughput": {"enabled": True, "models": ["embed"]},
+                             "Other": {"enabled": False, "models": ["ignored"]}}}
+    models = job_models(config)
+    assert models == ["small", "embed"]
+    assert estimate_memory_gb(models, {"small": 4 * 1024**3, "embed": 1024**3}, overhead=1.5) == 6.0
+    assert estimate_memory_gb(models, {"small": 4 * 1024**3}) is None
+
+
+def test_jobs_run_in_order_through_the_http_api(monkeypatch):
+    monkeypatch.setattr(daemon, "get_model_sizes", lambda: {})
+    release = threading.Event()
+    started = []
+
+    def run_job(job):
+        started.append(job.models[0])
+        release.wait(5)
+        return 2
+
+    scheduler = JobScheduler(capacity_gb=24, run_job=run_job, poll_interval_s=0.05)
+    server = EvaluationServer(("127.0.0.1", 0), scheduler, {"models_to_evaluate": ["default-model"]}, "secret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scheduler.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def call(method, path, body=None, token="secret", content_type="application/json"):
+        request = urllib.request.Request(base + path, method=method,
+                                         data=json.dumps(body).encode() if body is not None else None,
+                                         headers={"X-Auth-Token": token, "Content-Type": content_type})
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    try:
+        status, first = call("POST", "/jobs", {"tag": "nightly"})
+        assert status == 202 and first["models"] == ["default-model"] and first["exclusive"]
+        _, second = call("POST", "/jobs", {"models": ["other-model"]})
+        _, third = call("POST", "/jobs", {"models": ["third-model"]})
+        assert call("DELETE", f"/jobs/{third['job_id']}")[1]["status"] == "cancelled"
+        assert call("GET", f"/jobs/{second['job_id']}")[1]["status"] == "queued" # Waits for the exclusive first job
+        assert call("GET", f"/jobs/{first['job_id']}/progress")[0] == 200
+        release.set()
+        for _ in range(100):
+            jobs = {job["job_id"]: job for job in call("GET", "/jobs")[1]}
+            if jobs[second["job_id"]]["status"] == "finished":
+                break
+            threading.Event().wait(0.05)
+        assert started == ["default-model", "other-model"]
+        assert jobs[first["job_id"]]["num_results"] == 2
+        assert call("GET", "/jobs/ffffffff")[0] == 404
+        assert call("POST", "/jobs", {"config": {"models_to_evaluate": []}})[0] == 400
+        assert call("POST", "/jobs", {"models": ["m"]}, token="wrong")[0] == 401
+        assert call("GET", "/jobs", token="")[0] == 401
+        assert call("GET", "/health", token="")[0] == 200
+        assert call("POST", "/jobs", {"models": ["m"]}, content_type="text/plain")[0] == 415
+    finally:
+        scheduler.stop()
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize("request_body", [
+    {"config": {"results_store": {"path": "/tmp/elsewhere.db"}}},
+    {"config": {"backends": {"ollama": {"base_url": "http://attacker:11434"}}}},
+    {"config": {"benchmarks": {"Math500Adapter": {"enabled": True, "data_file": "/etc/passwd"}}}},
+    {"config_path": "/etc/passwd"},
+])
+def test_jobs_cannot_override_paths_or_servers(request_body, monkeypatch):
+    monkeypatch.setattr(daemon, "get_model_sizes", lambda: {})
+    with pytest.raises(ValueError):
+        create_job({"models": ["m"], **request_body}, {"models_to_evaluate": ["m"]})
+
+
+def test_config_files_are_read_from_the_job_config_dir_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon, "get_model_sizes", lambda: {})
+    (tmp_path / "nightly.yaml").write_text("models_to_evaluate: [nightly-model]\n")
+    job = create_job({"config_path": "nightly.yaml", "config": {"evaluation": {"trials": 3}}}, {},
+                     config_dir=str(tmp_path))
+    assert job.models == ["nightly-model"] and job.config["evaluation"] == {"trials": 3}
+    with pytest.raises(ValueError):
+        create_job({"config_path": "../nightly.yaml"}, {}, config_dir=str(tmp_path / "sub"))
@@ -0,0 +1,28 @@
+import random
+from utils.early_stopping import EarlyStopper, score_interval
+
+
+def test_score_interval_narrows_with_more_questions():
+    low_small, high_small = score_interval([1.0, 0.0] * 25, confidence=0.95)
+    low_large, high_large = score_interval([1.0, 0.0] * 500, confidence=0.95)
+    assert low_small < low_large < 50 < high_large < high_small
+    assert score_interval([1.0] * 10, confidence=0.95)[1] == 100
+
+
+def test_stops_on_target_width():
+    rng = random.Random(0)
+    stopper = EarlyStopper(target_width=10, confidence=0.95, min_questions=20, check_every=10)
+    n = 0
+    while not stopper.update(float(rng.random() < 0.6)):
+        n += 1
+    low, high = stopper.interval
+    assert high - low <= 10 and n > 20
+    assert stopper.stop_reason.startswith("interval width")
+
+
+def test_stops_once_separated_from_other_models():
+    stopper = EarlyStopper(target_width=None, confidence=0.95, min_questions=20, check_every=10,
+                           competitors={"weak-model": (10.0, 20.0)})
+    stopped = [stopper.update(1.0 if i % 10 else 0.0) for i in range(30)]
+    assert stopped.index(True) == 19
+    assert "weak-model" in stopper.stop_reason
@@ -0,0 +1,30 @@
+import numpy as np
+
+import benchmarks.embedding_throughput as embedding_throughput
+from benchmarks.embedding_throughput import EmbeddingThroughput
+
+
+def fake_embed(model_name, inputs, options=None, **payload_overrides):
+    return {"embeddings": [[float(len(text)), 1.0, 2.0] for text in inputs], "error": None,
+            "prompt_tokens": 4 * len(inputs), "load_duration_s": 0.0, "total_duration_s": 0.01, "latency_s": 0.01}
+
+
+def test_batches_are_embedded_and_streamed_to_disk(monkeypatch, tmp_path):
+    monkeypatch.setattr(embedding_throughput, "embed", fake_embed)
+    variants = EmbeddingThroughput(num_documents=10, words_per_document=5, batch_sizes=[4], concurrency_levels=[1, 3],
+                                   output_dir=str(tmp_path)).get_variants()
+    assert [v.concurrency for v in variants] == [1, 3]
+
+    variant = variants[1]
+    questions = variant.get_questions()
+    assert [(q["start"], q["end"]) for q in questions] == [(0, 4), (4, 8), (8, 10)]
+    results = variant.run_questions("embed-model", questions, {})
+    assert [r["score"] for r in results] == [1.0, 1.0, 1.0]
+
+    stored = np.load(tmp_path / "embed-model_b4_c3_t0.npy", mmap_mode="r")
+    assert stored.shape == (10, 3)
+    assert stored[9, 0] == len(variant._corpus()[9])
+
+    summary = variant.summarize(results)
+    assert summary["embedding_dim"] == 3
+    assert summary["docs_per_s"] > 0
@@ -0,0 +1,29 @@
+from reporters.html_reporter import HTMLReporter
+from utils.results_store import ResultsStore
+
+
+def _save(store, number):
+    store.save_run(f"run-{number}", [{"model": "qwen3:8b", "benchmark": "Simple QA", "score": float(number),
+                                      "num_questions": 1, "successful_evals": 1}],
+                   started_at=f"2025-01-{number:02d}T00:00:00")
+
+
+def test_only_the_newest_archive_page_and_the_index_are_rewritten(tmp_path):
+    reporter = HTMLReporter({"database": str(tmp_path / "results.db"), "output_file": str(tmp_path / "report.html"),
+                             "runs_per_page": 2})
+    with ResultsStore(reporter.database) as store:
+        for number in range(1, 5):
+            _save(store, number)
+        reporter.render(store)
+        first_page = tmp_path / "report_page1.html"
+        assert "run-1" in first_page.read_text() and "run-3" not in first_page.read_text()
+        first_page.write_text("untouched")
+
+        _save(store, 5)
+        reporter.render(store)
+        assert first_page.read_text() == "untouched" # Full pages keep their runs and links
+        assert "report_page3.html" in (tmp_path / "report_page2.html").read_text() # Newer link added
+        assert "run-5" in (tmp_path / "report_page3.html").read_text()
+        index = (tmp_path / "report.html").read_text()
+        assert "run-5" in index and "run-4" in index and "run-3" not in index
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,28 @@
+import json
+import utils.judge as judge_module
+from utils.judge import Judge, summarize_judge_cost
+
+
+def test_judge_batches_requests_and_caches_verdicts(tmp_path, monkeypatch):
+    requests = []
+
+    def fake_generate(model_name, prompt, options=None, **payload_overrides):
+        candidates = prompt.count("### Candidate")
+        requests.append(candidates)
+        verdicts = [{"id": i, "score": 2 * i, "reason": "ok"} for i in range(1, candidates + 1)]
+        return {"text": json.dumps({"verdicts": verdicts}), "error": None, "prompt_tokens": 100 * candidates,
+                "output_tokens": 10 * candidates, "latency_s": 1.0}
+
+    monkeypatch.setattr(judge_module, "generate", fake_generate)
+    monkeypatch.setattr(judge_module, "get_model_digest", lambda model: "sha256:abc")
+    judge = Judge("judge-model", batch_size=2, cache_file=str(tmp_path / "cache.db"))
+    items = [{"task": "Write a story.", "response": f"Story {i}."} for i in range(3)]
+
+    verdicts = judge.judge_batch(items)
+    assert sorted(requests) == [1, 2]
+    assert [v["score"] for v in verdicts] == [0.2, 0.4, 0.2]
+    assert summarize_judge_cost(verdicts)["judge_prompt_tokens"] == 300
+
+    again = judge.judge_batch(items)
+    assert len(requests) == 2 and all(v["cached"] for v in again)
+    assert [v["score"] for v in again] == [0.2, 0.4, 0.2]
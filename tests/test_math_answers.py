@@ -0,0 +1,53 @@
+import pytest
+from utils.math_answers import extract_boxed, normalize_answer, answers_equivalent, EquivalenceChecker, _latex_to_sympy
+
+
+def test_extract_boxed_handles_nested_braces():
+    assert extract_boxed(r"First \boxed{1}, finally \boxed{\frac{3}{\sqrt{2}}}.") == r"\frac{3}{\sqrt{2}}"
+    assert extract_boxed("no box here") is None
+
+
+@pytest.mark.parametrize("raw, expected", [
+    (r"\dfrac12", r"\frac{1}{2}"),
+    (r"x = 5", "5"),
+    (r"10\%", "10"),
+    (r"90^\circ", "90"),
+    ("1,000", "1000"),
+    (r"\text{5 units}", "5units"),
+])
+def test_normalize_answer(raw, expected):
+    assert normalize_answer(raw) == expected
+
+
+@pytest.mark.parametrize("predicted, reference, equivalent", [
+    (r"\frac{3}{4}", "0.75", True),
+    (r"2\sqrt{2}", r"\sqrt{8}", True),
+    (r"\frac{\sqrt{3}}{2}", r"\frac{1}{2}\sqrt{3}", True),
+    ("(1, 2)", "(1,2)", True),
+    (r"[0,\infty)", r"(0,\infty)", False),
+    ("5", "6", False),
+])
+def test_answers_equivalent(predicted, reference, equivalent):
+    pytest.importorskip("sympy")
+    assert answers_equivalent(predicted, reference)[0] is equivalent
+
+
+def test_checker_caches_verdicts(tmp_path):
+    checker = EquivalenceChecker(cache_file=str(tmp_path / "cache.db"))
+    assert checker.check("0.5", r"\frac12")["cached"] is False
+    again = EquivalenceChecker(cache_file=str(tmp_path / "cache.db")).check("0.5", r"\frac12")
+    assert again["cached"] is True and again["equivalent"] == checker.check("0.5", r"\frac12")["equivalent"]
+
+
+@pytest.mark.parametrize("payload", [
+    '__import__("os").system("touch PWNED")',
+    "__import__('os').system('touch${IFS}PWNED')",
+    "x.__class__",
+    "exec(chr(49))",
+])
+def test_code_in_answers_is_never_evaluated(payload, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert answers_equivalent(payload, "0") == (False, "symbolic")
+    assert not (tmp_path / "PWNED").exists()
+    with pytest.raises(ValueError):
+        _latex_to_sympy(payload)
@@ -0,0 +1,22 @@
+import microbench
+
+
+def test_slowdowns_past_the_threshold_are_regressions():
+    rows = microbench.compare_to_baseline({"fast": 1.0, "slow": 1.3, "new": 0.5}, {"fast": 1.1, "slow": 1.0},
+                                          threshold=0.25)
+    by_case = {row["case"]: row for row in rows}
+    assert not by_case["fast"]["regression"] and by_case["slow"]["regression"]
+    assert by_case["new"]["baseline_s"] is None and not by_case["new"]["regression"]
+    assert "REGRESSION" in microbench.format_comparison(rows)
+
+
+def test_synthetic_data_is_seeded_and_mmlu_shaped():
+    rows = microbench.synthetic_mmlu_rows(50)
+    assert rows == microbench.synthetic_mmlu_rows(50)
+    assert all(row["answer"] == chr(ord("A") + row["answer_index"]) for row in rows)
+    assert all(r.startswith("<think>") for r in microbench.synthetic_responses(5))
+
+
+def test_cases_run_at_a_small_scale():
+    for name in ("extract_choice", "mmlu_load_data", "format_prompt"):
+        microbench.CASES[name](0.001)()
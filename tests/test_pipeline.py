@@ -0,0 +1,89 @@
+import threading
+
+import evaluator
+from benchmarks.base_benchmark import BaseBenchmark
+
+
+class EvenIdBenchmark(BaseBenchmark):
+    scorer_batchable = True
+
+    def __init__(self):
+        super().__init__("even-ids")
+        self.batch_sizes = []
+
+    def get_questions(self):
+        return [{"id": i, "prompt": f"question {i}"} for i in range(20)]
+
+    def evaluate(self, model_response, question_data):
+        return 1.0 if question_data["id"] % 2 == 0 else 0.0
+
+    def evaluate_batch(self, model_responses, questions):
+        self.batch_sizes.append(len(questions))
+        return super().evaluate_batch(model_responses, questions)
+
+
+def fake_generate(model_name, prompt, options=None, **payload_overrides):
+    return {"text": prompt, "tokens_per_second": 10.0, "error": None, "prompt_tokens": 3, "output_tokens": 5,
+            "ttft_s": 0.01, "latency_s": 0.1}
+
+
+def test_pipeline_scores_every_question_in_order(monkeypatch):
+    monkeypatch.setattr(evaluator, "generate", fake_generate)
+    benchmark = EvenIdBenchmark()
+    results = evaluator._run_questions("model", benchmark, benchmark.get_questions(), {},
+                                       pipeline_options={"generation_workers": 3, "scoring_batch_size": 4})
+    assert [r["question_id"] for r in results] == list(range(20))
+    assert sum(r["score"] for r in results) == 10
+    assert max(benchmark.batch_sizes) <= 4 and sum(benchmark.batch_sizes) == 20
+
+
+def test_result_entry_breaks_results_down_by_subject():
+    def question(qid, subject, score, latency):
+        return {"question_id": qid, "subject": subject, "trial": 0, "score": score, "tokens_s": 20.0,
+                "latency_s": latency, "ttft_s": 0.1, "prompt_tokens": 10, "output_tokens": 40, "error": None}
+
+    questions = [question(1, "law", 1.0, 4.0), question(2, "law", 0.0, 6.0), question(3, "math", 1.0, 1.0)]
+    entry = evaluator._build_result_entry("model", "bench", [(questions, {})])
+    assert list(entry["subjects"]) == ["law", "math"]
+    assert entry["subjects"]["law"]["score"] == 50.0
+    assert entry["subjects"]["law"]["latency_p50_s"] == 5.0
+    assert entry["subjects"]["math"]["num_questions"] == 1
+
+
+class FailingOverridesBenchmark(EvenIdBenchmark):
+    def get_generation_overrides(self, question_data):
+        if question_data["id"] == 3:
+            raise RuntimeError("broken question")
+        return {}
+
+
+def test_failing_worker_turns_into_an_error_instead_of_a_hang(monkeypatch):
+    monkeypatch.setattr(evaluator, "generate", fake_generate)
+    benchmark = FailingOverridesBenchmark()
+    outcome = {}
+
+    def run():
+        outcome["results"] = evaluator._run_questions("model", benchmark, benchmark.get_questions(), {},
+                                                      pipeline_options={"generation_workers": 2})
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive()
+    results = outcome["results"]
+    assert len(results) == 20
+    assert "broken question" in results[3]["error"] and results[3]["score"] is None
+    assert sum(r["score"] for r in results if r["score"] is not None) == 10
+
+
+def test_warmup_questions_are_not_measured_again(monkeypatch):
+    prompts = []
+
+    def recording_generate(model_name, prompt, options=None, **payload_overrides):
+        prompts.append(prompt)
+        return fake_generate(model_name, prompt, options, **payload_overrides)
+
+    monkeypatch.setattr(evaluator, "generate", recording_generate)
+    monkeypatch.setattr(evaluator.time, "sleep", lambda seconds: None)
+    [entry] = evaluator.run_evaluation(["model"], [EvenIdBenchmark()], {}, evaluation_options={"warmup_questions": 2})
+    assert prompts.count("question 0") == 1 and prompts.count("question 1") == 1
+    assert [q["question_id"] for q in entry["questions"]] == list(range(2, 20))
@@ -0,0 +1,59 @@
+import io
+
+import pytest
+
+from backends.ollama_backend import OllamaBackend
+from benchmarks.example_benchmark import ExampleBenchmark
+from utils.planner import COOLDOWN_S, allocate_budget, parse_duration, plan_run
+from utils.progress import ProgressDisplay
+from utils.results_store import ResultsStore
+
+
+def test_parse_duration():
+    assert parse_duration("3600") == 3600
+    assert parse_duration("90m") == 5400
+    assert parse_duration("1h30m") == 5400
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+
+def test_plan_uses_stored_latency_and_falls_back_to_default(tmp_path):
+    entry = {"model": "qwen3:8b", "benchmark": "Simple QA", "score": 100.0, "avg_tokens_s": 40.0, "num_questions": 2,
+             "successful_evals": 2, "total_gpu_energy_wh": 0.2,
+             "questions": [{"question_id": i, "score": 1.0, "latency_s": 3.0, "error": None} for i in range(2)]}
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        store.save_run("run-1", [entry])
+        plan = plan_run(["qwen3:8b", "new-model"], [ExampleBenchmark()], [OllamaBackend()], store, {"trials": 2})
+
+    known, unknown = plan
+    assert known["basis"] == "benchmark history"
+    assert known["est_time_s"] == 3.0 * 3 * 2 + COOLDOWN_S
+    assert known["est_energy_wh"] == pytest.approx(0.1 * 3 * 2)
+    assert unknown["basis"] == "default" and unknown["est_energy_wh"] is None
+
+
+def test_budget_lets_small_benchmarks_run_in_full():
+    plan = [{"benchmark": "small", "questions": 100, "est_time_s": 100 + COOLDOWN_S},
+            {"benchmark": "large", "questions": 1000, "est_time_s": 1000 + COOLDOWN_S}]
+    fractions = allocate_budget(plan, budget_s=500 + 2 * COOLDOWN_S, min_questions=1)
+    assert fractions == {"small": 1.0, "large": 0.4}
+
+
+def test_progress_revises_the_run_eta_by_observed_speed():
+    plan = [{"model": "m", "benchmark": b, "backend": "ollama", "est_time_s": 100.0} for b in ("a", "b")]
+    progress = ProgressDisplay(plan, stream=io.StringIO())
+    progress.start_pair("m", "a", "ollama", 10)
+    progress._pair["started"] -= 200 # The first pair took twice as long as planned.
+    progress.finish_pair()
+    progress.start_pair("m", "b", "ollama", 10)
+    _, run_left = progress.eta()
+    assert run_left == pytest.approx(200.0, abs=1.0)
+
+
+def test_history_leaves_out_co_scheduled_jobs(tmp_path):
+    entry = {"model": "qwen3:8b", "benchmark": "Simple QA", "num_questions": 1, "successful_evals": 1,
+             "co_scheduled_with": ["1a2b3c4d"],
+             "questions": [{"question_id": 0, "score": 1.0, "latency_s": 30.0, "error": None}]}
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        store.save_run("run-1", [entry])
+        assert store.get_history("qwen3:8b", "Simple QA") is None
@@ -0,0 +1,15 @@
+from utils.records import QuestionRecordWriter, read_question_records
+
+
+def test_records_are_appended_per_run(tmp_path):
+    """Each run appends its own gzip member and records can be filtered by run ID."""
+    path = str(tmp_path / "records.jsonl.gz")
+    for run_id, score in [("run-1", 1.0), ("run-2", 0.0)]:
+        writer = QuestionRecordWriter(path, run_id=run_id)
+        writer.write({"question_id": "q1", "score": score})
+        writer.close()
+
+    assert [r["run_id"] for r in read_question_records(path)] == ["run-1", "run-2"]
+    assert list(read_question_records(path, run_id="run-2")) == [
+        {"run_id": "run-2", "question_id": "q1", "score": 0.0}
+    ]
@@ -0,0 +1,57 @@
+import pytest
+from utils import stats
+from utils.regression import compare_entries, compare_runs
+
+
+def _entry(tokens_s, scores, energy_wh=1.0):
+    questions = [
+        {"question_id": i, "score": score, "tokens_s": tps, "ttft_s": 0.1, "latency_s": 1.0, "error": None}
+        for i, (tps, score) in enumerate(zip(tokens_s, scores))
+    ]
+    return {"model": "qwen3:8b", "benchmark": "MMLU-Pro (test)", "questions": questions,
+            "num_questions": len(questions), "total_gpu_energy_wh": energy_wh}
+
+
+def test_mann_whitney_detects_shift():
+    """A clearly shifted sample is significant in the right direction only."""
+    low, high = [float(i) for i in range(30)], [float(i) + 20 for i in range(30)]
+    assert stats.mann_whitney_u(high, low, alternative="greater") < 0.001
+    assert stats.mann_whitney_u(high, low, alternative="less") > 0.99
+    assert stats.mann_whitney_u([1.0] * 5, [1.0] * 5) == 1.0
+
+
+def test_mcnemar_counts_only_discordant_pairs():
+    """Ten questions lost and none gained is significant; agreement is not evidence."""
+    assert stats.mcnemar_worse([1.0] * 10, [0.0] * 10) == pytest.approx(1 / 1024)
+    assert stats.mcnemar_worse([1.0, 0.0], [1.0, 0.0]) == 1.0
+
+
+def test_compare_entries_flags_throughput_and_accuracy_regressions():
+    baseline = _entry([50.0 + i % 3 for i in range(40)], [1.0] * 40)
+    current = _entry([40.0 + i % 3 for i in range(40)], [1.0] * 20 + [0.0] * 20, energy_wh=1.5)
+    findings = {f["metric"]: f for f in compare_entries(baseline, current)}
+
+    assert findings["tokens_s"]["regression"]
+    assert findings["accuracy"]["regression"]
+    assert findings["accuracy"]["change"] == pytest.approx(-50.0)
+    assert findings["energy_wh_per_question"]["regression"]
+    assert not findings["ttft_s"]["regression"]
+
+
+def test_compare_entries_ignores_noise():
+    baseline = _entry([50.0, 51.0, 49.0, 50.5] * 10, [1.0, 0.0] * 20)
+    current = _entry([50.2, 50.8, 49.1, 50.4] * 10, [0.0, 1.0] * 20)
+    assert not any(f["regression"] for f in compare_entries(baseline, current))
+
+
+def test_bootstrap_ci_brackets_the_mean_and_is_reproducible():
+    values = [float(v) for v in range(100)]
+    low, high = stats.bootstrap_ci(values, n_resamples=500, seed=1)
+    assert low < stats.mean(values) < high
+    assert stats.bootstrap_ci(values, n_resamples=500, seed=1) == (low, high)
+    assert stats.bootstrap_ci([1.0]) is None
+
+
+def test_compare_runs_skips_co_scheduled_baselines():
+    baseline = {**_entry([50.0] * 40, [1.0] * 40), "co_scheduled_with": ["1a2b3c4d"]}
+    assert compare_runs([baseline], [_entry([20.0] * 40, [0.0] * 40)]) == []
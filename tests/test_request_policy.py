@@ -0,0 +1,78 @@
+import time
+
+import pytest
+import requests
+
+from utils.request_policy import CircuitBreaker, RequestError, RequestPolicy, classify_exception
+
+URL = "http://localhost:11434/api/generate"
+
+
+def _http_error(status: int) -> requests.exceptions.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(response=response)
+
+
+def _attempts(*outcomes):
+    """An attempt function that raises or returns the given outcomes in turn."""
+    outcomes, calls = list(outcomes), []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return attempt, calls
+
+
+def test_error_classes():
+    assert classify_exception(requests.exceptions.ReadTimeout()) == "timeout"
+    assert classify_exception(requests.exceptions.ConnectionError()) == "connection"
+    assert classify_exception(_http_error(503)) == "server_error"
+    assert classify_exception(_http_error(429)) == "rate_limited"
+    assert classify_exception(_http_error(404)) == "client_error"
+    assert classify_exception(ValueError("Expecting value")) == "decode"
+
+
+def test_transient_errors_are_retried_within_the_attempt_timeout():
+    policy = RequestPolicy(attempt_timeout_s=7, backoff_base_s=0)
+    attempt, calls = _attempts(requests.exceptions.ReadTimeout(), _http_error(502), {"response": "ok"})
+    assert policy.call(URL, attempt) == ({"response": "ok"}, 3)
+    assert all(read_timeout == 7 for _, read_timeout in calls)
+
+
+def test_non_transient_errors_and_exhausted_retries_fail():
+    policy = RequestPolicy(max_retries=1, backoff_base_s=0)
+    attempt, calls = _attempts(_http_error(400))
+    with pytest.raises(RequestError) as error:
+        policy.call(URL, attempt)
+    assert (error.value.error_class, error.value.attempts) == ("client_error", 1)
+
+    attempt, _ = _attempts(requests.exceptions.ConnectionError(), requests.exceptions.ConnectionError())
+    with pytest.raises(RequestError) as error:
+        policy.call(URL, attempt)
+    assert (error.value.error_class, error.value.attempts) == ("connection", 2)
+
+
+def test_circuit_opens_pauses_and_closes_after_a_successful_probe():
+    breaker = CircuitBreaker("http://localhost:11434", failure_threshold=2, reset_timeout_s=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.acquire(deadline=0) # Still paused, and the deadline has passed
+    assert breaker.acquire(deadline=time.monotonic() + 1) and breaker.state == "half_open"
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_open_circuit_fails_requests_that_cannot_wait_for_the_probe():
+    policy = RequestPolicy(total_timeout_s=0.05, failure_threshold=1, reset_timeout_s=10, max_retries=0)
+    attempt, _ = _attempts(requests.exceptions.ConnectionError())
+    with pytest.raises(RequestError):
+        policy.call(URL, attempt)
+    attempt, calls = _attempts({"response": "never sent"})
+    with pytest.raises(RequestError) as error:
+        policy.call(URL, attempt)
+    assert error.value.error_class == "circuit_open" and not calls
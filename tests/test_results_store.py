@@ -0,0 +1,33 @@
+from utils.results_store import ResultsStore
+
+
+def _result(model, score):
+    return {
+        "model": model, "benchmark": "MMLU-Pro (test)", "score": score, "avg_tokens_s": 42.0,
+        "num_questions": 1, "successful_evals": 1, "avg_cpu_percent": 10.0,
+        "static_info": {"cpu_model": "cpu", "gpu_models": "gpu"},
+        "questions": [{"question_id": "math_1", "subject": "math", "score": score / 100, "tokens_s": 42.0,
+                       "latency_s": 1.5, "ttft_s": 0.2, "prompt_tokens": 100, "output_tokens": 8, "error": None}],
+    }
+
+
+def test_runs_round_trip_and_resolve_by_tag(tmp_path):
+    """Stored runs come back in the evaluator's result shape and resolve by ID, tag or 'latest'."""
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        store.save_run("run-1", [_result("qwen3:8b", 100.0)], tag="baseline", started_at="2025-01-01T00:00:00")
+        store.save_run("run-2", [_result("qwen3:8b", 0.0)], started_at="2025-01-02T00:00:00")
+
+        assert store.resolve_run("baseline") == "run-1"
+        assert store.resolve_run("latest") == "run-2"
+        assert store.resolve_run("run-2") == "run-2"
+        assert store.resolve_run("missing") is None
+
+        [entry] = store.get_run_results("run-1", include_questions=True)
+        assert entry["score"] == 100.0
+        assert entry["avg_cpu_percent"] == 10.0
+        assert entry["static_info"] == {"cpu_model": "cpu", "gpu_models": "gpu"}
+        assert entry["questions"][0]["question_id"] == "math_1"
+        assert entry["questions"][0]["ttft_s"] == 0.2
+
+        assert store.count_runs() == 2
+        assert [r["run_id"] for r in store.list_runs(limit=1)] == ["run-2"]
@@ -0,0 +1,39 @@
+import math
+import random
+from utils.sampling import seeded_sample, stratified_sample
+from utils.core_set import build_core_set, predict_from_core_set
+
+
+def test_seeded_sample_is_reproducible_and_order_preserving():
+    items = list(range(100))
+    sample = seeded_sample(items, 10, seed=42, stratum="law")
+    assert sample == seeded_sample(items, 10, seed=42, stratum="law")
+    assert sample != seeded_sample(items, 10, seed=42, stratum="math")
+    assert sample == sorted(sample)
+    assert seeded_sample(items, 3, seed=None) == [0, 1, 2]
+
+
+def test_stratified_sample_keeps_every_subject():
+    items = [{"id": i, "subject": "law" if i < 90 else "math"} for i in range(100)]
+    sample = stratified_sample(items, 0.1, seed=1)
+    assert len(sample) == 10
+    assert {item["subject"] for item in sample} == {"law", "math"}
+
+
+def test_core_set_predicts_full_score():
+    """A 25% core set built from synthetic IRT data predicts a new model's full score closely."""
+    rng = random.Random(0)
+    items = [(rng.uniform(0.5, 2.0), rng.gauss(0, 1)) for _ in range(400)]
+    subjects = {f"q{i}": f"subject{i % 4}" for i in range(len(items))}
+
+    def answers(theta):
+        return {f"q{i}": float(rng.random() < 1 / (1 + math.exp(-a * (theta - b)))) for i, (a, b) in enumerate(items)}
+
+    matrix = {f"model{k}": answers(theta) for k, theta in enumerate([-1.0, -0.3, 0.2, 0.8, 1.5])}
+    core_set = build_core_set(matrix, subjects, size=100, iterations=60)
+    assert len(core_set["items"]) == 100
+    assert core_set["error_bound_pp"] is not None
+
+    new_model = answers(0.5)
+    actual = sum(new_model.values()) / len(new_model) * 100
+    assert abs(predict_from_core_set(core_set, new_model) - actual) < 10
@@ -0,0 +1,18 @@
+from benchmarks.mmlu_pro import MMLUPro
+from benchmarks.example_benchmark import ExampleBenchmark
+from utils.self_consistency import SelfConsistency, supports_self_consistency
+
+
+def test_majority_vote_scores_the_most_common_answer():
+    wrapper = SelfConsistency(MMLUPro(), k=3)
+    question = {"id": "law_1", "options": {"A": "x", "B": "y"}, "correct_answer_char": "B",
+                "samples": ['{"Answer": "A"}', '{"Answer": "B"}', 'The answer is B']}
+    score, details = wrapper.evaluate_with_details(question["samples"][0], question)
+    assert score == 1.0
+    assert details["votes"] == {"A": 1, "B": 2}
+    assert wrapper.get_generation_overrides(question)["options"]["temperature"] == 0.7
+
+
+def test_only_answer_extracting_benchmarks_are_supported():
+    assert supports_self_consistency(MMLUPro())
+    assert not supports_self_consistency(ExampleBenchmark())
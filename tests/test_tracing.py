@@ -0,0 +1,46 @@
+import json
+from utils.tracing import Tracer
+
+
+def test_disabled_tracer_records_nothing():
+    """Spans opened while tracing is disabled are no-ops."""
+    tracer = Tracer()
+    with tracer.span("ollama.request", model="m"):
+        pass
+    assert tracer.summary() == []
+
+
+def test_spans_are_summarized_and_exported(tmp_path):
+    """Recorded spans aggregate per stage and export as Chrome 'complete' events."""
+    tracer = Tracer()
+    tracer.enable()
+    for _ in range(3):
+        with tracer.span("benchmark.evaluate", benchmark="Simple QA"):
+            pass
+    with tracer.span("ollama.request"):
+        pass
+    tracer.disable()
+
+    summary = {row["stage"]: row for row in tracer.summary()}
+    assert summary["benchmark.evaluate"]["count"] == 3
+    assert summary["ollama.request"]["count"] == 1
+
+    trace_file = tmp_path / "trace.json"
+    tracer.export_chrome_trace(str(trace_file))
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    complete = [e for e in events if e["ph"] == "X"]
+    assert len(complete) == 4
+    assert {e["cat"] for e in complete} == {"benchmark", "ollama"}
+    assert complete[0]["args"] == {"benchmark": "Simple QA"}
+
+
+def test_span_records_exception_type():
+    """A span closed by an exception is still recorded, tagged with the error type."""
+    tracer = Tracer()
+    tracer.enable()
+    try:
+        with tracer.span("mmlu_pro.extract_choice"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert tracer.get_events()[-1]["args"] == {"error": "ValueError"}
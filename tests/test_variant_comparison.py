@@ -0,0 +1,31 @@
+from utils.variant_comparison import compare_variants, model_family, pareto_optimal
+
+
+def test_model_family_groups_sizes_and_quantizations():
+    assert model_family("qwen3:14b") == "qwen3"
+    assert model_family("hf.co/bartowski/Qwen_Qwen3-30B-A3B-GGUF:IQ2_S") == "qwen3"
+    assert model_family("my-finetune:latest", {"my-finetune:latest": "llama3"}) == "llama3"
+
+
+def test_pareto_front_keeps_only_undominated_variants():
+    rows = [
+        {"score": 80, "weighted_tokens_s": 20, "peak_memory_gb": 10, "energy_per_correct_wh": 0.2},
+        {"score": 70, "weighted_tokens_s": 40, "peak_memory_gb": 6, "energy_per_correct_wh": 0.1},
+        {"score": 65, "weighted_tokens_s": 30, "peak_memory_gb": 7, "energy_per_correct_wh": 0.15},  # dominated by the 2nd
+    ]
+    assert pareto_optimal(rows) == [True, True, False]
+
+
+def test_compare_variants_skips_models_without_siblings():
+    entries = [
+        {"model": "qwen3:14b", "benchmark": "B", "score": 80, "successful_evals": 10, "weighted_tokens_s": 20,
+         "max_ram_used_gb": 12, "total_gpu_energy_wh": 0.8},
+        {"model": "qwen3:8b", "benchmark": "B", "score": 70, "successful_evals": 10, "weighted_tokens_s": 35,
+         "max_ram_used_gb": 8, "total_gpu_energy_wh": 0.7},
+        {"model": "llama3:8b", "benchmark": "B", "score": 60, "successful_evals": 10},
+    ]
+    [group] = compare_variants(entries)
+    assert group["family"] == "qwen3"
+    assert [v["model"] for v in group["variants"]] == ["qwen3:14b", "qwen3:8b"]
+    assert group["variants"][0]["energy_per_correct_wh"] == 0.1
+    assert all(v["pareto"] for v in group["variants"])
@@ -0,0 +1,182 @@
+import os
+import re
+import sys
+import json
+import time
+import ctypes
+import signal
+import shutil
+import logging
+import tempfile
+import subprocess
+
+try:
+    import resource # POSIX only
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+CODE_BLOCK_RE = re.compile(r"```[ \t]*(?:python3?|py)?[ \t]*\n(.*?)```", re.DOTALL | re.IGNORECASE)
+
+# Runs a function-style solution: the JSON arguments arrive on stdin, one per line,
+# and the JSON-encoded return value is printed.
+FUNCTIONAL_HARNESS = """\
+import json, sys
+namespace = {"__name__": "__solution__"}
+exec(compile(open("solution.py").read(), "solution.py", "exec"), namespace)
+fn_name = sys.argv[1]
+args = [json.loads(line) for line in sys.stdin.read().splitlines() if line.strip()]
+target = namespace.get(fn_name)
+if target is None and "Solution" in namespace:
+    target = getattr(namespace["Solution"](), fn_name)
+print(json.dumps(target(*args)))
+"""
+
+_CLONE_NEWUSER = 0x10000000
+_CLONE_NEWNET = 0x40000000
+_network_isolation_available = None
+
+
+def extract_code(model_response: str) -> str | None:
+    """Returns the last Python code block of a response, or the whole response if it has no code fences."""
+    if not model_response:
+        return None
+    response = re.sub(r"<think>.*?</think>", "", model_response, flags=re.DOTALL | re.IGNORECASE)
+    blocks = CODE_BLOCK_RE.findall(response)
+    if blocks:
+        return blocks[-1]
+    return response if "def " in response or "print(" in response else None
+
+
+def _unshare_network() -> bool:
+    """Moves the calling process into a new, empty network namespace (Linux only)."""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        flags = _CLONE_NEWNET if os.geteuid() == 0 else _CLONE_NEWUSER | _CLONE_NEWNET
+        return libc.unshare(flags) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def _sandbox_preexec(cpu_s: int, memory_mb: int, isolate_network: bool):
+    def apply():
+        os.setsid() # Own process group, so a timeout kills everything the solution spawned
+        if resource is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_s, cpu_s + 1))
+            memory = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+            resource.setrlimit(resource.RLIMIT_FSIZE, (16 * 1024 * 1024, 16 * 1024 * 1024))
+            resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        if isolate_network:
+            _unshare_network()
+    return apply
+
+
+def network_isolation_available() -> bool:
+    """Checks once whether sandboxed processes can be given an empty network namespace."""
+    global _network_isolation_available
+    if _network_isolation_available is None:
+        try:
+            probe = subprocess.run(
+                [sys.executable, "-I", "-c", "import socket; print(len(socket.if_nameindex()))"],
+                capture_output=True, text=True, timeout=10, preexec_fn=_sandbox_preexec(5, 256, True),
+            )
+            # A fresh network namespace only has the loopback interface.
+            _network_isolation_available = probe.returncode == 0 and probe.stdout.strip() == "1"
+        except (OSError, subprocess.SubprocessError):
+            _network_isolation_available = False
+        if not _network_isolation_available:
+            logger.warning("Network namespaces are unavailable; sandboxed code runs with resource limits only.")
+    return _network_isolation_available
+
+
+def _run_sandboxed(args: list[str], stdin: str, workdir: str, timeout_s: float, memory_mb: int,
+                   isolate_network: bool) -> tuple[int | None, str, str, float]:
+    """Runs a command under the sandbox limits. Returns (returncode or None on timeout, stdout, stderr, seconds)."""
+    env = {"PATH": os.environ.get("PATH", "/usr/bin:/bin"), "HOME": workdir,
+           "PYTHONHASHSEED": "0", "PYTHONDONTWRITEBYTECODE": "1"}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        args, cwd=workdir, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, preexec_fn=_sandbox_preexec(max(1, int(timeout_s) + 1), memory_mb, isolate_network),
+    )
+    try:
+        stdout, stderr = process.communicate(stdin, timeout=timeout_s)
+        returncode = process.returncode
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        stdout, stderr = process.communicate()
+        returncode = None
+    return returncode, stdout, stderr, time.perf_counter() - start
+
+
+def _outputs_match(actual: str, expected: str) -> bool:
+    """Compares program output token by token, ignoring whitespace differences."""
+    return actual.split() == expected.split()
+
+
+def run_tests(code: str, tests: list[dict], fn_name: str | None = None, timeout_s: float = 6.0,
+              memory_mb: int = 512, isolate_network: bool = True) -> dict:
+    """
+    Runs a solution against its test cases, each in a fresh sandboxed Python process.
+
+    The process gets CPU-time, address-space, file-size and core-dump rlimits, its own process
+    group (killed on timeout), a scrubbed environment, a throwaway working directory and,
+    where the kernel allows it, an empty network namespace. Execution stops at the first
+    failing test.
+
+    Args:
+        code (str): The solution source.
+        tests (list[dict]): {'input': str, 'output': str, 'testtype': 'stdin' | 'functional'}.
+                            Functional tests pass one JSON argument per input line to `fn_name`
+                            (a function or a method of class Solution) and compare JSON results.
+        fn_name (str, optional): Entry point of functional tests.
+
+    Returns:
+        dict: {'passed': int, 'total': int, 'all_passed': bool, 'exec_time_s': float,
+               'error': str | None}  (error describes the first failure)
+    """
+    isolate_network = isolate_network and network_isolation_available()
+    result = {"passed": 0, "total": len(tests), "all_passed": False, "exec_time_s": 0.0, "error": None}
+    workdir = tempfile.mkdtemp(prefix="llmpcbench_sandbox_")
+    try:
+        with open(os.path.join(workdir, "solution.py"), "w", encoding="utf-8") as f:
+            f.write(code)
+        with open(os.path.join(workdir, "harness.py"), "w", encoding="utf-8") as f:
+            f.write(FUNCTIONAL_HARNESS)
+
+        for index, test in enumerate(tests):
+            functional = test.get("testtype") == "functional"
+            if functional:
+                args = [sys.executable, "-I", "harness.py", fn_name or ""]
+            else:
+                args = [sys.executable, "-I", "solution.py"]
+            returncode, stdout, stderr, elapsed = _run_sandboxed(
+                args, test.get("input", ""), workdir, timeout_s, memory_mb, isolate_network)
+            result["exec_time_s"] += elapsed
+
+            if returncode is None:
+                result["error"] = f"test {index + 1}: timed out after {timeout_s} s"
+            elif returncode != 0:
+                result["error"] = f"test {index + 1}: exit code {returncode}: {stderr.strip()[-300:]}"
+            elif functional:
+                try:
+                    passed = json.loads(stdout) == json.loads(test["output"])
+                except ValueError:
+                    passed = False
+                if not passed:
+                    result["error"] = f"test {index + 1}: wrong answer"
+            elif not _outputs_match(stdout, test.get("output", "")):
+                result["error"] = f"test {index + 1}: wrong answer"
+            if result["error"]:
+                break
+            result["passed"] += 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result["all_passed"] = result["passed"] == result["total"] and result["total"] > 0
+    return result
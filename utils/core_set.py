@@ -0,0 +1,233 @@
+import sys
+import json
+import math
+import logging
+import argparse
+from datetime import datetime
+
+from utils import stats
+from utils.sampling import allocate
+from utils.results_store import ResultsStore
+
+logger = logging.getLogger(__name__)
+
+
+def _sigmoid(x: float) -> float:
+    if x >= 0:
+        return 1.0 / (1.0 + math.exp(-x))
+    z = math.exp(x)
+    return z / (1.0 + z)
+
+
+def fit_irt(matrix: dict, iterations: int = 150, learning_rate: float = 0.5) -> tuple[dict, dict]:
+    """
+    Fits a two-parameter logistic IRT model by regularized gradient ascent.
+
+    P(model m answers item i correctly) = sigmoid(a_i * (theta_m - b_i))
+
+    Args:
+        matrix (dict): {model_key: {question_id: score in [0, 1]}}. Missing answers are allowed.
+        iterations (int): Number of gradient steps.
+        learning_rate (float): Step size (gradients are averaged per parameter).
+
+    Returns:
+        tuple: ({question_id: (a, b)}, {model_key: theta})
+    """
+    models = list(matrix)
+    items = sorted({qid for answers in matrix.values() for qid in answers})
+    # Standard-normal priors on theta and b, and a prior centered at 1 on a, keep the fit
+    # stable when only a handful of models have been evaluated.
+    theta = {}
+    for m in models:
+        accuracy = min(max(stats.mean(list(matrix[m].values())) or 0.5, 0.02), 0.98)
+        theta[m] = math.log(accuracy / (1 - accuracy))
+    a = {i: 1.0 for i in items}
+    b = {}
+    for i in items:
+        answers = [matrix[m][i] for m in models if i in matrix[m]]
+        p = min(max(sum(answers) / len(answers), 0.02), 0.98)
+        b[i] = -math.log(p / (1 - p))
+
+    for _ in range(iterations):
+        grad_theta = {m: -theta[m] for m in models}
+        count_theta = {m: 1 for m in models}
+        for i in items:
+            grad_a, grad_b, n = -(a[i] - 1.0), -b[i], 1
+            for m in models:
+                y = matrix[m].get(i)
+                if y is None:
+                    continue
+                residual = y - _sigmoid(a[i] * (theta[m] - b[i]))
+                grad_a += residual * (theta[m] - b[i])
+                grad_b -= residual * a[i]
+                grad_theta[m] += residual * a[i]
+                count_theta[m] += 1
+                n += 1
+            a[i] = min(max(a[i] + learning_rate * grad_a / n, 0.05), 4.0)
+            b[i] += learning_rate * grad_b / n
+        for m in models:
+            theta[m] += learning_rate * 4 * grad_theta[m] / count_theta[m]
+
+    return {i: (a[i], b[i]) for i in items}, theta
+
+
+def estimate_ability(responses: dict, item_params: dict, iterations: int = 30) -> float:
+    """Maximum a-posteriori ability estimate (standard-normal prior) from responses to known items."""
+    theta = 0.0
+    for _ in range(iterations):
+        gradient, curvature = -theta, -1.0
+        for qid, y in responses.items():
+            a, b = item_params[qid]
+            p = _sigmoid(a * (theta - b))
+            gradient += a * (y - p)
+            curvature -= a * a * p * (1 - p)
+        step = gradient / curvature
+        theta -= step
+        if abs(step) < 1e-6:
+            break
+    return theta
+
+
+def select_core_items(item_params: dict, subjects: dict, size: int, difficulty_bins: int = 3) -> dict:
+    """
+    Picks `size` items stratified by subject and IRT difficulty.
+
+    Strata get a share of the budget proportional to their size. Within a stratum the picks are
+    spread evenly over the difficulty range, so the core set stays representative of the split.
+
+    Returns:
+        dict: {question_id: weight}, where weight is the number of full-split items the pick stands for.
+    """
+    by_subject = {}
+    for qid in item_params:
+        by_subject.setdefault(subjects.get(qid) or "unknown", []).append(qid)
+
+    strata = {}
+    for subject, qids in by_subject.items():
+        qids.sort(key=lambda q: item_params[q][1])
+        bins = min(difficulty_bins, len(qids))
+        for k in range(bins):
+            strata[f"{subject}|{k}"] = qids[k * len(qids) // bins:(k + 1) * len(qids) // bins]
+
+    counts = allocate({name: len(qids) for name, qids in strata.items()}, size)
+    core = {}
+    for name, qids in strata.items():
+        take = counts[name]
+        if take == 0:
+            continue
+        # Split the (difficulty-sorted) stratum into `take` windows and keep the middle item of each.
+        for k in range(take):
+            window = qids[k * len(qids) // take:(k + 1) * len(qids) // take]
+            core[window[len(window) // 2]] = len(qids) / take
+    return core
+
+
+def predict_scores(responses: dict, core: dict, item_params: dict) -> dict:
+    """
+    Predicts the full-split accuracy (0..1) from responses to the core items.
+
+    Returns:
+        dict: {'stratified': weighted core accuracy,
+               'irt': observed core correctness plus IRT-predicted correctness of all other items}
+    """
+    answered = {qid: y for qid, y in responses.items() if qid in core}
+    if not answered:
+        return {"stratified": None, "irt": None}
+    total_weight = sum(core[qid] for qid in answered)
+    stratified = sum(core[qid] * y for qid, y in answered.items()) / total_weight
+
+    theta = estimate_ability(answered, item_params)
+    rest = [params for qid, params in item_params.items() if qid not in answered]
+    expected_rest = sum(_sigmoid(a * (theta - b)) for a, b in rest)
+    irt = (sum(answered.values()) + expected_rest) / (len(answered) + len(rest))
+    return {"stratified": stratified, "irt": irt}
+
+
+def build_core_set(matrix: dict, subjects: dict, size: int, iterations: int = 150) -> dict:
+    """
+    Builds a core set from a {model_key: {question_id: score}} matrix of past full runs.
+
+    The error bound is estimated by leave-one-model-out validation: for every model the item
+    parameters are refit without it, a core set is selected, and the model's full-split score is
+    predicted from its core answers only. The estimator with the smaller worst-case error is kept.
+    """
+    errors = {"stratified": [], "irt": []}
+    if len(matrix) >= 3:
+        for held_out in matrix:
+            training = {m: answers for m, answers in matrix.items() if m != held_out}
+            params, _ = fit_irt(training, iterations=iterations)
+            core = select_core_items(params, subjects, size)
+            actual = stats.mean(list(matrix[held_out].values()))
+            for estimator, predicted in predict_scores(matrix[held_out], core, params).items():
+                if predicted is not None:
+                    errors[estimator].append(abs(predicted - actual) * 100)
+    else:
+        logger.warning("Fewer than 3 full runs available; the core set's error bound cannot be validated.")
+
+    estimator = "irt"
+    if errors["stratified"] and errors["irt"] and max(errors["stratified"]) < max(errors["irt"]):
+        estimator = "stratified"
+
+    params, _ = fit_irt(matrix, iterations=iterations)
+    core = select_core_items(params, subjects, size)
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "estimator": estimator,
+        "num_source_models": len(matrix),
+        "total_items": len(params),
+        "error_bound_pp": max(errors[estimator]) if errors[estimator] else None,
+        "mean_abs_error_pp": stats.mean(errors[estimator]),
+        "items": [{"question_id": qid, "weight": weight, "a": params[qid][0], "b": params[qid][1]}
+                  for qid, weight in core.items()],
+        "rest_items": [list(p) for qid, p in params.items() if qid not in core],
+    }
+
+
+def load_core_set(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def predict_from_core_set(core_set: dict, responses: dict) -> float | None:
+    """
+    Predicts the full-split score (in %) from a run's responses to a saved core set,
+    using the estimator selected when the core set was built.
+    """
+    core = {item["question_id"]: item["weight"] for item in core_set["items"]}
+    params = {item["question_id"]: (item["a"], item["b"]) for item in core_set["items"]}
+    for index, (a, b) in enumerate(core_set.get("rest_items", [])):
+        params[f"__rest_{index}"] = (a, b)
+    predicted = predict_scores(responses, core, params).get(core_set.get("estimator", "irt"))
+    return predicted * 100 if predicted is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a small core set of questions, with a validated error bound, from past full runs.")
+    parser.add_argument('--benchmark', required=True, help='Benchmark name as stored, e.g. "MMLU-Pro (test)".')
+    parser.add_argument('--size', type=int, required=True, help='Number of questions in the core set.')
+    parser.add_argument('--output', required=True, help='Where to write the core set JSON.')
+    parser.add_argument('--db', default='results.db', help='Results database with past full runs.')
+    parser.add_argument('--min-coverage', type=float, default=0.95,
+                        help='Only use runs that answered at least this fraction of the questions.')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    with ResultsStore(args.db) as store:
+        matrix, subjects = store.get_question_score_matrix(args.benchmark, min_coverage=args.min_coverage)
+    if not matrix:
+        logger.error(f"No full runs of '{args.benchmark}' found in {args.db}.")
+        sys.exit(1)
+
+    core_set = build_core_set(matrix, subjects, args.size)
+    core_set["benchmark"] = args.benchmark
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(core_set, f)
+    bound = core_set["error_bound_pp"]
+    logger.info(f"Core set of {len(core_set['items'])}/{core_set['total_items']} questions written to {args.output} "
+                f"(estimator: {core_set['estimator']}, "
+                f"worst leave-one-model-out error: {f'{bound:.2f} pp' if bound is not None else 'not validated'}).")
+
+
+if __name__ == "__main__":
+    main()
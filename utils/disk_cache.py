@@ -0,0 +1,65 @@
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(*parts) -> str:
+    """Hashes JSON-serializable parts (code, test cases, rubric, ...) into a cache key."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent key-value cache of JSON-serializable values, stored in SQLite.
+
+    Used to memoize expensive scoring work (code execution, symbolic equivalence, judge
+    verdicts) across runs and models. Each process opens its own connection on first use,
+    so a cache can be shared with the scoring worker processes.
+    """
+    def __init__(self, path: str, namespace: str = "default"):
+        self.path = path
+        self.namespace = namespace
+        self._conn = None
+        self._pid = None
+
+    def __getstate__(self):
+        # Connections cannot be pickled or shared with child processes.
+        return {**self.__dict__, "_conn": None, "_pid": None}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (namespace TEXT NOT NULL, key TEXT NOT NULL, "
+                "value_json TEXT NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str, default=None):
+        row = self._connection().execute(
+            "SELECT value_json FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value_json) VALUES (?, ?, ?)",
+                (self.namespace, key, json.dumps(value, default=str)),
+            )
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
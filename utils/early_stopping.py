@@ -0,0 +1,79 @@
+import math
+from statistics import NormalDist
+
+
+def score_interval(scores: list[float], confidence: float) -> tuple[float, float] | None:
+    """
+    Confidence interval (in %) of the mean score.
+
+    Uses the Wilson interval when all scores are 0/1 and a normal approximation otherwise.
+    """
+    n = len(scores)
+    if n == 0:
+        return None
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    mean = sum(scores) / n
+    if all(s in (0.0, 1.0) for s in scores):
+        denominator = 1 + z * z / n
+        center = (mean + z * z / (2 * n)) / denominator
+        half_width = z * math.sqrt(mean * (1 - mean) / n + z * z / (4 * n * n)) / denominator
+    else:
+        if n < 2:
+            return None
+        variance = sum((s - mean) ** 2 for s in scores) / (n - 1)
+        center, half_width = mean, z * math.sqrt(variance / n)
+    return max(0.0, center - half_width) * 100, min(1.0, center + half_width) * 100
+
+
+class EarlyStopper:
+    """
+    Decides when a model's score on a benchmark is statistically settled.
+
+    After every `check_every` scored questions (and at least `min_questions`), the score's
+    confidence interval is recomputed. Evaluation can stop once the interval is narrower than
+    `target_width` percentage points, or once it no longer overlaps the final interval of any
+    model already evaluated on the same benchmark (the ranking is then settled).
+
+    Checking repeatedly makes a nominal 95% interval less reliable, so a higher confidence
+    level (e.g. 0.99) is recommended.
+    """
+    def __init__(self, target_width: float | None = 5.0, confidence: float = 0.99,
+                 min_questions: int = 50, check_every: int = 10,
+                 competitors: dict | None = None, stop_on_separation: bool = True):
+        self.target_width = target_width
+        self.confidence = confidence
+        self.min_questions = min_questions
+        self.check_every = max(1, check_every)
+        self.competitors = competitors or {}
+        self.stop_on_separation = stop_on_separation
+        self.scores = []
+        self.interval = None
+        self.stop_reason = None
+
+    def update(self, score: float) -> bool:
+        """
+        Adds a question's score (0..1).
+
+        Returns:
+            bool: True if evaluation of this model-benchmark pair can stop.
+        """
+        self.scores.append(score)
+        n = len(self.scores)
+        if n < self.min_questions or n % self.check_every:
+            return False
+
+        self.interval = score_interval(self.scores, self.confidence)
+        if self.interval is None:
+            return False
+        low, high = self.interval
+        if self.target_width is not None and high - low <= self.target_width:
+            self.stop_reason = f"interval width {high - low:.2f} pp <= {self.target_width} pp"
+        elif self.stop_on_separation and self.competitors and all(
+            high < other_low or low > other_high for other_low, other_high in self.competitors.values()
+        ):
+            self.stop_reason = f"separated from {', '.join(self.competitors)}"
+        return self.stop_reason is not None
+
+    def final_interval(self) -> tuple[float, float] | None:
+        """The interval over all scores seen, for use as a competitor of later models."""
+        return score_interval(self.scores, self.confidence)
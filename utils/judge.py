@@ -0,0 +1,145 @@
+import json
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from ollama_client import generate, get_model_digest
+from utils.disk_cache import DiskCache, cache_key
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RUBRIC = ("Judge how well the response fulfils the task: correctness, completeness, adherence to "
+                  "every instruction (format, length, constraints) and overall quality. 10 is flawless, "
+                  "0 ignores the task.")
+
+JUDGE_PROMPT = """You are an impartial judge. Rate each candidate response to its task on a scale from 0 to 10 using this rubric:
+{rubric}
+
+Judge every candidate independently. Reply with JSON only:
+{{"verdicts": [{{"id": <candidate id>, "score": <0-10>, "reason": "<one sentence>"}}]}}
+with exactly one verdict per candidate.
+
+{candidates}"""
+
+VERDICT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "verdicts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, "score": {"type": "number"}, "reason": {"type": "string"}},
+                "required": ["id", "score"],
+            },
+        },
+    },
+    "required": ["verdicts"],
+}
+
+# Per-question judge cost fields (see `Judge.judge_batch`), totalled per result entry by `summarize_judge_cost`.
+COST_METRICS = ("judge_prompt_tokens", "judge_output_tokens", "judge_time_s")
+
+
+class Judge:
+    """
+    LLM-as-judge scorer that any benchmark can use for open-ended tasks.
+
+    Candidate responses are grouped into batches of `batch_size` per judge request, and up to
+    `max_concurrency` requests are sent at once. Verdicts are cached by judge model digest,
+    rubric and response hash, so unchanged responses are never judged twice. The judge's own
+    token and time cost is returned per candidate, so it can be reported separately from the
+    evaluated model's.
+    """
+    def __init__(self, model: str, rubric: str | None = None, batch_size: int = 8, max_concurrency: int = 4,
+                 options: dict | None = None, cache_file: str | None = "cache/scoring_cache.db"):
+        self.model = model
+        self.rubric = rubric or DEFAULT_RUBRIC
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.options = {"temperature": 0, **(options or {})}
+        self.cache = DiskCache(cache_file, namespace="judge_verdicts") if cache_file else None
+        self._digest = None
+
+    @property
+    def digest(self) -> str:
+        if self._digest is None:
+            self._digest = get_model_digest(self.model) or self.model
+        return self._digest
+
+    def _key(self, item: dict) -> str:
+        response_hash = hashlib.sha256(
+            json.dumps([item["task"], item.get("reference"), item["response"]]).encode("utf-8")).hexdigest()
+        return cache_key(self.digest, self.rubric, response_hash)
+
+    def judge_batch(self, items: list[dict]) -> list[dict]:
+        """
+        Scores candidate responses.
+
+        Args:
+            items (list[dict]): {'task': str, 'response': str, 'reference': str | None}
+
+        Returns:
+            list: One verdict per item, in order:
+                  {'score': float 0..1 | None, 'reason': str | None, 'cached': bool,
+                   'judge_prompt_tokens', 'judge_output_tokens', 'judge_time_s': float}
+                  (the cost of a batched request is shared equally by its candidates; cached verdicts cost nothing)
+        """
+        verdicts = [None] * len(items)
+        pending = []
+        for index, item in enumerate(items):
+            cached = self.cache.get(self._key(item)) if self.cache else None
+            if cached is not None:
+                verdicts[index] = {**cached, "cached": True, **{metric: 0 for metric in COST_METRICS}}
+            else:
+                pending.append(index)
+
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+                for batch, batch_verdicts in zip(batches, pool.map(lambda b: self._request([items[i] for i in b]), batches)):
+                    for index, verdict in zip(batch, batch_verdicts):
+                        verdicts[index] = verdict
+                        if self.cache and verdict["score"] is not None:
+                            self.cache.set(self._key(items[index]), {"score": verdict["score"], "reason": verdict["reason"]})
+        return verdicts
+
+    def _request(self, batch: list[dict]) -> list[dict]:
+        candidates = []
+        for number, item in enumerate(batch, 1):
+            candidate = f"### Candidate {number}\nTask: {item['task']}\n"
+            if item.get("reference"):
+                candidate += f"Reference answer: {item['reference']}\n"
+            candidates.append(candidate + f"Response: {item['response']}\n")
+        prompt = JUDGE_PROMPT.format(rubric=self.rubric, candidates="\n".join(candidates))
+
+        with span("judge.request", model=self.model, batch=len(batch)):
+            response = generate(self.model, prompt, self.options, format=VERDICT_SCHEMA)
+        share = {
+            "judge_prompt_tokens": (response["prompt_tokens"] or 0) / len(batch),
+            "judge_output_tokens": (response["output_tokens"] or 0) / len(batch),
+            "judge_time_s": (response["latency_s"] or 0.0) / len(batch),
+        }
+        scores = {}
+        if response["error"]:
+            logger.error(f"Judge request to {self.model} failed: {response['error']}")
+        else:
+            try:
+                for verdict in json.loads(response["text"]).get("verdicts", []):
+                    score = min(max(float(verdict["score"]), 0.0), 10.0) / 10
+                    scores[int(verdict["id"])] = (score, verdict.get("reason"))
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                logger.error(f"Could not parse the verdicts of judge {self.model}: {e}")
+        results = []
+        for number in range(1, len(batch) + 1):
+            score, reason = scores.get(number, (None, None))
+            results.append({"score": score, "reason": reason, "cached": False, **share})
+        return results
+
+
+def summarize_judge_cost(question_results: list[dict]) -> dict:
+    """Totals the judge's token and time cost over the judged questions of a result entry."""
+    judged = [q for q in question_results if q.get("judge_time_s") is not None]
+    if not judged:
+        return {}
+    return {metric: sum(q.get(metric) or 0 for q in judged) for metric in COST_METRICS}
@@ -0,0 +1,237 @@
+import re
+import signal
+import logging
+import threading
+
+from utils.disk_cache import DiskCache, cache_key
+
+try:
+    import sympy
+    from sympy.parsing.sympy_parser import parse_expr, standard_transformations, \
+        implicit_multiplication_application, convert_xor
+except ImportError: # Symbolic checking is optional; answers are then compared after normalization only.
+    sympy = None
+
+logger = logging.getLogger(__name__)
+
+_UNIT_WORDS = r"(?:units?|degrees?|cm|m|km|inches|inch|feet|ft|meters?|dollars?|cents?|hours?|minutes?|seconds?)"
+
+
+def extract_boxed(text: str) -> str | None:
+    """Returns the contents of the last \\boxed{...} (or \\fbox{...}) in the text, honouring nested braces."""
+    if not text:
+        return None
+    start = max(text.rfind("\\boxed"), text.rfind("\\fbox"))
+    if start == -1:
+        return None
+    brace = text.find("{", start)
+    if brace == -1:
+        # "\boxed 5" style
+        match = re.match(r"\\(?:boxed|fbox)\s+([^\s$]+)", text[start:])
+        return match.group(1) if match else None
+    depth = 0
+    for index in range(brace, len(text)):
+        if text[index] == "{":
+            depth += 1
+        elif text[index] == "}":
+            depth -= 1
+            if depth == 0:
+                return text[brace + 1:index]
+    return None
+
+
+def _fix_shorthand(answer: str) -> str:
+    """Rewrites \\frac12 as \\frac{1}{2} and \\sqrt2 as \\sqrt{2}."""
+    answer = re.sub(r"\\sqrt\s*([0-9a-zA-Z])", r"\\sqrt{\1}", answer)
+    answer = re.sub(r"\\frac\s*([0-9a-zA-Z])\s*([0-9a-zA-Z])", r"\\frac{\1}{\2}", answer)
+    answer = re.sub(r"\\frac\s*(\{[^{}]*\})\s*([0-9a-zA-Z])", r"\\frac\1{\2}", answer)
+    answer = re.sub(r"\\frac\s*([0-9a-zA-Z])\s*(\{[^{}]*\})", r"\\frac{\1}\2", answer)
+    return answer
+
+
+def normalize_answer(answer: str | None) -> str | None:
+    """Normalizes a LaTeX answer string so that trivially different spellings compare equal."""
+    if answer is None:
+        return None
+    answer = answer.strip()
+    answer = re.sub(r"\\text\{\s*" + _UNIT_WORDS + r"\s*\}", "", answer)
+    answer = re.sub(r"\\(?:text|textbf|mathrm|mbox)\{([^{}]*)\}", r"\1", answer)
+    answer = re.sub(r"^[a-zA-Z]\s*=\s*", "", answer) # "x = 5" -> "5"
+    for old, new in (("\\left", ""), ("\\right", ""), ("\\!", ""), ("\\,", ""), ("\\;", ""), ("\\ ", ""),
+                     ("dfrac", "frac"), ("tfrac", "frac"), ("^\\circ", ""), ("^{\\circ}", ""),
+                     ("\\$", ""), ("$", ""), ("\\%", ""), ("%", "")):
+        answer = answer.replace(old, new)
+    answer = re.sub(r"\s+", "", answer)
+    if re.fullmatch(r"\d{1,3}(,\d{3})+(\.\d+)?", answer):
+        answer = answer.replace(",", "") # 1,000 -> 1000
+    answer = answer.rstrip(".")
+    if answer.startswith("."):
+        answer = "0" + answer
+    answer = re.sub(r"(\d+)\.0+$", r"\1", answer) # 5.0 -> 5
+    return _fix_shorthand(answer)
+
+
+def _split_top_level(answer: str) -> list[str]:
+    """Splits tuples, intervals and lists ("(1,2)", "[0,\\infty)", "1,2,3") into their elements."""
+    inner = answer
+    if len(answer) >= 2 and answer[0] in "([{" and answer[-1] in ")]}":
+        inner = answer[1:-1]
+    parts, depth, current = [], 0, ""
+    for char in inner:
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    parts.append(current)
+    return parts
+
+
+# What may reach sympy's parser (which evaluates its input with `eval`): numbers, operators,
+# brackets, the functions and constants the LaTeX conversion produces, and single-letter symbols.
+# Model output with quotes, underscores, attribute access or other names is rejected.
+_SYMPY_TOKEN_RE = re.compile(r"\d+(?:\.\d+)?|[A-Za-z]+|[-+*/^()!]")
+_SYMPY_NAMES = {"sqrt", "pi", "oo", "log", "sin", "cos", "tan"}
+
+
+def _check_safe_expression(text: str, expression: str):
+    """Raises ValueError unless `text` consists only of whitelisted tokens (see _SYMPY_TOKEN_RE)."""
+    position = 0
+    for match in _SYMPY_TOKEN_RE.finditer(text):
+        token = match.group()
+        if match.start() != position or (token.isalpha() and len(token) > 1 and token not in _SYMPY_NAMES):
+            raise ValueError(f"Unsupported expression '{expression}'")
+        position = match.end()
+    if position != len(text):
+        raise ValueError(f"Unsupported expression '{expression}'")
+
+
+def _latex_to_sympy(expression: str):
+    """Converts the common subset of LaTeX used in MATH answers into a sympy expression."""
+    text = expression
+    for _ in range(5): # Nested \frac / \sqrt
+        text = re.sub(r"\\frac\{([^{}]*)\}\{([^{}]*)\}", r"((\1)/(\2))", text)
+        text = re.sub(r"\\sqrt\[([^\]]*)\]\{([^{}]*)\}", r"((\2)**(1/(\1)))", text)
+        text = re.sub(r"\\sqrt\{([^{}]*)\}", r"sqrt(\1)", text)
+    for old, new in (("\\cdot", "*"), ("\\times", "*"), ("\\div", "/"), ("\\pi", "pi"), ("\\infty", "oo"),
+                     ("\\ln", "log"), ("\\log", "log"), ("\\sin", "sin"), ("\\cos", "cos"), ("\\tan", "tan"),
+                     ("{", "("), ("}", ")")):
+        text = text.replace(old, new)
+    if "\\" in text:
+        raise ValueError(f"Unsupported LaTeX in '{expression}'")
+    _check_safe_expression(text, expression)
+    transformations = standard_transformations + (implicit_multiplication_application, convert_xor)
+    return parse_expr(text, transformations=transformations, evaluate=True)
+
+
+def _symbolically_equal(a: str, b: str) -> bool:
+    left, right = _latex_to_sympy(a), _latex_to_sympy(b)
+    difference = sympy.simplify(left - right)
+    if difference == 0:
+        return True
+    try:
+        return abs(complex(sympy.N(difference))) < 1e-6
+    except (TypeError, ValueError):
+        return False
+
+
+class ComparisonTimeout(Exception):
+    pass
+
+
+def _run_with_timeout(function, timeout_s: float):
+    """
+    Runs function() with a wall-clock limit. The limit uses SIGALRM, so it only applies on POSIX
+    in a process's main thread (as in the scoring worker processes); elsewhere it runs unbounded.
+    """
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        return function()
+
+    def on_timeout(signum, frame):
+        raise ComparisonTimeout()
+
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout_s)
+    try:
+        return function()
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def answers_equivalent(predicted: str | None, reference: str | None, timeout_s: float = 5.0) -> tuple[bool, str]:
+    """
+    Checks whether two (LaTeX) answers are mathematically equivalent.
+
+    Returns:
+        tuple: (equivalent, method) where method is 'string', 'numeric', 'symbolic', 'timeout' or 'none'.
+    """
+    a, b = normalize_answer(predicted), normalize_answer(reference)
+    if a is None or b is None or a == "" or b == "":
+        return False, "none"
+    if a == b:
+        return True, "string"
+
+    a_parts, b_parts = _split_top_level(a), _split_top_level(b)
+    if len(a_parts) > 1 or len(b_parts) > 1:
+        if len(a_parts) != len(b_parts):
+            return False, "string"
+        if a[0] in "([" and b[0] in "([" and (a[0], a[-1]) != (b[0], b[-1]):
+            return False, "string" # Open vs. closed interval
+        verdicts = [answers_equivalent(x, y, timeout_s) for x, y in zip(a_parts, b_parts)]
+        return all(v for v, _ in verdicts), "symbolic" if any(m == "symbolic" for _, m in verdicts) else "string"
+
+    try:
+        if abs(float(a) - float(b)) <= 1e-6 * max(1.0, abs(float(b))):
+            return True, "numeric"
+        return False, "numeric"
+    except ValueError:
+        pass
+
+    if sympy is None:
+        return False, "string"
+    try:
+        return _run_with_timeout(lambda: _symbolically_equal(a, b), timeout_s), "symbolic"
+    except ComparisonTimeout:
+        logger.warning("Symbolic comparison of '%s' and '%s' timed out after %s s.", a, b, timeout_s)
+        return False, "timeout"
+    except Exception:
+        # Unparseable answers are simply not equivalent.
+        return False, "symbolic"
+
+
+class EquivalenceChecker:
+    """
+    Memoizes `answers_equivalent` verdicts in memory and in a persistent DiskCache, so repeated
+    runs and several models answering alike do not redo the same algebra.
+    """
+    def __init__(self, cache_file: str | None = "cache/scoring_cache.db", timeout_s: float = 5.0):
+        self.timeout_s = timeout_s
+        self.cache = DiskCache(cache_file, namespace="math_equivalence") if cache_file else None
+        self._memory = {}
+
+    def check(self, predicted: str | None, reference: str | None) -> dict:
+        """
+        Returns:
+            dict: {'equivalent': bool, 'method': str, 'cached': bool}
+        """
+        key = cache_key(normalize_answer(predicted), normalize_answer(reference))
+        verdict = self._memory.get(key)
+        if verdict is None and self.cache is not None:
+            verdict = self.cache.get(key)
+        if verdict is not None:
+            self._memory[key] = verdict
+            return {**verdict, "cached": True}
+
+        equivalent, method = answers_equivalent(predicted, reference, self.timeout_s)
+        verdict = {"equivalent": equivalent, "method": method}
+        # Timeouts are not cached: the next run (maybe on a faster machine) may finish the comparison.
+        if method != "timeout":
+            self._memory[key] = verdict
+            if self.cache is not None:
+                self.cache.set(key, verdict)
+        return {**verdict, "cached": False}
@@ -13,6 +13,20 @@ try:
 except ImportError:
     NVIDIA_SMI_AVAILABLE = False
 
+def device_memory_gb() -> float:
+    """Total memory models can be loaded into: VRAM summed over all NVIDIA GPUs, or system RAM without one."""
+    if NVIDIA_SMI_AVAILABLE:
+        try:
+            pynvml.nvmlInit()
+            total = sum(pynvml.nvmlDeviceGetMemoryInfo(pynvml.nvmlDeviceGetHandleByIndex(i)).total
+                        for i in range(pynvml.nvmlDeviceGetCount()))
+            pynvml.nvmlShutdown()
+            if total:
+                return total / 1024**3
+        except Exception:
+            logger.warning("Could not read the GPU memory size; using system RAM instead.", exc_info=True)
+    return psutil.virtual_memory().total / 1024**3
+
 class SystemMonitor:
     """
     A thread-based monitor to sample system resource usage (CPU, RAM, GPU)
@@ -51,42 +65,53 @@ class SystemMonitor:
     def _monitor_loop(self):
         """The main loop for the monitoring thread."""
         while self.is_running:
-            snapshot = {'timestamp': time.time()}
-            # CPU and RAM
-            snapshot['cpu_percent'] = psutil.cpu_percent()
-            snapshot['ram_percent'] = psutil.virtual_memory().percent
-
-            # GPU Metrics
-            gpu_stats = {
-                'gpu_util_percent': 0, 'gpu_mem_percent': 0, 'gpu_power_mw': 0
-            }
-            if NVIDIA_SMI_AVAILABLE:
-                try:
-                    pynvml.nvmlInit()
-                    device_count = pynvml.nvmlDeviceGetCount()
-                    if device_count > 0:
-                        # Aggregate stats across all GPUs
-                        total_util, total_mem, total_power = 0, 0, 0
-                        for i in range(device_count):
-                            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
-                            total_util += pynvml.nvmlDeviceGetUtilizationRates(handle).gpu
-                            mem_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
-                            total_mem += (mem_info.used / mem_info.total * 100)
-                            total_power += pynvml.nvmlDeviceGetPowerUsage(handle)
-                        
-                        gpu_stats['gpu_util_percent'] = total_util / device_count
-                        gpu_stats['gpu_mem_percent'] = total_mem / device_count
-                        gpu_stats['gpu_power_mw'] = total_power
-
-                    pynvml.nvmlShutdown()
-                except Exception:
-                    logging.error("Error sampling GPU metrics", exc_info=True)
-                    pass 
-            
-            snapshot.update(gpu_stats)
-            self.results.append(snapshot)
+            self.results.append(self.sample())
             time.sleep(self.interval)
 
+    def sample(self) -> dict:
+        """
+        Takes one snapshot of CPU, RAM and GPU usage. Also usable without the monitoring thread,
+        e.g. to measure memory right before and after a model is loaded.
+        """
+        snapshot = {'timestamp': time.time()}
+        # CPU and RAM
+        snapshot['cpu_percent'] = psutil.cpu_percent()
+        memory = psutil.virtual_memory()
+        snapshot['ram_percent'] = memory.percent
+        snapshot['ram_used_gb'] = memory.used / 1024**3
+
+        # GPU Metrics
+        gpu_stats = {
+            'gpu_util_percent': 0, 'gpu_mem_percent': 0, 'gpu_mem_used_gb': 0, 'gpu_power_mw': 0
+        }
+        if NVIDIA_SMI_AVAILABLE:
+            try:
+                pynvml.nvmlInit()
+                device_count = pynvml.nvmlDeviceGetCount()
+                if device_count > 0:
+                    # Aggregate stats across all GPUs
+                    total_util, total_mem, total_mem_used, total_power = 0, 0, 0, 0
+                    for i in range(device_count):
+                        handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+                        total_util += pynvml.nvmlDeviceGetUtilizationRates(handle).gpu
+                        mem_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
+                        total_mem += (mem_info.used / mem_info.total * 100)
+                        total_mem_used += mem_info.used
+                        total_power += pynvml.nvmlDeviceGetPowerUsage(handle)
+                    
+                    gpu_stats['gpu_util_percent'] = total_util / device_count
+                    gpu_stats['gpu_mem_percent'] = total_mem / device_count
+                    gpu_stats['gpu_mem_used_gb'] = total_mem_used / 1024**3
+                    gpu_stats['gpu_power_mw'] = total_power
+
+                pynvml.nvmlShutdown()
+            except Exception:
+                logging.error("Error sampling GPU metrics", exc_info=True)
+                pass 
+        
+        snapshot.update(gpu_stats)
+        return snapshot
+
     def start(self):
         """Starts the monitoring thread."""
         if self._thread is not None:
@@ -121,6 +146,10 @@ class SystemMonitor:
             'avg_gpu_util_percent': sum(r['gpu_util_percent'] for r in self.results) / num_samples,
             'max_gpu_util_percent': max(r['gpu_util_percent'] for r in self.results),
             'avg_gpu_mem_percent': sum(r['gpu_mem_percent'] for r in self.results) / num_samples,
+            'max_gpu_mem_percent': max(r['gpu_mem_percent'] for r in self.results),
+            # Peak memory in use (VRAM summed over all GPUs), e.g. to see how the KV cache grows with num_ctx.
+            'max_ram_used_gb': max(r['ram_used_gb'] for r in self.results),
+            'max_gpu_mem_used_gb': max(r['gpu_mem_used_gb'] for r in self.results),
         }
 
         # Calculate total energy consumption
@@ -0,0 +1,137 @@
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SECONDS_PER_QUESTION = 10.0 # Used for models without any stored history
+COOLDOWN_S = 5 # The evaluator's pause after every model-benchmark pair
+
+
+def parse_duration(text: str) -> float:
+    """Parses "3600", "90s", "45m", "2h" or "1h30m" into seconds."""
+    text = str(text).strip().lower()
+    if re.fullmatch(r"\d+(\.\d+)?", text):
+        return float(text)
+    parts = re.findall(r"(\d+(?:\.\d+)?)\s*([hms])", text)
+    if not parts or "".join(f"{n}{u}" for n, u in parts) != re.sub(r"\s+", "", text):
+        raise ValueError(f"Invalid duration '{text}' (use e.g. 3600, 90m, 2h or 1h30m)")
+    return sum(float(n) * {"h": 3600, "m": 60, "s": 1}[u] for n, u in parts)
+
+
+def format_duration(seconds: float | None) -> str:
+    if seconds is None:
+        return "N/A"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{secs:02d}s"
+
+
+def plan_run(models: list[str], benchmarks: list, backends: list, store, evaluation_options: dict | None = None,
+             default_seconds_per_question: float = DEFAULT_SECONDS_PER_QUESTION) -> list[dict]:
+    """
+    Estimates the time and GPU energy of every model x benchmark (x engine) pair from the stored
+    history of the model, without sending any generation requests. The estimate assumes every
+    question is asked (adaptive early stopping can only shorten the run).
+
+    Args:
+        store (ResultsStore): Source of the historical per-question latency and energy.
+        evaluation_options (dict, optional): The `evaluation` config section (trials, warm-up
+            questions and generation workers scale the estimate).
+
+    Returns:
+        list: One row per pair: {'model', 'benchmark', 'backend', 'questions': int,
+              'est_time_s': float, 'est_energy_wh': float | None,
+              'basis': 'benchmark history' | 'model history' | 'default'}
+    """
+    evaluation_options = evaluation_options or {}
+    trials = max(1, int(evaluation_options.get('trials', 1)))
+    warmup = max(0, int(evaluation_options.get('warmup_questions', 0)))
+    workers = max(1, int((evaluation_options.get('pipeline') or {}).get('generation_workers', 1)))
+
+    plan = []
+    for benchmark in benchmarks:
+        benchmark_name = benchmark.get_name()
+        num_questions = len(benchmark.get_questions() or [])
+        if benchmark.question_fraction is not None:
+            num_questions = min(num_questions, max(1, round(num_questions * benchmark.question_fraction)))
+        for backend in backends:
+            for model in benchmark.models or models:
+                history, basis = store.get_history(model, benchmark_name, backend.name), "benchmark history"
+                if history is None:
+                    history, basis = store.get_history(model, None, backend.name), "model history"
+                latency = history["latency_s"] if history else default_seconds_per_question
+                energy = history["energy_wh"] if history else None
+                plan.append({
+                    "model": model,
+                    "benchmark": benchmark_name,
+                    "backend": backend.name,
+                    "questions": num_questions,
+                    "est_time_s": latency * (num_questions * trials + warmup) / workers + COOLDOWN_S,
+                    "est_energy_wh": energy * num_questions * trials if energy is not None else None,
+                    "basis": basis if history else "default",
+                })
+    return plan
+
+
+def allocate_budget(plan: list[dict], budget_s: float, min_questions: int = 20) -> dict:
+    """
+    Splits a wall-clock budget across the benchmarks of a plan and returns the fraction of each
+    benchmark's questions that fits its share ({benchmark: fraction}, 1.0 = all).
+
+    Every benchmark gets an equal share; benchmarks that need less keep all their questions and
+    pass the rest on to the others, so one large benchmark cannot crowd out the small ones.
+    A benchmark keeps at least `min_questions` questions.
+    """
+    costs, sizes, fixed = {}, {}, 0.0
+    for row in plan:
+        costs[row["benchmark"]] = costs.get(row["benchmark"], 0.0) + row["est_time_s"] - COOLDOWN_S
+        sizes[row["benchmark"]] = row["questions"]
+        fixed += COOLDOWN_S
+    available = max(0.0, budget_s - fixed)
+    fractions, remaining = {}, dict(costs)
+    while remaining:
+        share = available / len(remaining)
+        fitting = {name: cost for name, cost in remaining.items() if cost <= share}
+        if not fitting:
+            for name, cost in remaining.items():
+                fractions[name] = share / cost
+            break
+        for name, cost in fitting.items():
+            fractions[name] = 1.0
+            available -= cost
+            del remaining[name]
+    for name, fraction in fractions.items():
+        if sizes[name]:
+            fractions[name] = min(1.0, max(fraction, min_questions / sizes[name]))
+    return fractions
+
+
+def scale_plan(plan: list[dict], fractions: dict) -> list[dict]:
+    """Applies `allocate_budget` fractions to a plan (the fixed cooldown is not scaled)."""
+    scaled = []
+    for row in plan:
+        fraction = fractions.get(row["benchmark"], 1.0)
+        scaled.append({
+            **row,
+            "questions": max(1, round(row["questions"] * fraction)) if row["questions"] else 0,
+            "est_time_s": (row["est_time_s"] - COOLDOWN_S) * fraction + COOLDOWN_S,
+            "est_energy_wh": row["est_energy_wh"] * fraction if row["est_energy_wh"] is not None else None,
+        })
+    return scaled
+
+
+def format_plan(plan: list[dict]) -> str:
+    """Renders a plan as a table with the total time and energy."""
+    from tabulate import tabulate
+
+    rows = [[row["model"] + (f" ({row['backend']})" if row["backend"] != "ollama" else ""), row["benchmark"],
+             row["questions"], format_duration(row["est_time_s"]),
+             f"{row['est_energy_wh']:.2f}" if row["est_energy_wh"] is not None else "N/A", row["basis"]]
+            for row in plan]
+    energies = [row["est_energy_wh"] for row in plan if row["est_energy_wh"] is not None]
+    total_energy = f"{sum(energies):.2f}" + ("" if len(energies) == len(plan) else "+") if energies else "N/A"
+    rows.append(["TOTAL", "", sum(row["questions"] for row in plan),
+                 format_duration(sum(row["est_time_s"] for row in plan)), total_energy, ""])
+    return tabulate(rows, headers=["Model", "Benchmark", "Questions", "Est. Time", "Est. GPU Energy (Wh)", "Basis"],
+                    tablefmt="grid")
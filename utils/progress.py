@@ -0,0 +1,153 @@
+import sys
+import time
+import threading
+import logging
+from collections import deque
+
+from utils.planner import format_duration
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressDisplay:
+    """
+    Live progress of a run: questions done in the current model-benchmark pair, rolling
+    throughput over the last `window_s` seconds, and ETAs for the pair and for the whole run.
+
+    The run ETA starts from the planner's estimates (see `utils.planner.plan_run`) and is revised
+    by how much faster or slower than planned the finished pairs ran. On a terminal the progress
+    is a single line rewritten in place (on stderr, next to the log output); otherwise it is
+    logged every `log_every_s` seconds. `snapshot` returns the same figures as a dict (e.g. for
+    the evaluation daemon's progress endpoint, read from another thread).
+    """
+    def __init__(self, plan: list[dict] | None = None, window_s: float = 60.0, log_every_s: float = 30.0,
+                 stream=None):
+        self.plan = plan or []
+        self.window_s = window_s
+        self.log_every_s = log_every_s
+        self.stream = stream or sys.stderr
+        self.interactive = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self._done_pairs = set()
+        self._planned_done_s = 0.0
+        self._actual_done_s = 0.0
+        self._pair = None
+        self._last_render = 0.0
+        self._lock = threading.RLock()
+
+    def start_pair(self, model: str, benchmark: str, backend: str, total_questions: int):
+        with self._lock:
+            self._start_pair(model, benchmark, backend, total_questions)
+
+    def update(self, count: int = 1):
+        with self._lock:
+            self._update(count)
+
+    def finish_pair(self):
+        with self._lock:
+            self._finish_pair()
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: {'current': '<model> on <benchmark>' | None, 'done': int, 'total': int,
+                   'questions_per_min': float | None, 'eta_s', 'run_eta_s': float | None,
+                   'pairs_done': int, 'pairs_planned': int}
+        """
+        with self._lock:
+            rate = self.rate()
+            pair_left, run_left = self.eta()
+            return {
+                "current": self._pair["label"] if self._pair else None,
+                "done": self._pair["done"] if self._pair else 0,
+                "total": self._pair["total"] if self._pair else 0,
+                "questions_per_min": rate * 60 if rate else None,
+                "eta_s": pair_left,
+                "run_eta_s": run_left,
+                "pairs_done": len(self._done_pairs),
+                "pairs_planned": len(self.plan),
+            }
+
+    def _start_pair(self, model: str, benchmark: str, backend: str, total_questions: int):
+        self._pair = {"key": (model, benchmark, backend), "label": f"{model} on {benchmark}",
+                      "total": total_questions, "done": 0, "started": time.perf_counter(), "completions": deque()}
+        self._render(force=True)
+
+    def _update(self, count: int):
+        if self._pair is None:
+            return
+        now = time.perf_counter()
+        self._pair["done"] += count
+        self._pair["completions"].append((now, count))
+        while self._pair["completions"] and now - self._pair["completions"][0][0] > self.window_s:
+            self._pair["completions"].popleft()
+        self._render()
+
+    def _finish_pair(self):
+        if self._pair is None:
+            return
+        elapsed = time.perf_counter() - self._pair["started"]
+        planned = self._planned_time(self._pair["key"])
+        if planned is not None:
+            self._planned_done_s += planned
+            self._actual_done_s += elapsed
+        self._done_pairs.add(self._pair["key"])
+        self._render(force=True)
+        if self.interactive:
+            self.stream.write("\n")
+            self.stream.flush()
+        self._pair = None
+
+    def rate(self) -> float | None:
+        """Questions per second over the rolling window."""
+        completions = self._pair["completions"] if self._pair else []
+        if len(completions) < 2:
+            return None
+        span = completions[-1][0] - completions[0][0]
+        return sum(count for _, count in list(completions)[1:]) / span if span > 0 else None
+
+    def eta(self) -> tuple[float | None, float | None]:
+        """(seconds left in the current pair, seconds left in the run)."""
+        rate = self.rate()
+        pair_left = None
+        if self._pair is not None and rate:
+            pair_left = max(0, self._pair["total"] - self._pair["done"]) / rate
+        if not self.plan:
+            return pair_left, None
+        # Later pairs are assumed to run as much faster/slower than planned as the finished ones did.
+        speed = self._actual_done_s / self._planned_done_s if self._planned_done_s else 1.0
+        current = self._pair["key"] if self._pair else None
+        later = sum(row["est_time_s"] for row in self.plan
+                    if self._row_key(row) not in self._done_pairs and self._row_key(row) != current)
+        if pair_left is None and current is not None:
+            planned = self._planned_time(current) or 0.0
+            pair_left = max(0.0, planned * speed - (time.perf_counter() - self._pair["started"]))
+        return pair_left, (pair_left or 0.0) + later * speed
+
+    def _render(self, force: bool = False):
+        now = time.perf_counter()
+        if not force and now - self._last_render < (0.5 if self.interactive else self.log_every_s):
+            return
+        self._last_render = now
+        if self._pair is None:
+            return
+        rate = self.rate()
+        pair_left, run_left = self.eta()
+        line = (f"{self._pair['label']}: {self._pair['done']}/{self._pair['total']} questions"
+                f" | {f'{rate * 60:.1f}' if rate else '-'} q/min"
+                f" | ETA {format_duration(pair_left)}"
+                + (f" | run ETA {format_duration(run_left)}" if run_left is not None else ""))
+        if self.interactive:
+            self.stream.write("\r" + line + "\033[K")
+            self.stream.flush()
+        else:
+            logger.info(f"Progress: {line}")
+
+    @staticmethod
+    def _row_key(row: dict) -> tuple:
+        return row["model"], row["benchmark"], row["backend"]
+
+    def _planned_time(self, key: tuple) -> float | None:
+        for row in self.plan:
+            if self._row_key(row) == key:
+                return row["est_time_s"]
+        return None
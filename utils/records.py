@@ -0,0 +1,73 @@
+import gzip
+import json
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class QuestionRecordWriter:
+    """
+    Writes per-question evaluation records as gzip-compressed JSON Lines.
+
+    `write()` only enqueues the record; serialization, compression and disk I/O
+    happen on a background thread so the evaluation loop never waits on them.
+    Each run appends a new gzip member, so one file can hold many runs and is
+    still readable with `gzip.open(path, 'rt')` or `zcat`.
+    """
+    def __init__(self, output_file: str, run_id: str | None = None, max_queue_size: int = 10000):
+        self.output_file = output_file
+        self.run_id = run_id
+        self.records_written = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=self._writer_loop, name="question-records", daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict):
+        """Queues a record for writing. `run_id` is added when the writer has one."""
+        if self.run_id is not None:
+            record = {"run_id": self.run_id, **record}
+        self._queue.put(record)
+
+    def _writer_loop(self):
+        try:
+            with gzip.open(self.output_file, 'at', encoding='utf-8') as f:
+                while True:
+                    record = self._queue.get()
+                    if record is _STOP:
+                        break
+                    try:
+                        f.write(json.dumps(record, default=str) + "\n")
+                        self.records_written += 1
+                    except (TypeError, ValueError) as e:
+                        logger.error("Could not serialize question record: %s", e)
+        except OSError as e:
+            logger.error("Error writing question records to %s: %s", self.output_file, e)
+            # Keep draining so producers never block on a full queue.
+            while self._queue.get() is not _STOP:
+                pass
+
+    def close(self):
+        """Flushes all queued records and closes the file."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        logger.info("Wrote %d question records to %s", self.records_written, self.output_file)
+
+
+def read_question_records(path: str, run_id: str | None = None):
+    """
+    Yields records from a question-record file, optionally only those of one run.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if run_id is None or record.get("run_id") == run_id:
+                yield record
@@ -0,0 +1,179 @@
+import logging
+from utils import stats
+
+logger = logging.getLogger(__name__)
+
+# metric name -> (per-question field, True if higher values are better)
+DISTRIBUTION_METRICS = {
+    "tokens_s": ("tokens_s", True),
+    "ttft_s": ("ttft_s", False),
+    "latency_s": ("latency_s", False),
+}
+
+DEFAULT_THRESHOLDS = {
+    "alpha": 0.05,            # Significance level of the statistical tests
+    "min_relative_change": 0.05,  # Ignore throughput/latency/energy changes smaller than 5%
+    "min_accuracy_drop": 1.0,     # Ignore accuracy drops smaller than 1 percentage point
+}
+
+
+def _values(entry: dict, field: str) -> list[float]:
+    return [q[field] for q in entry.get("questions", []) if q.get(field) is not None and not q.get("error")]
+
+
+def _scores_by_question(entry: dict) -> dict:
+    """Maps question ID to its score, averaged over trials when a question was asked repeatedly."""
+    scores = {}
+    for q in entry.get("questions", []):
+        if q.get("score") is not None:
+            scores.setdefault(str(q["question_id"]), []).append(q["score"])
+    return {qid: sum(values) / len(values) for qid, values in scores.items()}
+
+
+def _relative_change(baseline: float | None, current: float | None) -> float | None:
+    if baseline is None or current is None or baseline == 0:
+        return None
+    return (current - baseline) / abs(baseline)
+
+
+def _energy_per_question(entry: dict) -> float | None:
+    energy = entry.get("total_gpu_energy_wh")
+    num_questions = entry.get("num_questions") or len(entry.get("questions", []))
+    if not energy or not num_questions:
+        return None
+    return energy / num_questions
+
+
+def compare_entries(baseline: dict, current: dict, thresholds: dict | None = None) -> list[dict]:
+    """
+    Compares one model x benchmark result entry against its baseline.
+
+    Throughput, TTFT and latency are compared with a one-sided Mann-Whitney U test on the
+    per-question distributions. Accuracy uses an exact McNemar test on the questions both runs
+    answered (falling back to a two-proportion z-test when they share no questions). Energy is
+    only measured per run, so it is flagged when energy per question grows beyond the
+    relative-change threshold.
+
+    Returns:
+        list: One finding per metric:
+              {'model', 'benchmark', 'backend', 'metric', 'baseline', 'current', 'change', 'p_value',
+               'test', 'regression': bool}
+              'change' is relative for throughput/latency/energy and in percentage points for accuracy.
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    alpha = thresholds["alpha"]
+    findings = []
+
+    def finding(metric, baseline_value, current_value, change, p_value, test, regression):
+        findings.append({
+            "model": current.get("model"), "benchmark": current.get("benchmark"),
+            "backend": current.get("backend", "ollama"), "metric": metric,
+            "baseline": baseline_value, "current": current_value, "change": change,
+            "p_value": p_value, "test": test, "regression": regression,
+        })
+
+    for metric, (field, higher_is_better) in DISTRIBUTION_METRICS.items():
+        base_values, cur_values = _values(baseline, field), _values(current, field)
+        if not base_values or not cur_values:
+            continue
+        base_median, cur_median = stats.median(base_values), stats.median(cur_values)
+        change = _relative_change(base_median, cur_median)
+        # "Worse" means lower throughput or higher latency in the current run.
+        p_value = stats.mann_whitney_u(cur_values, base_values, alternative="less" if higher_is_better else "greater")
+        worse_by = -change if higher_is_better else change
+        regression = (p_value is not None and p_value < alpha and worse_by is not None
+                      and worse_by >= thresholds["min_relative_change"])
+        finding(metric, base_median, cur_median, change, p_value, "mann-whitney-u", regression)
+
+    # --- Accuracy ---
+    base_scores, cur_scores = _scores_by_question(baseline), _scores_by_question(current)
+    if base_scores and cur_scores:
+        shared = sorted(set(base_scores) & set(cur_scores))
+        binary = all(v in (0.0, 1.0) for v in list(base_scores.values()) + list(cur_scores.values()))
+        if shared and binary:
+            base_paired = [base_scores[k] for k in shared]
+            cur_paired = [cur_scores[k] for k in shared]
+            p_value = stats.mcnemar_worse(base_paired, cur_paired)
+            base_acc, cur_acc = stats.mean(base_paired) * 100, stats.mean(cur_paired) * 100
+            test = "mcnemar-exact"
+        elif binary:
+            base_n, cur_n = len(base_scores), len(cur_scores)
+            base_ok, cur_ok = int(sum(base_scores.values())), int(sum(cur_scores.values()))
+            p_value = stats.two_proportion_worse(base_ok, base_n, cur_ok, cur_n)
+            base_acc, cur_acc = base_ok / base_n * 100, cur_ok / cur_n * 100
+            test = "two-proportion-z"
+        else:
+            base_values, cur_values = list(base_scores.values()), list(cur_scores.values())
+            p_value = stats.mann_whitney_u(cur_values, base_values, alternative="less")
+            base_acc, cur_acc = stats.mean(base_values) * 100, stats.mean(cur_values) * 100
+            test = "mann-whitney-u"
+        change = cur_acc - base_acc
+        regression = p_value is not None and p_value < alpha and -change >= thresholds["min_accuracy_drop"]
+        finding("accuracy", base_acc, cur_acc, change, p_value, test, regression)
+
+    # --- Energy ---
+    base_energy, cur_energy = _energy_per_question(baseline), _energy_per_question(current)
+    if base_energy is not None and cur_energy is not None:
+        change = _relative_change(base_energy, cur_energy)
+        regression = change is not None and change >= thresholds["min_relative_change"]
+        finding("energy_wh_per_question", base_energy, cur_energy, change, None, "threshold", regression)
+
+    return findings
+
+
+def _entry_key(entry: dict) -> tuple:
+    """Matches entries by model, benchmark and engine (runs stored before backends existed used Ollama)."""
+    return entry.get("model"), entry.get("benchmark"), entry.get("backend", "ollama")
+
+
+def compare_runs(baseline_results: list[dict], current_results: list[dict], thresholds: dict | None = None) -> list[dict]:
+    """
+    Compares every model x benchmark pair present in both runs. Baseline entries measured while
+    other daemon jobs shared the GPU (`co_scheduled_with`) are not used.
+
+    Args:
+        baseline_results, current_results (list[dict]): Result entries as produced by
+            `run_evaluation` (or `ResultsStore.get_run_results(..., include_questions=True)`).
+        thresholds (dict, optional): Overrides for DEFAULT_THRESHOLDS.
+
+    Returns:
+        list: All findings of `compare_entries` for the matched pairs.
+    """
+    baseline_by_key = {_entry_key(r): r for r in baseline_results}
+    findings = []
+    for current in current_results:
+        key = _entry_key(current)
+        baseline = baseline_by_key.get(key)
+        if baseline is None:
+            logger.warning(f"No baseline result for {key[0]} ({key[2]}) on {key[1]}; skipping comparison.")
+            continue
+        if baseline.get("co_scheduled_with"):
+            logger.warning(f"The baseline result for {key[0]} ({key[2]}) on {key[1]} shared the GPU with other "
+                           f"jobs ({', '.join(baseline['co_scheduled_with'])}); skipping comparison.")
+            continue
+        findings.extend(compare_entries(baseline, current, thresholds))
+    return findings
+
+
+def format_findings(findings: list[dict]) -> str:
+    """Renders comparison findings as a table."""
+    from tabulate import tabulate
+
+    def fmt(value, digits=3):
+        return f"{value:.{digits}f}" if value is not None else "N/A"
+
+    headers = ["Model", "Benchmark", "Metric", "Baseline", "Current", "Change", "p-value", "Test", "Status"]
+    rows = []
+    for f in findings:
+        if f["change"] is None:
+            change = "N/A"
+        elif f["metric"] == "accuracy":
+            change = f"{f['change']:+.2f} pp"
+        else:
+            change = f"{f['change'] * 100:+.1f}%"
+        rows.append([
+            f["model"] + (f" ({f['backend']})" if f.get("backend", "ollama") != "ollama" else ""),
+            f["benchmark"], f["metric"], fmt(f["baseline"]), fmt(f["current"]), change,
+            fmt(f["p_value"], 4), f["test"], "REGRESSION" if f["regression"] else "ok",
+        ])
+    return tabulate(rows, headers=headers, tablefmt="grid")
@@ -0,0 +1,205 @@
+import time
+import random
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Error classes worth retrying: the server may well answer the same request a moment later.
+TRANSIENT_ERRORS = {"timeout", "connection", "server_error", "rate_limited"}
+
+
+class RequestError(Exception):
+    """A request that failed for good, after `attempts` attempts."""
+    def __init__(self, error_class: str, message: str, attempts: int):
+        super().__init__(message)
+        self.error_class = error_class
+        self.attempts = attempts
+
+
+def classify_exception(exc: Exception) -> str:
+    """
+    Maps an exception raised by one request attempt to an error class: "timeout", "connection",
+    "server_error" (5xx), "rate_limited" (429), "client_error" (other 4xx), "decode" or "other".
+    """
+    if isinstance(exc, requests.exceptions.Timeout):
+        return "timeout"
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError)):
+        return "connection"
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+        if status == 429:
+            return "rate_limited"
+        return "server_error" if status >= 500 else "client_error"
+    if isinstance(exc, ValueError): # json.JSONDecodeError, and requests' own JSONDecodeError
+        return "decode"
+    return "other"
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to an endpoint after `failure_threshold` consecutive transient
+    failures. While open, callers wait; after `reset_timeout_s` one probe request is let through
+    (half-open) and, if it gets an answer, the circuit closes and the waiting callers continue.
+    A failed probe opens the circuit for another `reset_timeout_s`.
+    """
+    def __init__(self, endpoint: str, failure_threshold: int = 5, reset_timeout_s: float = 30.0):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self, deadline: float) -> bool:
+        """
+        Waits until a request may be sent (or `deadline`, a time.monotonic() value, passes).
+
+        Returns:
+            bool: False if the circuit stayed open until the deadline.
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if self.state == "closed":
+                    return True
+                if self.state == "open" and now >= self._opened_at + self.reset_timeout_s:
+                    self.state = "half_open"
+                    logger.info(f"Probing {self.endpoint} after {self.reset_timeout_s:.0f} s...")
+                    return True # This caller sends the probe
+                if now >= deadline:
+                    return False
+                wake_at = self._opened_at + self.reset_timeout_s if self.state == "open" else deadline
+                self._condition.wait(max(0.0, min(wake_at, deadline) - now))
+
+    def record_success(self):
+        """The endpoint answered (even with a non-transient error)."""
+        with self._condition:
+            if self.state != "closed":
+                logger.info(f"{self.endpoint} is answering again; resuming requests.")
+            self.state = "closed"
+            self._failures = 0
+            self._condition.notify_all()
+
+    def record_failure(self):
+        """A transient failure (timeout, connection error, 5xx, 429)."""
+        with self._condition:
+            self._failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self._failures >= self.failure_threshold):
+                logger.warning(f"{self.endpoint} failed {self._failures} time(s) in a row; pausing requests "
+                               f"for {self.reset_timeout_s:.0f} s.")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+            self._condition.notify_all()
+
+
+class RequestPolicy:
+    """
+    Deadlines, retries and circuit breaking for the requests to inference servers.
+
+    Every attempt gets at most `attempt_timeout_s` (seconds without a response) and all attempts
+    of one request together at most `total_timeout_s`. Transient errors (see `TRANSIENT_ERRORS`)
+    are retried up to `max_retries` times after an exponential backoff with full jitter
+    (a random delay up to backoff_base_s * 2^(retry - 1), capped at backoff_max_s, or the
+    server's Retry-After); other errors fail at once. One `CircuitBreaker` guards each endpoint
+    (scheme, host and port).
+    """
+    def __init__(self,
+                 attempt_timeout_s: float = 300.0,
+                 total_timeout_s: float = 900.0,
+                 connect_timeout_s: float = 10.0,
+                 max_retries: int = 3,
+                 backoff_base_s: float = 1.0,
+                 backoff_max_s: float = 30.0,
+                 failure_threshold: int = 5,
+                 reset_timeout_s: float = 30.0):
+        self.attempt_timeout_s = attempt_timeout_s
+        self.total_timeout_s = total_timeout_s
+        self.connect_timeout_s = connect_timeout_s
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        parts = urlsplit(url)
+        endpoint = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout_s)
+            return self._breakers[endpoint]
+
+    def backoff_s(self, retry: int, exc: Exception | None = None) -> float:
+        """The delay before the `retry`-th retry (1-based)."""
+        delay = self._random.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2 ** (retry - 1)))
+        response = getattr(exc, "response", None)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.backoff_max_s))
+        return delay
+
+    def call(self, url: str, attempt, attempt_timeout_s: float | None = None):
+        """
+        Runs `attempt(timeout)` until it returns, retrying transient failures.
+        `timeout` is a (connect, read) tuple for `requests`.
+
+        Returns:
+            tuple: (the value `attempt` returned, number of attempts)
+
+        Raises:
+            RequestError: With the error class of the last failure ("deadline" if the total
+                deadline passed, "circuit_open" if the endpoint stayed paused until then).
+        """
+        breaker = self.breaker(url)
+        deadline = time.monotonic() + self.total_timeout_s
+        attempt_timeout_s = attempt_timeout_s or self.attempt_timeout_s
+        attempts = 0
+        while True:
+            if not breaker.acquire(deadline):
+                raise RequestError("circuit_open", f"{breaker.endpoint} kept failing until the deadline "
+                                                   f"of {self.total_timeout_s:.0f} s", attempts)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RequestError("deadline", f"No response within the deadline of {self.total_timeout_s:.0f} s",
+                                   attempts)
+            attempts += 1
+            try:
+                value = attempt((min(self.connect_timeout_s, remaining), min(attempt_timeout_s, remaining)))
+            except Exception as e:
+                error_class = classify_exception(e)
+                if error_class not in TRANSIENT_ERRORS:
+                    breaker.record_success()
+                    raise RequestError(error_class, str(e), attempts) from e
+                breaker.record_failure()
+                delay = self.backoff_s(attempts, e)
+                if attempts > self.max_retries or time.monotonic() + delay >= deadline:
+                    raise RequestError(error_class, str(e), attempts) from e
+                logger.warning(f"Request to {breaker.endpoint} failed ({error_class}: {e}); "
+                               f"retry {attempts}/{self.max_retries} in {delay:.1f} s.")
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            return value, attempts
+
+
+_policy = RequestPolicy()
+
+
+def get_policy() -> RequestPolicy:
+    """The policy shared by all requests to inference servers."""
+    return _policy
+
+
+def configure(options: dict | None = None) -> RequestPolicy:
+    """Replaces the shared policy with one built from the `request_policy` config section."""
+    global _policy
+    _policy = RequestPolicy(**(options or {}))
+    return _policy
@@ -0,0 +1,315 @@
+import json
+import sqlite3
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    started_at  TEXT NOT NULL,
+    tag         TEXT,
+    cpu_model   TEXT,
+    gpu_models  TEXT,
+    config_json TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_tag ON runs(tag);
+
+CREATE TABLE IF NOT EXISTS results (
+    result_id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id           TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    model            TEXT NOT NULL,
+    benchmark        TEXT NOT NULL,
+    score            REAL,
+    avg_tokens_s     REAL,
+    num_questions    INTEGER,
+    successful_evals INTEGER,
+    metrics_json     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+CREATE INDEX IF NOT EXISTS idx_results_model_benchmark ON results(model, benchmark);
+
+CREATE TABLE IF NOT EXISTS question_results (
+    result_id     INTEGER NOT NULL REFERENCES results(result_id) ON DELETE CASCADE,
+    run_id        TEXT NOT NULL,
+    model         TEXT NOT NULL,
+    benchmark     TEXT NOT NULL,
+    question_id   TEXT NOT NULL,
+    subject       TEXT,
+    score         REAL,
+    tokens_s      REAL,
+    latency_s     REAL,
+    ttft_s        REAL,
+    prompt_tokens INTEGER,
+    output_tokens INTEGER,
+    error         TEXT,
+    extra_json    TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_question_results_result ON question_results(result_id);
+CREATE INDEX IF NOT EXISTS idx_question_results_question ON question_results(benchmark, question_id);
+"""
+
+# Result entry keys stored in dedicated columns; every other scalar/dict field goes to metrics_json.
+_RESULT_COLUMNS = ("model", "benchmark", "score", "avg_tokens_s", "num_questions", "successful_evals")
+_QUESTION_COLUMNS = ("question_id", "subject", "score", "tokens_s", "latency_s", "ttft_s",
+                     "prompt_tokens", "output_tokens", "error")
+_SKIPPED_KEYS = {"questions", "static_info", "run_id"}
+
+
+class ResultsStore:
+    """
+    Local SQLite database of evaluation runs.
+
+    Holds one row per run, per model x benchmark result and per question. The database
+    runs in WAL mode, so several evaluation processes can write to it concurrently
+    while reporters read from it.
+    """
+    def __init__(self, db_path: str = "results.db"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # --- Writing ---
+
+    def save_run(self, run_id: str, results_data: list[dict], tag: str | None = None,
+                 config: dict | None = None, started_at: str | None = None):
+        """
+        Stores a run and all its result entries (including per-question results) in one transaction.
+
+        Args:
+            run_id (str): Unique identifier of the run.
+            results_data (list[dict]): Result entries as returned by `run_evaluation`.
+            tag (str, optional): Human-friendly label (e.g. "ollama-0.9.2") used to select baselines.
+            config (dict, optional): The configuration the run used.
+            started_at (str, optional): ISO timestamp; defaults to now.
+        """
+        static_info = results_data[0].get('static_info', {}) if results_data else {}
+        started_at = started_at or datetime.now().isoformat(timespec="seconds")
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, started_at, tag, cpu_model, gpu_models, config_json) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, started_at, tag, static_info.get('cpu_model'), static_info.get('gpu_models'),
+                 json.dumps(config, default=str) if config is not None else None),
+            )
+            for res in results_data:
+                metrics = {k: v for k, v in res.items() if k not in _RESULT_COLUMNS and k not in _SKIPPED_KEYS}
+                cursor = self._conn.execute(
+                    "INSERT INTO results (run_id, model, benchmark, score, avg_tokens_s, num_questions, "
+                    "successful_evals, metrics_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, *(res.get(col) for col in _RESULT_COLUMNS), json.dumps(metrics, default=str)),
+                )
+                result_id = cursor.lastrowid
+                rows = []
+                for q in res.get('questions', []):
+                    extra = {k: v for k, v in q.items() if k not in _QUESTION_COLUMNS}
+                    rows.append((
+                        result_id, run_id, res.get('model'), res.get('benchmark'), str(q.get('question_id')),
+                        *(q.get(col) for col in _QUESTION_COLUMNS[1:]),
+                        json.dumps(extra, default=str) if extra else None,
+                    ))
+                self._conn.executemany(
+                    "INSERT INTO question_results (result_id, run_id, model, benchmark, question_id, subject, "
+                    "score, tokens_s, latency_s, ttft_s, prompt_tokens, output_tokens, error, extra_json) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        logger.info(f"Run {run_id} saved to results database {self.db_path}")
+
+    # --- Reading ---
+
+    def count_runs(self, model: str | None = None, benchmark: str | None = None) -> int:
+        """Counts runs, optionally only those containing a given model and/or benchmark."""
+        where, params = self._filter_clause(model, benchmark)
+        query = f"SELECT COUNT(*) FROM runs r {where}"
+        return self._conn.execute(query, params).fetchone()[0]
+
+    def list_runs(self, limit: int | None = None, offset: int = 0,
+                  model: str | None = None, benchmark: str | None = None, in_storage_order: bool = False) -> list[dict]:
+        """
+        Lists runs, newest first (or, with `in_storage_order`, in the order they were saved, which
+        later runs never change), optionally filtered to those containing a model and/or benchmark.
+        """
+        where, params = self._filter_clause(model, benchmark)
+        order = "r.rowid" if in_storage_order else "r.started_at DESC, r.rowid DESC"
+        query = f"SELECT r.* FROM runs r {where} ORDER BY {order}"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        return [dict(row) for row in self._conn.execute(query, params)]
+
+    def get_run(self, run_id: str) -> dict | None:
+        row = self._conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def resolve_run(self, run_ref: str) -> str | None:
+        """
+        Resolves a run reference to a run ID.
+
+        Accepts a run ID, a tag (the most recent run with that tag is used) or "latest".
+        """
+        if run_ref == "latest":
+            row = self._conn.execute("SELECT run_id FROM runs ORDER BY started_at DESC, rowid DESC LIMIT 1").fetchone()
+            return row[0] if row else None
+        if self.get_run(run_ref):
+            return run_ref
+        row = self._conn.execute(
+            "SELECT run_id FROM runs WHERE tag = ? ORDER BY started_at DESC, rowid DESC LIMIT 1", (run_ref,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_run_results(self, run_id: str, include_questions: bool = False) -> list[dict]:
+        """
+        Returns the result entries of a run in the same shape `run_evaluation` produces them.
+        """
+        run = self.get_run(run_id)
+        if run is None:
+            return []
+        static_info = {'cpu_model': run['cpu_model'], 'gpu_models': run['gpu_models']}
+        entries = []
+        for row in self._conn.execute("SELECT * FROM results WHERE run_id = ? ORDER BY result_id", (run_id,)):
+            entry = self._result_entry(row, static_info)
+            if include_questions:
+                entry['questions'] = self.get_question_results(row['result_id'])
+            entries.append(entry)
+        return entries
+
+    def get_runs_results(self, runs: list[dict]) -> dict:
+        """
+        Like `get_run_results` (without questions) for several runs of `list_runs` in one query.
+
+        Returns:
+            dict: {run_id: list of result entries}
+        """
+        entries = {run['run_id']: [] for run in runs}
+        if not runs:
+            return entries
+        static_info = {run['run_id']: {'cpu_model': run['cpu_model'], 'gpu_models': run['gpu_models']} for run in runs}
+        query = (f"SELECT * FROM results WHERE run_id IN ({', '.join('?' * len(entries))}) "
+                 "ORDER BY result_id")
+        for row in self._conn.execute(query, list(entries)):
+            entries[row['run_id']].append(self._result_entry(row, static_info[row['run_id']]))
+        return entries
+
+    @staticmethod
+    def _result_entry(row, static_info: dict) -> dict:
+        entry = {col: row[col] for col in _RESULT_COLUMNS}
+        entry.update(json.loads(row['metrics_json'] or '{}'))
+        entry['run_id'] = row['run_id']
+        entry['static_info'] = static_info
+        return entry
+
+    def get_question_results(self, result_id: int) -> list[dict]:
+        questions = []
+        for row in self._conn.execute(
+            "SELECT * FROM question_results WHERE result_id = ? ORDER BY rowid", (result_id,)
+        ):
+            question = {col: row[col] for col in _QUESTION_COLUMNS}
+            if row['extra_json']:
+                question.update(json.loads(row['extra_json']))
+            questions.append(question)
+        return questions
+
+    def list_models_and_benchmarks(self) -> tuple[list[str], list[str]]:
+        """Returns the distinct model and benchmark names present in the database."""
+        models = [r[0] for r in self._conn.execute("SELECT DISTINCT model FROM results ORDER BY model")]
+        benchmarks = [r[0] for r in self._conn.execute("SELECT DISTINCT benchmark FROM results ORDER BY benchmark")]
+        return models, benchmarks
+
+    def get_history(self, model: str, benchmark: str | None = None, backend: str = "ollama",
+                    limit_results: int = 5) -> dict | None:
+        """
+        Summarizes the most recent results of a model (on one benchmark, or on any), e.g. to plan a run.
+        Results of daemon jobs that shared the GPU with other jobs are left out.
+
+        Returns:
+            dict: {'latency_s': mean latency per answered question, 'questions': number of them,
+                   'energy_wh': mean GPU energy per question (None if never measured)}, or None
+                  without history.
+        """
+        conditions = ["model = ?", "COALESCE(json_extract(metrics_json, '$.backend'), 'ollama') = ?",
+                      "json_extract(metrics_json, '$.co_scheduled_with') IS NULL"]
+        params = [model, backend]
+        if benchmark is not None:
+            conditions.append("benchmark = ?")
+            params.append(benchmark)
+        rows = self._conn.execute(
+            f"SELECT result_id, num_questions, metrics_json FROM results WHERE {' AND '.join(conditions)} "
+            "ORDER BY result_id DESC LIMIT ?", (*params, limit_results)
+        ).fetchall()
+        if not rows:
+            return None
+        result_ids = [row['result_id'] for row in rows]
+        latency, count = self._conn.execute(
+            f"SELECT AVG(latency_s), COUNT(latency_s) FROM question_results "
+            f"WHERE result_id IN ({', '.join('?' * len(result_ids))}) AND error IS NULL", result_ids
+        ).fetchone()
+        if not count:
+            return None
+        energies = []
+        for row in rows:
+            energy = json.loads(row['metrics_json'] or '{}').get('total_gpu_energy_wh')
+            if energy and row['num_questions']:
+                energies.append(energy / row['num_questions']) # Energy is averaged per trial, like num_questions
+        return {"latency_s": latency, "questions": count,
+                "energy_wh": sum(energies) / len(energies) if energies else None}
+
+    def get_question_score_matrix(self, benchmark: str, min_coverage: float = 0.95) -> tuple[dict, dict]:
+        """
+        Collects per-question scores of past runs of a benchmark, e.g. to build a core set.
+
+        Only results that answered at least `min_coverage` of the most complete result's questions
+        are used. Repeated runs (and trials) of a model are averaged per question.
+
+        Returns:
+            tuple: ({model: {question_id: mean score}}, {question_id: subject})
+        """
+        per_result, subjects = {}, {}
+        for row in self._conn.execute(
+            "SELECT result_id, model, question_id, subject, score FROM question_results "
+            "WHERE benchmark = ? AND score IS NOT NULL", (benchmark,)
+        ):
+            per_result.setdefault((row['result_id'], row['model']), {}).setdefault(row['question_id'], []).append(row['score'])
+            subjects[row['question_id']] = row['subject']
+        if not per_result:
+            return {}, {}
+
+        most_complete = max(len(answers) for answers in per_result.values())
+        per_model = {}
+        for (_, model), answers in per_result.items():
+            if len(answers) < min_coverage * most_complete:
+                continue
+            for qid, scores in answers.items():
+                per_model.setdefault(model, {}).setdefault(qid, []).extend(scores)
+        matrix = {model: {qid: sum(v) / len(v) for qid, v in answers.items()} for model, answers in per_model.items()}
+        return matrix, subjects
+
+    @staticmethod
+    def _filter_clause(model: str | None, benchmark: str | None) -> tuple[str, list]:
+        conditions, params = [], []
+        if model is not None:
+            conditions.append("model = ?")
+            params.append(model)
+        if benchmark is not None:
+            conditions.append("benchmark = ?")
+            params.append(benchmark)
+        if not conditions:
+            return "", []
+        return f"WHERE r.run_id IN (SELECT run_id FROM results WHERE {' AND '.join(conditions)})", params
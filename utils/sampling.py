@@ -0,0 +1,58 @@
+import math
+import random
+
+
+def seeded_sample(items: list, k: int, seed: int | str | None, stratum: str = "") -> list:
+    """
+    Draws k items without replacement, reproducibly for a given seed and stratum name.
+    The picked items keep their original order.
+
+    With seed None the first k items are returned (the historical behaviour).
+    """
+    if k >= len(items):
+        return list(items)
+    if seed is None:
+        return list(items[:k])
+    rng = random.Random(f"{seed}:{stratum}")
+    picked = sorted(rng.sample(range(len(items)), k))
+    return [items[i] for i in picked]
+
+
+def allocate(sizes: dict, total: int, minimum: int = 1) -> dict:
+    """
+    Splits `total` across strata proportionally to their sizes (largest-remainder rounding),
+    giving every non-empty stratum at least `minimum` and never more than its size.
+    """
+    population = sum(sizes.values())
+    if population == 0:
+        return {name: 0 for name in sizes}
+    total = min(total, population)
+    shares = {name: total * size / population for name, size in sizes.items()}
+    counts = {name: min(size, max(minimum if size else 0, math.floor(shares[name]))) for name, size in sizes.items()}
+    remaining = total - sum(counts.values())
+    by_remainder = sorted(sizes, key=lambda name: shares[name] - math.floor(shares[name]), reverse=True)
+    while remaining > 0:
+        progressed = False
+        for name in by_remainder:
+            if remaining > 0 and counts[name] < sizes[name]:
+                counts[name] += 1
+                remaining -= 1
+                progressed = True
+        if not progressed:
+            break
+    return counts
+
+
+def stratified_sample(items: list[dict], fraction: float, key: str = "subject", seed: int | None = 42) -> list[dict]:
+    """
+    Takes a seeded random `fraction` (0..1) of the items, allocated proportionally across the
+    strata given by `item[key]`, so every stratum stays represented. Item order is preserved.
+    """
+    strata = {}
+    for index, item in enumerate(items):
+        strata.setdefault(str(item.get(key)), []).append(index)
+    counts = allocate({name: len(indices) for name, indices in strata.items()}, math.ceil(len(items) * fraction))
+    picked = []
+    for name, indices in strata.items():
+        picked.extend(seeded_sample(indices, counts[name], seed, stratum=name))
+    return [items[i] for i in sorted(picked)]
@@ -0,0 +1,69 @@
+import logging
+from collections import Counter
+from benchmarks.base_benchmark import BaseBenchmark
+
+logger = logging.getLogger(__name__)
+
+
+def supports_self_consistency(benchmark: BaseBenchmark) -> bool:
+    """A benchmark can be majority-voted if it canonicalizes answers with `extract_answer`."""
+    return type(benchmark).extract_answer is not BaseBenchmark.extract_answer
+
+
+class SelfConsistency(BaseBenchmark):
+    """
+    Wraps a benchmark so that each question is answered by `k` seeded samples, issued
+    concurrently, and scored by majority vote over the answers the benchmark's
+    `extract_answer` finds in them.
+
+    Ties go to the answer seen first. The response that is scored is the first sample giving
+    the winning answer, so the wrapped benchmark's own scorer decides correctness.
+    """
+    def __init__(self, benchmark: BaseBenchmark, k: int, temperature: float = 0.7):
+        super().__init__(f"{benchmark.get_name()} [self-consistency k={k}]")
+        self.benchmark = benchmark
+        self.samples_per_question = k # Read by the evaluator's generation workers
+        self.temperature = temperature
+        self.scorer_cpu_heavy = benchmark.scorer_cpu_heavy
+        self.judge = benchmark.judge
+
+    def get_questions(self):
+        return self.benchmark.get_questions()
+
+    def get_generation_overrides(self, question_data: dict) -> dict:
+        """Sampling needs a non-zero temperature; k=1 uses it too, so every k is measured alike."""
+        overrides = dict(self.benchmark.get_generation_overrides(question_data))
+        overrides["options"] = {**overrides.get("options", {}), "temperature": self.temperature}
+        return overrides
+
+    def extract_answer(self, model_response: str):
+        return self.benchmark.extract_answer(model_response)
+
+    def evaluate(self, model_response: str, question_data: dict) -> (float | None):
+        return self.evaluate_with_details(model_response, question_data)[0]
+
+    def evaluate_with_details(self, model_response: str, question_data: dict) -> tuple[float | None, dict]:
+        samples = question_data.get("samples") or [model_response]
+        answers = [self.benchmark.extract_answer(sample) for sample in samples]
+        votes = Counter(answer for answer in answers if answer is not None)
+        if not votes:
+            score, details = self.benchmark.evaluate_with_details(samples[0], question_data)
+            return score, {**details, "votes": {}, "agreement": 0.0}
+        top = max(votes.values())
+        majority = next(answer for answer in answers if answer is not None and votes[answer] == top)
+        representative = samples[answers.index(majority)]
+        score, details = self.benchmark.evaluate_with_details(representative, question_data)
+        return score, {**details, "votes": {str(answer): count for answer, count in votes.items()},
+                       "agreement": top / len(samples)}
+
+    def summarize(self, question_results: list[dict]) -> dict:
+        """Adds k and the total tokens and generation wall time, to plot accuracy against cost."""
+        summary = self.benchmark.summarize(question_results)
+        summary.pop("variant_of", None) # Not comparable with the wrapped benchmark's other variants
+        summary.update({
+            "self_consistency_k": self.samples_per_question,
+            "self_consistency_of": self.benchmark.get_name(),
+            "total_tokens": sum((q.get("prompt_tokens") or 0) + (q.get("output_tokens") or 0) for q in question_results),
+            "total_time_s": sum(q.get("latency_s") or 0 for q in question_results if not q.get("error")),
+        })
+        return summary
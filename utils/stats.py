@@ -0,0 +1,140 @@
+import math
+import random
+
+
+def mean(values: list[float]) -> float | None:
+    """Arithmetic mean, or None for an empty list."""
+    return sum(values) / len(values) if values else None
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Linear-interpolated percentile (pct in 0..100), or None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100.0
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def median(values: list[float]) -> float | None:
+    return percentile(values, 50)
+
+
+def normal_cdf(z: float) -> float:
+    return 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+
+
+def _rank(values: list[float]) -> tuple[list[float], list[int]]:
+    """Returns average ranks (1-based) of the values and the sizes of all tie groups."""
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    tie_sizes = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = average_rank
+        tie_sizes.append(j - i + 1)
+        i = j + 1
+    return ranks, tie_sizes
+
+
+def mann_whitney_u(x: list[float], y: list[float], alternative: str = "two-sided") -> float | None:
+    """
+    Mann-Whitney U test (normal approximation with tie and continuity correction).
+
+    Args:
+        x, y (list[float]): The two independent samples.
+        alternative (str): "two-sided", "greater" (x tends to be larger than y) or "less".
+
+    Returns:
+        float or None: The p-value, or None if either sample is empty.
+    """
+    n1, n2 = len(x), len(y)
+    if n1 == 0 or n2 == 0:
+        return None
+    ranks, tie_sizes = _rank(list(x) + list(y))
+    u1 = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    mean_u = n1 * n2 / 2
+    tie_term = sum(t ** 3 - t for t in tie_sizes) / (n * (n - 1)) if n > 1 else 0.0
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term)
+    if variance <= 0:
+        return 1.0  # All values identical: no evidence of any difference
+
+    sd = math.sqrt(variance)
+    if alternative == "greater":
+        return 1.0 - normal_cdf((u1 - mean_u - 0.5) / sd)
+    if alternative == "less":
+        return normal_cdf((u1 - mean_u + 0.5) / sd)
+    z = (abs(u1 - mean_u) - 0.5) / sd
+    return min(1.0, 2 * (1.0 - normal_cdf(max(z, 0.0))))
+
+
+def binomial_tail(k: int, n: int, p: float = 0.5) -> float:
+    """P(X >= k) for X ~ Binomial(n, p)."""
+    if k <= 0:
+        return 1.0
+    if k > n:
+        return 0.0
+    if p == 0.5:
+        return sum(math.comb(n, i) for i in range(k, n + 1)) / 2 ** n
+    return sum(math.comb(n, i) * p ** i * (1 - p) ** (n - i) for i in range(k, n + 1))
+
+
+def mcnemar_worse(baseline: list[float], current: list[float]) -> float:
+    """
+    One-sided exact McNemar test on paired binary outcomes.
+
+    Returns the p-value for "current gets fewer items right than baseline".
+    """
+    lost = sum(1 for b, c in zip(baseline, current) if b >= 0.5 > c)
+    gained = sum(1 for b, c in zip(baseline, current) if c >= 0.5 > b)
+    return binomial_tail(lost, lost + gained)
+
+
+def two_proportion_worse(baseline_successes: int, baseline_n: int, current_successes: int, current_n: int) -> float | None:
+    """
+    One-sided two-proportion z-test.
+
+    Returns the p-value for "the current success rate is lower than the baseline's".
+    """
+    if baseline_n == 0 or current_n == 0:
+        return None
+    pooled = (baseline_successes + current_successes) / (baseline_n + current_n)
+    variance = pooled * (1 - pooled) * (1 / baseline_n + 1 / current_n)
+    if variance <= 0:
+        return 1.0
+    z = (baseline_successes / baseline_n - current_successes / current_n) / math.sqrt(variance)
+    return 1.0 - normal_cdf(z)
+
+
+def bootstrap_ci(values: list[float], statistic=mean, n_resamples: int = 1000,
+                 confidence: float = 0.95, seed: int | None = 0) -> tuple[float, float] | None:
+    """
+    Percentile bootstrap confidence interval of a statistic.
+
+    Args:
+        values (list[float]): The observed sample.
+        statistic (callable): Function computing the statistic of a sample (default: mean).
+        n_resamples (int): Number of bootstrap resamples.
+        confidence (float): Confidence level, e.g. 0.95.
+        seed (int, optional): Seed for reproducible intervals.
+
+    Returns:
+        tuple or None: (lower, upper), or None if there are fewer than two values.
+    """
+    if len(values) < 2:
+        return None
+    rng = random.Random(seed)
+    n = len(values)
+    estimates = sorted(statistic(rng.choices(values, k=n)) for _ in range(n_resamples))
+    tail = (1 - confidence) / 2 * 100
+    return percentile(estimates, tail), percentile(estimates, 100 - tail)
@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import logging
+import threading
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+
+class _NullSpan:
+    """Shared no-op span returned while tracing is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """A timed region that reports itself to its tracer when it exits."""
+    __slots__ = ("tracer", "name", "args", "start_ns")
+
+    def __init__(self, tracer, name: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self.name, self.start_ns, end_ns - self.start_ns, self.args)
+        return False
+
+    def set(self, **args):
+        """Attaches extra arguments to the span (shown in the trace viewer)."""
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Records named spans around the harness's hot paths.
+
+    Tracing is off by default. While disabled, `span()` returns a shared no-op
+    context manager, so instrumented code pays one attribute check per call.
+    Recorded spans can be exported as a Chrome trace (viewable in chrome://tracing
+    or https://ui.perfetto.dev) and summarized as time-per-stage.
+    """
+    def __init__(self):
+        self.enabled = False
+        self._events = []
+        self._thread_names = {}
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._wall_start_ns = None
+        self._wall_end_ns = None
+
+    def enable(self):
+        """Starts recording spans."""
+        self.enabled = True
+        self._wall_start_ns = time.perf_counter_ns()
+        self._wall_end_ns = None
+
+    def disable(self):
+        """Stops recording spans. Already recorded spans are kept."""
+        if self.enabled:
+            self._wall_end_ns = time.perf_counter_ns()
+        self.enabled = False
+
+    def reset(self):
+        """Discards all recorded spans."""
+        with self._lock:
+            self._events = []
+            self._thread_names = {}
+
+    def span(self, name: str, **args):
+        """
+        Returns a context manager timing the enclosed block as `name`.
+
+        Args:
+            name (str): Stage name, dotted by component (e.g. "ollama.request").
+            **args: Extra values shown with the span in the trace viewer.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def _record(self, name: str, start_ns: int, duration_ns: int, args: dict):
+        thread = threading.current_thread()
+        with self._lock:
+            self._events.append((name, start_ns, duration_ns, thread.ident, args))
+            self._thread_names.setdefault(thread.ident, thread.name)
+
+    def get_events(self) -> list[dict]:
+        """Returns the recorded spans as Chrome trace 'complete' events."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": tname}}
+            for tid, tname in thread_names.items()
+        ]
+        for name, start_ns, duration_ns, tid, args in events:
+            trace_events.append({
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (start_ns - self._origin_ns) / 1000,  # Chrome traces use microseconds
+                "dur": duration_ns / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {k: v if isinstance(v, (int, float, bool, type(None))) else str(v) for k, v in args.items()},
+            })
+        return trace_events
+
+    def export_chrome_trace(self, output_file: str):
+        """Writes the recorded spans to a Chrome/Perfetto-compatible JSON trace file."""
+        try:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump({"traceEvents": self.get_events(), "displayTimeUnit": "ms"}, f)
+            logger.info(f"Trace with {len(self._events)} spans written to {output_file}")
+        except IOError as e:
+            logger.error(f"Error writing trace file {output_file}: {e}")
+
+    def summary(self) -> list[dict]:
+        """
+        Aggregates the recorded spans by name.
+
+        Returns:
+            list: One dictionary per stage, sorted by total time (descending):
+                  {'stage': str, 'count': int, 'total_s': float, 'mean_ms': float,
+                   'max_ms': float, 'percent_of_wall': float | None}
+        """
+        with self._lock:
+            events = list(self._events)
+
+        stats = {}
+        for name, _, duration_ns, _, _ in events:
+            entry = stats.setdefault(name, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += duration_ns
+            entry[2] = max(entry[2], duration_ns)
+
+        wall_ns = None
+        if self._wall_start_ns is not None:
+            wall_ns = (self._wall_end_ns or time.perf_counter_ns()) - self._wall_start_ns
+
+        rows = []
+        for name, (count, total_ns, max_ns) in stats.items():
+            rows.append({
+                "stage": name,
+                "count": count,
+                "total_s": total_ns / 1e9,
+                "mean_ms": total_ns / count / 1e6,
+                "max_ms": max_ns / 1e6,
+                "percent_of_wall": (total_ns / wall_ns * 100) if wall_ns else None,
+            })
+        rows.sort(key=lambda r: r["total_s"], reverse=True)
+        return rows
+
+    def format_summary(self) -> str:
+        """Renders `summary()` as a plain-text table."""
+        rows = self.summary()
+        if not rows:
+            return "No trace spans were recorded."
+
+        headers = ["Stage", "Count", "Total (s)", "Mean (ms)", "Max (ms)", "% of Wall"]
+        table = [
+            [
+                r["stage"], str(r["count"]), f"{r['total_s']:.3f}", f"{r['mean_ms']:.3f}",
+                f"{r['max_ms']:.3f}", f"{r['percent_of_wall']:.1f}" if r["percent_of_wall"] is not None else "N/A",
+            ]
+            for r in rows
+        ]
+        from tabulate import tabulate
+        return tabulate(table, headers=headers, tablefmt="grid")
+
+
+# Process-wide tracer used by the evaluator, clients and benchmark adapters.
+tracer = Tracer()
+
+
+def span(name: str, **args):
+    """Shortcut for `tracer.span(...)` on the process-wide tracer."""
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return _Span(tracer, name, args)
+
+
+def traced(name: str):
+    """Decorator that records every call of the wrapped function as a span."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
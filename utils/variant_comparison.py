@@ -0,0 +1,83 @@
+import re
+
+# Objectives of the variant comparison: (metric, higher is better).
+PARETO_OBJECTIVES = (("score", True), ("weighted_tokens_s", True), ("peak_memory_gb", False),
+                     ("energy_per_correct_wh", False))
+
+
+def model_family(model_tag: str, overrides: dict | None = None) -> str:
+    """
+    Derives the base model of a tag, so quantizations and sizes of one model can be compared:
+    "qwen3:14b" and "qwen3:8b" -> "qwen3", "hf.co/bartowski/Qwen_Qwen3-30B-A3B-GGUF:IQ2_S" -> "qwen3".
+    `overrides` maps tags to families where the name does not tell.
+    """
+    if overrides and model_tag in overrides:
+        return overrides[model_tag]
+    name = model_tag.split("/")[-1].split(":")[0]
+    name = re.sub(r"-GGUF$", "", name, flags=re.IGNORECASE)
+    name = re.sub(r"^[A-Za-z0-9]+_", "", name) # Uploader prefixes such as "Qwen_Qwen3-..."
+    return name.split("-")[0].lower()
+
+
+def variant_metrics(entry: dict) -> dict:
+    """
+    The comparison metrics of one result entry: accuracy, token-weighted tokens/s, peak memory
+    (VRAM, or RAM without a GPU) and GPU energy per correct answer.
+    """
+    num_trials = max(1, len(entry.get("trials") or []))
+    correct_per_trial = (entry.get("score") or 0) / 100 * (entry.get("successful_evals") or 0) / num_trials
+    energy = entry.get("total_gpu_energy_wh")
+    return {
+        "score": entry.get("score"),
+        # Runs stored before the weighted figure existed fall back to the per-question mean.
+        "weighted_tokens_s": entry.get("weighted_tokens_s", entry.get("avg_tokens_s")),
+        "peak_memory_gb": entry.get("max_gpu_mem_used_gb") or entry.get("max_ram_used_gb"),
+        "energy_per_correct_wh": energy / correct_per_trial if energy and correct_per_trial else None,
+    }
+
+
+def pareto_optimal(rows: list[dict], objectives=PARETO_OBJECTIVES) -> list[bool]:
+    """
+    Marks the rows no other row dominates (at least as good on every objective and better on
+    one). Objectives a row lacks count as worst for that row.
+    """
+    def value(row, key, higher):
+        v = row.get(key)
+        if v is None:
+            return float("-inf")
+        return v if higher else -v
+
+    vectors = [[value(row, key, higher) for key, higher in objectives] for row in rows]
+    flags = []
+    for i, a in enumerate(vectors):
+        dominated = any(all(x >= y for x, y in zip(b, a)) and any(x > y for x, y in zip(b, a))
+                        for j, b in enumerate(vectors) if j != i)
+        flags.append(not dominated)
+    return flags
+
+
+def compare_variants(results_data: list[dict], families: dict | None = None) -> list[dict]:
+    """
+    Groups the result entries by benchmark, engine and base model, and computes the comparison
+    metrics and Pareto front of every group with at least two variants.
+
+    Returns:
+        list: One dict per group: {'family', 'benchmark', 'backend', 'variants': list[dict]},
+              each variant {'model', 'score', 'weighted_tokens_s', 'peak_memory_gb',
+              'energy_per_correct_wh', 'pareto': bool}, best score first.
+    """
+    groups = {}
+    for entry in results_data:
+        key = (model_family(entry.get("model", ""), families), entry.get("benchmark"), entry.get("backend", "ollama"))
+        groups.setdefault(key, []).append(entry)
+
+    comparisons = []
+    for (family, benchmark, backend), entries in groups.items():
+        if len({e.get("model") for e in entries}) < 2:
+            continue
+        variants = [{"model": e.get("model"), **variant_metrics(e)} for e in entries]
+        for variant, optimal in zip(variants, pareto_optimal(variants)):
+            variant["pareto"] = optimal
+        variants.sort(key=lambda v: v["score"] if v["score"] is not None else float("-inf"), reverse=True)
+        comparisons.append({"family": family, "benchmark": benchmark, "backend": backend, "variants": variants})
+    return comparisons